@@ -6,12 +6,14 @@ FastAPI routes for performance analytics and statistics
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, List
+import json
 import os
-import boto3
-from boto3.dynamodb.conditions import Key
 from collections import defaultdict
-from pymongo import MongoClient
+from functools import lru_cache
+from services.data_executor import run_blocking
+from services.match_repository import get_match_repository
 from services.habits_detector import HabitsDetector
+from services.heatmap_filter import filter_heatmap_events
 from services.narrative_generator import NarrativeGenerator
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
@@ -40,6 +42,19 @@ def get_player_participant_data(match_data: Dict, target_puuid: str) -> Optional
     return None
 
 
+@lru_cache(maxsize=None)
+def load_static_data(filename: str):
+    """Parsed static_data/<filename> (read once per process; treat as read-only)"""
+    path = os.path.join(os.path.dirname(__file__), '..', 'static_data', filename)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def fetch_player_matches(puuid: str) -> List[Dict]:
+    """A player's match summaries (full match items until summaries exist), with native int/float numbers"""
+    return [item async for item in get_match_repository().amatches(puuid)]
+
+
 @router.post("/performance")
 async def get_performance_analytics(request: PerformanceRequest):
     """
@@ -52,29 +67,8 @@ async def get_performance_analytics(request: PerformanceRequest):
         - Performance trends (gold, damage, deaths, vision per match)
     """
     try:
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
         # Fetch all matches with pagination (do this once!)
-        matches = []
-        last_evaluated_key = None
-
-        while True:
-            if last_evaluated_key:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#'),
-                    ExclusiveStartKey=last_evaluated_key
-                )
-            else:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#')
-                )
-
-            matches.extend(response['Items'])
-
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
+        matches = await fetch_player_matches(request.puuid)
 
         if not matches:
             raise HTTPException(status_code=404, detail="No matches found for player")
@@ -142,26 +136,26 @@ async def get_performance_analytics(request: PerformanceRequest):
             match_info = match_data.get('info', {})
 
             # === Vision Stats ===
-            vision_totals['wardsPlaced'] += int(player_data.get('wardsPlaced', 0))
-            vision_totals['wardsKilled'] += int(player_data.get('wardsKilled', 0))
-            vision_totals['controlWardsPlaced'] += int(player_data.get('detectorWardsPlaced', 0))
-            vision_totals['stealthWardsPlaced'] += int(player_data.get('challenges', {}).get('stealthWardsPlaced', 0) or 0)
-            vision_totals['visionScore'] += int(player_data.get('visionScore', 0))
-            vision_totals['visionWardsBoughtInGame'] += int(player_data.get('visionWardsBoughtInGame', 0))
-
-            game_duration = int(match_info.get('gameDuration', 0))
+            vision_totals['wardsPlaced'] += player_data.get('wardsPlaced', 0)
+            vision_totals['wardsKilled'] += player_data.get('wardsKilled', 0)
+            vision_totals['controlWardsPlaced'] += player_data.get('detectorWardsPlaced', 0)
+            vision_totals['stealthWardsPlaced'] += player_data.get('challenges', {}).get('stealthWardsPlaced', 0) or 0
+            vision_totals['visionScore'] += player_data.get('visionScore', 0)
+            vision_totals['visionWardsBoughtInGame'] += player_data.get('visionWardsBoughtInGame', 0)
+
+            game_duration = match_info.get('gameDuration', 0)
             vision_totals['gameDuration'] += game_duration
 
             # === Objective Stats ===
             challenges = player_data.get('challenges', {})
-            objective_totals['dragonTakedowns'] += int(challenges.get('dragonTakedowns', 0) or 0)
-            objective_totals['baronTakedowns'] += int(challenges.get('teamBaronKills', 0) or 0)
-            objective_totals['turretTakedowns'] += int(player_data.get('turretKills', 0))
-            objective_totals['inhibitorTakedowns'] += int(player_data.get('inhibitorKills', 0))
+            objective_totals['dragonTakedowns'] += challenges.get('dragonTakedowns', 0) or 0
+            objective_totals['baronTakedowns'] += challenges.get('teamBaronKills', 0) or 0
+            objective_totals['turretTakedowns'] += player_data.get('turretKills', 0)
+            objective_totals['inhibitorTakedowns'] += player_data.get('inhibitorKills', 0)
             objective_totals['firstBloodCount'] += 1 if player_data.get('firstBloodKill') else 0
             objective_totals['firstTowerCount'] += 1 if player_data.get('firstTowerKill') else 0
-            objective_totals['objectivesStolen'] += int(challenges.get('objectivesStolen', 0) or 0)
-            objective_totals['teamObjectives'] += int(challenges.get('teamBaronKills', 0) or 0) + int(challenges.get('teamElderDragonKills', 0) or 0)
+            objective_totals['objectivesStolen'] += challenges.get('objectivesStolen', 0) or 0
+            objective_totals['teamObjectives'] += (challenges.get('teamBaronKills', 0) or 0) + (challenges.get('teamElderDragonKills', 0) or 0)
 
             # === Items ===
             for i in range(7):
@@ -179,22 +173,22 @@ async def get_performance_analytics(request: PerformanceRequest):
                         rune_counts[perk_id] += 1
 
             # === Performance Trends ===
-            # Use pre-calculated values from challenges to avoid Decimal issues
-            gold_per_min = float(challenges.get('goldPerMinute', 0))
-            kda = float(challenges.get('kda', 0))
-            damage_share = float(challenges.get('teamDamagePercentage', 0)) * 100 if challenges.get('teamDamagePercentage') else 0
-            vision_score = int(player_data.get('visionScore', 0))
+            # Use pre-calculated values from challenges
+            gold_per_min = challenges.get('goldPerMinute', 0)
+            kda = challenges.get('kda', 0)
+            damage_share = challenges.get('teamDamagePercentage', 0) * 100 if challenges.get('teamDamagePercentage') else 0
+            vision_score = player_data.get('visionScore', 0)
             is_win = player_data.get('win', False)
 
             performance_trends.append({
                 'matchId': match_data.get('metadata', {}).get('matchId'),
-                'gameCreation': int(match_info.get('gameCreation', 0)),
+                'gameCreation': match_info.get('gameCreation', 0),
                 'goldPerMinute': gold_per_min,
-                'damageToChampions': int(player_data.get('totalDamageDealtToChampions', 0)),
-                'deaths': int(player_data.get('deaths', 0)),
+                'damageToChampions': player_data.get('totalDamageDealtToChampions', 0),
+                'deaths': player_data.get('deaths', 0),
                 'visionScore': vision_score,
-                'kills': int(player_data.get('kills', 0)),
-                'assists': int(player_data.get('assists', 0)),
+                'kills': player_data.get('kills', 0),
+                'assists': player_data.get('assists', 0),
                 'kda': kda,
                 'win': is_win,
                 'damageShare': damage_share
@@ -354,29 +348,8 @@ async def get_vision_control_stats(request: VisionStatsRequest):
         - Game phase breakdown (early/mid/late)
     """
     try:
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
         # Fetch all matches with pagination
-        matches = []
-        last_evaluated_key = None
-
-        while True:
-            if last_evaluated_key:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#'),
-                    ExclusiveStartKey=last_evaluated_key
-                )
-            else:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#')
-                )
-
-            matches.extend(response['Items'])
-
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
+        matches = await fetch_player_matches(request.puuid)
 
         if not matches:
             raise HTTPException(status_code=404, detail="No matches found for player")
@@ -404,15 +377,15 @@ async def get_vision_control_stats(request: VisionStatsRequest):
 
             match_count += 1
 
-            # Aggregate basic stats (convert Decimal to int/float)
-            total_stats['wardsPlaced'] += int(player_data.get('wardsPlaced', 0))
-            total_stats['wardsKilled'] += int(player_data.get('wardsKilled', 0))
-            total_stats['controlWardsPlaced'] += int(player_data.get('detectorWardsPlaced', 0))  # Control wards
-            total_stats['stealthWardsPlaced'] += int(player_data.get('challenges', {}).get('stealthWardsPlaced', 0) or 0)
-            total_stats['visionScore'] += int(player_data.get('visionScore', 0))
-            total_stats['visionWardsBoughtInGame'] += int(player_data.get('visionWardsBoughtInGame', 0))
+            # Aggregate basic stats
+            total_stats['wardsPlaced'] += player_data.get('wardsPlaced', 0)
+            total_stats['wardsKilled'] += player_data.get('wardsKilled', 0)
+            total_stats['controlWardsPlaced'] += player_data.get('detectorWardsPlaced', 0)  # Control wards
+            total_stats['stealthWardsPlaced'] += player_data.get('challenges', {}).get('stealthWardsPlaced', 0) or 0
+            total_stats['visionScore'] += player_data.get('visionScore', 0)
+            total_stats['visionWardsBoughtInGame'] += player_data.get('visionWardsBoughtInGame', 0)
 
-            game_duration = int(match_data.get('info', {}).get('gameDuration', 0))
+            game_duration = match_data.get('info', {}).get('gameDuration', 0)
             total_stats['gameDuration'] += game_duration
 
         if match_count == 0:
@@ -468,29 +441,8 @@ async def get_objective_control_stats(request: VisionStatsRequest):
         - First blood/tower/objective rates
     """
     try:
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
         # Fetch all matches with pagination
-        matches = []
-        last_evaluated_key = None
-
-        while True:
-            if last_evaluated_key:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#'),
-                    ExclusiveStartKey=last_evaluated_key
-                )
-            else:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#')
-                )
-
-            matches.extend(response['Items'])
-
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
+        matches = await fetch_player_matches(request.puuid)
 
         if not matches:
             raise HTTPException(status_code=404, detail="No matches found")
@@ -523,22 +475,22 @@ async def get_objective_control_stats(request: VisionStatsRequest):
 
             # Aggregate stats using participation (challenges) instead of just kills
             # Dragons: Use dragonTakedowns for participation
-            total_objectives['dragonTakedowns'] += int(challenges.get('dragonTakedowns', 0) or 0)
+            total_objectives['dragonTakedowns'] += challenges.get('dragonTakedowns', 0) or 0
 
             # Barons: Use teamBaronKills for participation
-            total_objectives['baronTakedowns'] += int(challenges.get('teamBaronKills', 0) or 0)
+            total_objectives['baronTakedowns'] += challenges.get('teamBaronKills', 0) or 0
 
             # Turrets and inhibitors from direct stats
-            total_objectives['turretTakedowns'] += int(player_data.get('turretKills', 0))
-            total_objectives['inhibitorTakedowns'] += int(player_data.get('inhibitorKills', 0))
+            total_objectives['turretTakedowns'] += player_data.get('turretKills', 0)
+            total_objectives['inhibitorTakedowns'] += player_data.get('inhibitorKills', 0)
 
             # First blood and first tower
             total_objectives['firstBloodCount'] += 1 if player_data.get('firstBloodKill') else 0
             total_objectives['firstTowerCount'] += 1 if player_data.get('firstTowerKill') else 0
 
             # Objectives stolen
-            total_objectives['objectivesStolen'] += int(challenges.get('objectivesStolen', 0) or 0)
-            total_objectives['teamObjectives'] += int(challenges.get('teamBaronKills', 0) or 0) + int(challenges.get('teamElderDragonKills', 0) or 0)
+            total_objectives['objectivesStolen'] += challenges.get('objectivesStolen', 0) or 0
+            total_objectives['teamObjectives'] += (challenges.get('teamBaronKills', 0) or 0) + (challenges.get('teamElderDragonKills', 0) or 0)
 
         if match_count == 0:
             raise HTTPException(status_code=404, detail="No valid match data")
@@ -582,29 +534,8 @@ async def get_items_runes_stats(request: VisionStatsRequest):
         - Most used rune pages with pick rates
     """
     try:
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
         # Fetch all matches
-        matches = []
-        last_evaluated_key = None
-
-        while True:
-            if last_evaluated_key:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#'),
-                    ExclusiveStartKey=last_evaluated_key
-                )
-            else:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').begins_with('match#')
-                )
-
-            matches.extend(response['Items'])
-
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
+        matches = await fetch_player_matches(request.puuid)
 
         if not matches:
             raise HTTPException(status_code=404, detail="No matches found")
@@ -682,11 +613,7 @@ async def get_items_runes_stats(request: VisionStatsRequest):
 async def get_items_batch(item_ids: List[int]):
     """Get multiple items information in one request"""
     try:
-        import json
-        item_path = os.path.join(os.path.dirname(__file__), '..', 'static_data', 'item.json')
-
-        with open(item_path, 'r', encoding='utf-8') as f:
-            item_data = json.load(f)
+        item_data = await run_blocking(load_static_data, 'item.json')
 
         results = {}
         for item_id in item_ids:
@@ -717,11 +644,7 @@ async def get_items_batch(item_ids: List[int]):
 async def get_item_info(item_id: str):
     """Get item information by ID"""
     try:
-        import json
-        item_path = os.path.join(os.path.dirname(__file__), '..', 'static_data', 'item.json')
-
-        with open(item_path, 'r', encoding='utf-8') as f:
-            item_data = json.load(f)
+        item_data = await run_blocking(load_static_data, 'item.json')
 
         if item_id in item_data.get('data', {}):
             item = item_data['data'][item_id]
@@ -752,11 +675,7 @@ async def get_item_info(item_id: str):
 async def get_runes_batch(rune_ids: List[int]):
     """Get multiple runes information in one request"""
     try:
-        import json
-        rune_path = os.path.join(os.path.dirname(__file__), '..', 'static_data', 'runesReforged.json')
-
-        with open(rune_path, 'r', encoding='utf-8') as f:
-            rune_trees = json.load(f)
+        rune_trees = await run_blocking(load_static_data, 'runesReforged.json')
 
         # Build a lookup map for runes
         rune_lookup = {}
@@ -796,11 +715,7 @@ async def get_runes_batch(rune_ids: List[int]):
 async def get_rune_info(rune_id: int):
     """Get rune information by ID"""
     try:
-        import json
-        rune_path = os.path.join(os.path.dirname(__file__), '..', 'static_data', 'runesReforged.json')
-
-        with open(rune_path, 'r', encoding='utf-8') as f:
-            rune_trees = json.load(f)
+        rune_trees = await run_blocking(load_static_data, 'runesReforged.json')
 
         # Search through all rune trees and slots
         for tree in rune_trees:
@@ -852,7 +767,8 @@ async def get_player_habits(request: HabitsRequest):
     """
     try:
         detector = HabitsDetector()
-        result = detector.detect_habits(
+        result = await run_blocking(
+            detector.detect_habits,
             puuid=request.puuid,
             time_range=request.time_range,
             rank=request.rank
@@ -887,8 +803,9 @@ async def generate_year_narrative(request: NarrativeRequest):
         - Shareable content
     """
     try:
-        generator = NarrativeGenerator()
-        result = generator.generate_year_narrative(
+        generator = await run_blocking(NarrativeGenerator)
+        result = await run_blocking(
+            generator.generate_year_narrative,
             puuid=request.puuid,
             player_name=request.player_name,
             year=request.year
@@ -927,157 +844,21 @@ async def get_filtered_heatmap(request: FilteredHeatmapRequest):
     Returns filtered event points with positions for heatmap visualization.
     """
     try:
-        import logging
-        logger = logging.getLogger(__name__)
-
-        # Connect to MongoDB for timeline data
-        mongo_connection = os.getenv('MONGODB_CONNECTION_STRING')
-        mongo_client = MongoClient(mongo_connection)
-        mongo_db = mongo_client['lol_timelines']
-
-        # Connect to DynamoDB for match data
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
-        logger.info(f"Filtering {request.event_type} - Champion: {request.champion_name}, Role: {request.role}, TimeRange: {request.time_range}")
-
-        # Get all timelines for this player from MongoDB
-        timelines_cursor = mongo_db.timelines.find({'puuid': request.puuid})
-        timelines = list(timelines_cursor)
-
-        if not timelines:
-            return {
-                "success": True,
-                "filtered_events": [],
-                "total_events": 0,
-                "filters_applied": {
-                    "champion": request.champion_name,
-                    "role": request.role,
-                    "time_range": request.time_range
-                }
-            }
-
-        logger.info(f"Found {len(timelines)} timeline documents")
-
-        # Build match metadata (champion, role) by fetching from DynamoDB
-        match_metadata = {}
-        participant_id_map = {}
-
-        # Limit to time_range if specified
-        timelines_to_process = timelines[:request.time_range] if request.time_range else timelines
-
-        for timeline_doc in timelines_to_process:
-            match_id = timeline_doc['matchId']
-
-            # Fetch match data from DynamoDB
-            try:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(request.puuid) & Key('dataType').eq(f'match#{match_id}')
-                )
-
-                if response['Items']:
-                    match_data = response['Items'][0].get('data', {})
-
-                    # Find player's participant ID
-                    participants_puuids = match_data.get('metadata', {}).get('participants', [])
-                    for idx, puuid in enumerate(participants_puuids, 1):
-                        if puuid == request.puuid:
-                            participant_id_map[match_id] = idx
-                            break
-
-                    # Extract champion and role
-                    participants = match_data.get('info', {}).get('participants', [])
-                    for participant in participants:
-                        if participant.get('puuid') == request.puuid:
-                            match_metadata[match_id] = {
-                                'champion_name': participant.get('championName', 'Unknown'),
-                                'role': participant.get('teamPosition', 'Unknown')
-                            }
-                            break
-            except Exception as e:
-                logger.error(f"Error fetching match {match_id}: {e}")
-                continue
-
-        logger.info(f"Built metadata for {len(match_metadata)} matches")
-
-        # Apply filters and collect matching events
-        filtered_events = []
-        total_events_checked = 0
-
-        for timeline_doc in timelines_to_process:
-            match_id = timeline_doc['matchId']
-
-            if match_id not in participant_id_map or match_id not in match_metadata:
-                continue
-
-            metadata = match_metadata[match_id]
-            participant_id = participant_id_map[match_id]
-
-            # Apply champion filter
-            if request.champion_name and metadata['champion_name'] != request.champion_name:
-                continue
-
-            # Apply role filter
-            if request.role and metadata['role'] != request.role:
-                continue
-
-            # Process timeline events
-            timeline_data = timeline_doc['data']
-
-            for frame in timeline_data['info']['frames']:
-                for event in frame.get('events', []):
-                    if not event.get('position'):
-                        continue
-
-                    pos = event['position']
-                    timestamp = event['timestamp']
-                    event_matched = False
-                    event_data = {
-                        'x': pos['x'],
-                        'y': pos['y'],
-                        'timestamp': timestamp,
-                        'match_id': match_id,
-                        'champion_name': metadata['champion_name'],
-                        'role': metadata['role']
-                    }
-
-                    # Match event type
-                    if request.event_type == 'deaths':
-                        if event['type'] == 'CHAMPION_KILL' and event.get('victimId') == participant_id:
-                            event_data['killer_id'] = event.get('killerId')
-                            event_matched = True
-
-                    elif request.event_type == 'kills':
-                        if event['type'] == 'CHAMPION_KILL' and event.get('killerId') == participant_id:
-                            event_data['victim_id'] = event.get('victimId')
-                            event_matched = True
-
-                    elif request.event_type == 'assists':
-                        if event['type'] == 'CHAMPION_KILL' and participant_id in event.get('assistingParticipantIds', []):
-                            event_data['victim_id'] = event.get('victimId')
-                            event_matched = True
-
-                    elif request.event_type == 'objectives':
-                        if event['type'] == 'ELITE_MONSTER_KILL' and event.get('killerId') == participant_id:
-                            event_data['monster_type'] = event.get('monsterType')
-                            event_matched = True
-                        elif event['type'] == 'BUILDING_KILL':
-                            assisting = event.get('assistingParticipantIds', [])
-                            if participant_id in assisting or event.get('killerId') == participant_id:
-                                event_data['building_type'] = event.get('buildingType')
-                                event_matched = True
-
-                    if event_matched:
-                        filtered_events.append(event_data)
-                        total_events_checked += 1
-
-        logger.info(f"Filtered to {len(filtered_events)} events from {total_events_checked} total")
+        # Shared with the year recap agent; reads compact timelines (event tables only)
+        data = await run_blocking(
+            filter_heatmap_events,
+            puuid=request.puuid,
+            event_type=request.event_type,
+            champion_name=request.champion_name,
+            role=request.role,
+            match_count=request.time_range
+        )
 
         return {
             "success": True,
-            "filtered_events": filtered_events,
-            "total_events": len(filtered_events),
-            "matches_analyzed": len(match_metadata),
+            "filtered_events": data['filtered_events'],
+            "total_events": data['total_events'],
+            "matches_analyzed": data['matches_analyzed'],
             "filters_applied": {
                 "event_type": request.event_type,
                 "champion": request.champion_name,
@@ -1087,6 +868,7 @@ async def get_filtered_heatmap(request: FilteredHeatmapRequest):
         }
 
     except Exception as e:
+        import logging
         import traceback
         logger = logging.getLogger(__name__)
         logger.error(f"Filtered heatmap error: {str(e)}")
@@ -4,9 +4,11 @@ FastAPI routes for fetching and storing player data
 """
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 import sys
+import json
 import os
 from pathlib import Path
 from pymongo import MongoClient
@@ -14,7 +16,12 @@ from pymongo import MongoClient
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from services.data_executor import run_blocking
+from services.dynamo_codec import get_item
+from services.match_repository import get_match_repository
 from services.player_data_service import PlayerDataService
+from services.player_index import find_player, get_player_index
+from services.ingestion_jobs import IngestionJobManager
 
 router = APIRouter(prefix="/api/player", tags=["player"])
 
@@ -40,6 +47,12 @@ class PlayerRequest(BaseModel):
     tagLine: str
     matchCount: Optional[int] = 10
     saveLocal: Optional[bool] = True
+    incremental: Optional[bool] = True
+    fullSeason: Optional[bool] = False
+    compactTimelines: Optional[bool] = False
+    concurrency: Optional[int] = None
+    skipStored: Optional[bool] = True
+    saveLayout: Optional[str] = None
 
 class PlayerResponse(BaseModel):
     success: bool
@@ -49,47 +62,120 @@ class PlayerResponse(BaseModel):
 # Initialize service
 player_service = PlayerDataService()
 
-@router.post("/fetch", response_model=PlayerResponse)
+# Background ingestion jobs (fetch + save + upload run off the request path)
+job_manager = IngestionJobManager(player_service.process_player)
+
+# Seconds between SSE heartbeats so proxies keep idle streams open
+SSE_KEEPALIVE_SECONDS = 15
+
+@router.post("/fetch", response_model=PlayerResponse, status_code=202)
 async def fetch_player_data(request: PlayerRequest):
     """
-    Fetch player data from Riot API and upload to databases
+    Queue a background job that fetches player data from Riot API and uploads it to databases
+
+    Returns immediately with a job ID. Poll GET /api/player/jobs/{jobId} or
+    stream GET /api/player/jobs/{jobId}/events for per-stage progress.
+    A request for a Riot ID that already has a queued or running job with the
+    same options joins that job instead of starting a new one.
 
     Args:
         gameName: Player's game name (e.g., "Sneaky")
         tagLine: Player's tag line (e.g., "NA1")
-        matchCount: Number of recent matches to fetch (default: 10)
+        matchCount: Number of recent matches to fetch on a first sync (default: 10)
         saveLocal: Whether to save data locally (default: True)
+        incremental: Only fetch games played since the last sync (default: True)
+        fullSeason: Walk the whole season instead of the last matchCount games (default: False)
+        compactTimelines: Store only the compact timeline form to cut ingest memory (default: False)
+        concurrency: Max in-flight match/timeline requests (default: RIOT_MAX_CONCURRENCY)
+        skipStored: Skip matches already in DynamoDB and MongoDB (default: True)
+        saveLayout: Local save format, "archive" (compressed bundle) or "directory" (default: LOCAL_SAVE_LAYOUT)
 
     Returns:
-        Success status and processing summary
+        Job ID and status
     """
     try:
-        # Process player (fetch + save + upload)
-        result = await player_service.process_player(
-            game_name=request.gameName,
-            tag_line=request.tagLine,
+        job, created = job_manager.submit(
+            request.gameName,
+            request.tagLine,
             match_count=request.matchCount,
-            save_local=request.saveLocal
+            save_local=request.saveLocal,
+            incremental=request.incremental,
+            full_season=request.fullSeason,
+            compact_timelines=request.compactTimelines,
+            concurrency=request.concurrency,
+            skip_stored=request.skipStored,
+            save_layout=request.saveLayout
         )
 
-        if not result['success']:
-            raise HTTPException(
-                status_code=400,
-                detail=result.get('error', 'Failed to process player')
-            )
-
         return PlayerResponse(
             success=True,
-            message=f"Successfully processed {request.gameName}#{request.tagLine}",
-            data=result
+            message=(
+                f"Queued {request.gameName}#{request.tagLine}" if created
+                else f"Joined running job for {request.gameName}#{request.tagLine}"
+            ),
+            data={
+                'jobId': job.id,
+                'status': job.status,
+                'coalesced': not created,
+                'statusUrl': f"{router.prefix}/jobs/{job.id}",
+                'eventsUrl': f"{router.prefix}/jobs/{job.id}/events"
+            }
         )
 
-    except HTTPException:
-        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the status of an ingestion job
+
+    Args:
+        job_id: Job ID returned by POST /api/player/fetch
+
+    Returns:
+        Job status, current stage, per-stage progress and (once finished) the processing summary
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return {
+        'success': True,
+        'data': job.snapshot()
+    }
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream ingestion job progress as Server-Sent Events
+
+    Past events are replayed first, so late subscribers see the full history.
+    The stream ends with a 'succeeded' or 'failed' event.
+
+    Args:
+        job_id: Job ID returned by POST /api/player/fetch
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    async def event_stream():
+        async for payload in job.subscribe(keepalive=SSE_KEEPALIVE_SECONDS):
+            if payload is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {payload['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @router.get("/data/{puuid}")
 async def get_player_data(puuid: str):
     """
@@ -102,19 +188,8 @@ async def get_player_data(puuid: str):
         All player data from DynamoDB
     """
     try:
-        import boto3
-        import os
-
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
-        # Query all data for this player
-        response = table.query(
-            KeyConditionExpression='puuid = :puuid',
-            ExpressionAttributeValues={':puuid': puuid}
-        )
-
-        items = response['Items']
+        # Query all data for this player (compressed match payloads are decoded by the codec)
+        items = [item async for item in get_match_repository().aplayer_items(puuid)]
 
         # Organize data by type
         data = {
@@ -180,7 +255,8 @@ async def get_match_timeline(match_id: str):
         mongo_client = get_mongo_client()
         mongo_db = mongo_client['lol_timelines']
 
-        timeline_doc = mongo_db.timelines.find_one(
+        timeline_doc = await run_blocking(
+            mongo_db.timelines.find_one,
             {'matchId': match_id},
             {'_id': 0}  # Exclude MongoDB's _id field
         )
@@ -210,10 +286,18 @@ async def get_match_timeline(match_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _find_account_item(player_name: str):
+    """The account item for a Riot ID via the name index (blocking; run it off the event loop)"""
+    player = find_player(player_name)
+    if player is None:
+        return None
+    return get_item('lol-player-data', {'puuid': player['puuid'], 'dataType': 'account'})
+
+
 @router.get("/search/{game_name}/{tag_line}")
 async def search_player(game_name: str, tag_line: str):
     """
-    Search for a player in the database
+    Search for a player in the database (case-insensitive Riot ID)
 
     Args:
         game_name: Player's game name
@@ -223,32 +307,15 @@ async def search_player(game_name: str, tag_line: str):
         Player account info if found in database
     """
     try:
-        import boto3
-        import os
-
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
-        # Scan for player by name (not efficient for large databases)
-        # For production, consider adding a GSI on playerName
-        response = table.scan(
-            FilterExpression='playerName = :name',
-            ExpressionAttributeValues={
-                ':name': f"{game_name}#{tag_line}"
-            },
-            Limit=1
-        )
+        account_item = await run_blocking(_find_account_item, f"{game_name}#{tag_line}")
 
-        items = response['Items']
-
-        if not items:
+        if not account_item:
             return {
                 'success': False,
                 'found': False,
                 'message': f"Player {game_name}#{tag_line} not found in database"
             }
 
-        account_item = items[0]
         return {
             'success': True,
             'found': True,
@@ -261,6 +328,30 @@ async def search_player(game_name: str, tag_line: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/autocomplete")
+async def autocomplete_players(q: str, limit: int = 10):
+    """
+    Stored players whose Riot ID starts with a prefix (case-insensitive)
+
+    Args:
+        q: Start of "gameName" or "gameName#tagLine"
+        limit: Maximum number of players (1-50)
+
+    Returns:
+        Matching players as {playerName, puuid}, in name order
+    """
+    index = get_player_index()
+    # Only the first request (or the first after PLAYER_INDEX_REFRESH_SECONDS) waits for the load
+    await run_blocking(index.ensure_fresh)
+    players = index.complete(q, max(1, min(limit, 50)))
+    return {
+        'success': True,
+        'query': q,
+        'players': players,
+        'count': len(players)
+    }
+
+
 @router.get("/matches/{puuid}")
 async def get_player_matches(puuid: str, include_full_data: bool = False):
     """
@@ -274,67 +365,38 @@ async def get_player_matches(puuid: str, include_full_data: bool = False):
         List of matches with summary info for selection
     """
     try:
-        import boto3
-        import os
-        from datetime import datetime
-
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
-        # Query all match data for this player with pagination
+        # Slim summary items are enough for the list; full match items only when requested
         # Note: dataType is the sort key in the lol-player-data table
-        from boto3.dynamodb.conditions import Key
-
         matches = []
-        last_evaluated_key = None
-
-        # Paginate through all results
-        while True:
-            if last_evaluated_key:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#'),
-                    ExclusiveStartKey=last_evaluated_key
-                )
-            else:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-                )
-
-            # Process items from this page
-            for item in response['Items']:
-                match_data = item.get('data', {})
-                match_info = match_data.get('info', {})
-                match_metadata = match_data.get('metadata', {})
-
-                # Find the player's participant data
-                participants = match_info.get('participants', [])
-                player_data = next((p for p in participants if p.get('puuid') == puuid), None)
-
-                if player_data:
-                    match_summary = {
-                        'matchId': match_metadata.get('matchId'),
-                        'gameCreation': match_info.get('gameCreation'),
-                        'gameDuration': match_info.get('gameDuration'),
-                        'gameMode': match_info.get('gameMode'),
-                        'championName': player_data.get('championName'),
-                        'championId': player_data.get('championId'),
-                        'kills': player_data.get('kills'),
-                        'deaths': player_data.get('deaths'),
-                        'assists': player_data.get('assists'),
-                        'win': player_data.get('win'),
-                        'role': player_data.get('teamPosition')
-                    }
-                    
-                    # Only include full data if explicitly requested
-                    if include_full_data:
-                        match_summary['fullData'] = match_data
-                    
-                    matches.append(match_summary)
-
-            # Check if there are more results to fetch
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
+        async for item in get_match_repository().amatches(puuid, summaries=not include_full_data):
+            match_data = item.get('data', {})
+            match_info = match_data.get('info', {})
+            match_metadata = match_data.get('metadata', {})
+
+            # Find the player's participant data
+            participants = match_info.get('participants', [])
+            player_data = next((p for p in participants if p.get('puuid') == puuid), None)
+
+            if player_data:
+                match_summary = {
+                    'matchId': match_metadata.get('matchId'),
+                    'gameCreation': match_info.get('gameCreation'),
+                    'gameDuration': match_info.get('gameDuration'),
+                    'gameMode': match_info.get('gameMode'),
+                    'championName': player_data.get('championName'),
+                    'championId': player_data.get('championId'),
+                    'kills': player_data.get('kills'),
+                    'deaths': player_data.get('deaths'),
+                    'assists': player_data.get('assists'),
+                    'win': player_data.get('win'),
+                    'role': player_data.get('teamPosition')
+                }
+                
+                # Only include full data if explicitly requested
+                if include_full_data:
+                    match_summary['fullData'] = match_data
+                
+                matches.append(match_summary)
 
         # Sort by game creation time (newest first)
         matches.sort(key=lambda x: x.get('gameCreation', 0), reverse=True)
@@ -363,20 +425,12 @@ async def get_single_match(puuid: str, match_id: str):
         Full match data
     """
     try:
-        import boto3
-        from boto3.dynamodb.conditions import Key
-        
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-        
-        response = table.query(
-            KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').eq(f'match#{match_id}')
-        )
+        item = await run_blocking(get_match_repository().get_match, puuid, match_id)
         
-        if not response['Items']:
+        if not item:
             raise HTTPException(status_code=404, detail="Match not found")
         
-        match_data = response['Items'][0].get('data', {})
+        match_data = item.get('data', {})
         
         return {
             'success': True,
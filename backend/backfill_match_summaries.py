@@ -0,0 +1,39 @@
+"""
+Write summary#<matchId> items for match items stored before ingestion wrote them
+- Scans every match#<id> item in lol-player-data (map or compressed payloads)
+- Writes the player's slim summary item next to it (idempotent; safe to rerun)
+- Bumps each touched player's data version, so API processes drop cached match lists
+- Until a player has summaries, the analytics readers keep reading the full match items
+
+Usage:
+    python backfill_match_summaries.py
+"""
+
+import argparse
+import json
+
+from dotenv import load_dotenv
+
+from services.match_summaries import backfill_match_summaries
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Write per-player match summary items for stored matches")
+    parser.add_argument('--page-size', type=int, default=100, help="Items per Scan page")
+    args = parser.parse_args()
+
+    def on_page(report):
+        print(f"  scanned {report['scanned']}, wrote {report['written']} summaries")
+
+    print("Backfilling match summaries...")
+    report = backfill_match_summaries(page_size=args.page_size, on_page=on_page)
+
+    for failure in report['failed']:
+        print(f"  ⚠️ {failure['key']}: {failure['error']}")
+    print(json.dumps({**report, 'failed': len(report['failed'])}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
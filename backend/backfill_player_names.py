@@ -0,0 +1,40 @@
+"""
+Write name#<riot id> lookup items for players stored before ingestion wrote them
+- Scans the account items in lol-player-data and writes each player's item into the
+  player-names partition (idempotent; safe to rerun)
+- Until it has run, search and autocomplete miss older players; a full run without failures
+  writes a marker item. The API also runs it at startup until that marker exists
+  (PLAYER_NAME_BACKFILL_ON_STARTUP)
+
+Usage:
+    python backfill_player_names.py
+"""
+
+import argparse
+import json
+
+from dotenv import load_dotenv
+
+from services.player_index import backfill_player_names
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Write player name lookup items for stored accounts")
+    parser.add_argument('--page-size', type=int, default=100, help="Items per Scan page")
+    args = parser.parse_args()
+
+    def on_page(report):
+        print(f"  scanned {report['scanned']}, wrote {report['written']} names")
+
+    print("Backfilling player names...")
+    report = backfill_player_names(page_size=args.page_size, on_page=on_page)
+
+    for failure in report['failed']:
+        print(f"  ⚠️ {failure['key']}: {failure['error']}")
+    print(json.dumps({**report, 'failed': len(report['failed'])}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+Bulk backfill of many players through PlayerDataService
+- Takes Riot IDs (Name#TAG) and/or PUUIDs on the command line or from a file (one per line)
+- Ingests several players at once; every request goes through the one shared Riot rate limiter
+- Checkpoints per-player progress to a JSON state file, so a rerun resumes where it stopped
+  (finished players are skipped, and a half-done player only fetches matches not stored yet)
+- A player counts as finished only when every step succeeded; failed runs are retried
+  up to --max-attempts
+- Prints throughput (matches/min) and an ETA while it runs
+
+Usage:
+    python backfill_players.py "Sneaky#NA1" "Doublelift#NA1" --concurrency 2
+    python backfill_players.py --file players.txt --state backfill_state.json --full-season
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from services.ingestion_jobs import riot_id_key
+from services.player_data_service import PlayerDataService
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def player_key(value: str) -> str:
+    """Riot IDs are case-insensitive; PUUIDs are used as-is"""
+    if '#' in value:
+        game_name, tag_line = value.rsplit('#', 1)
+        return riot_id_key(game_name, tag_line)
+    return value.strip()
+
+
+class BackfillState:
+    """Per-player checkpoint persisted as JSON (written to a temp file and renamed)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {'createdAt': datetime.utcnow().isoformat(), 'players': {}}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    @property
+    def players(self) -> Dict[str, Dict]:
+        return self.data['players']
+
+    def add(self, value: str):
+        key = player_key(value)
+        entry = self.players.setdefault(key, {'input': value.strip(), 'status': PENDING, 'attempts': 0})
+        # A crash leaves players 'running'; they start over (already stored matches are skipped)
+        if entry['status'] == RUNNING:
+            entry['status'] = PENDING
+
+    def update(self, key: str, **fields):
+        self.players[key].update(fields)
+        self.save()
+
+    def save(self):
+        self.data['updatedAt'] = datetime.utcnow().isoformat()
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class Backfill:
+    """Runs process_player for every pending player, at most `concurrency` at a time"""
+
+    def __init__(self, service: PlayerDataService, state: BackfillState, options: Dict, concurrency: int, max_attempts: int):
+        self.service = service
+        self.state = state
+        self.options = options
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+        self.started = time.monotonic()
+        self.matches = 0
+        self.finished = 0
+        self.running: Dict[str, float] = {}
+
+    def runnable(self) -> List[str]:
+        return [
+            key for key, entry in self.state.players.items()
+            if entry['status'] == PENDING or (entry['status'] == FAILED and entry['attempts'] < self.max_attempts)
+        ]
+
+    async def resolve(self, entry: Dict) -> Dict:
+        """Riot ID for the input (PUUIDs are looked up through account-v1)"""
+        if entry.get('gameName'):
+            return entry
+        value = entry['input']
+        if '#' in value:
+            game_name, tag_line = value.rsplit('#', 1)
+            return {'gameName': game_name.strip(), 'tagLine': tag_line.strip()}
+        account = await self.service.riot_client.get_account_by_puuid(value, self.service.region)
+        return {'gameName': account['gameName'], 'tagLine': account['tagLine'], 'puuid': account['puuid']}
+
+    def on_persisted(self, resource: str, match_id: str):
+        if resource == 'match':
+            self.matches += 1
+
+    async def run_player(self, key: str, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            entry = self.state.players[key]
+            self.running[key] = time.monotonic()
+            self.state.update(key, status=RUNNING, attempts=entry['attempts'] + 1, startedAt=datetime.utcnow().isoformat())
+            try:
+                riot_id = await self.resolve(entry)
+                self.state.update(key, **riot_id)
+                result = await self.service.process_player(
+                    riot_id['gameName'], riot_id['tagLine'],
+                    on_persisted=self.on_persisted,
+                    **self.options
+                )
+                if not result.get('success'):
+                    raise RuntimeError(result.get('error', 'Failed to process player'))
+
+                fetch = result['steps'].get('fetch', {})
+                steps = {name: step.get('success') for name, step in result['steps'].items()}
+                # A failed save/DynamoDB/MongoDB step is retried like a failed run
+                failed_steps = [name for name, success in steps.items() if not success]
+                if failed_steps:
+                    print(f"❌ Backfill steps failed for {entry['input']}: {', '.join(failed_steps)}")
+                self.state.update(
+                    key,
+                    status=FAILED if failed_steps else DONE,
+                    puuid=result.get('puuid'),
+                    matches=fetch.get('matches', 0),
+                    skipped=fetch.get('skipped', 0),
+                    failedItems=len(fetch.get('failed', [])),
+                    steps=steps,
+                    error=f"Failed steps: {', '.join(failed_steps)}" if failed_steps else None,
+                    finishedAt=datetime.utcnow().isoformat()
+                )
+            except asyncio.CancelledError:
+                self.state.update(key, status=PENDING)
+                raise
+            except Exception as e:
+                print(f"❌ Backfill failed for {entry['input']}: {e}")
+                self.state.update(key, status=FAILED, error=str(e), finishedAt=datetime.utcnow().isoformat())
+            finally:
+                self.running.pop(key, None)
+                self.finished += 1
+
+    def status_line(self, total: int) -> str:
+        elapsed = time.monotonic() - self.started
+        counts = {}
+        for entry in self.state.players.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        rate = self.matches / (elapsed / 60) if elapsed > 0 else 0.0
+
+        remaining = total - self.finished
+        if self.finished and remaining:
+            eta = f"{(elapsed / self.finished) * remaining / 60:.1f}m"
+        elif not remaining:
+            eta = 'done'
+        else:
+            eta = 'n/a'
+
+        return (
+            f"[backfill] {counts.get(DONE, 0)} done, {counts.get(FAILED, 0)} failed, "
+            f"{len(self.running)} running, {counts.get(PENDING, 0)} pending | "
+            f"{self.matches} matches in {elapsed / 60:.1f}m ({rate:.1f}/min) | ETA {eta}"
+        )
+
+    async def report_progress(self, total: int, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.status_line(total))
+
+    async def run(self, interval: float) -> Dict:
+        keys = self.runnable()
+        print(f"[backfill] {len(keys)} players to ingest ({len(self.state.players) - len(keys)} already done or out of attempts)")
+        if not keys:
+            return self.summary()
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        reporter = asyncio.create_task(self.report_progress(len(keys), interval))
+        try:
+            await asyncio.gather(*(self.run_player(key, semaphore) for key in keys))
+        finally:
+            reporter.cancel()
+            print(self.status_line(len(keys)))
+        return self.summary()
+
+    def summary(self) -> Dict:
+        counts = {}
+        for entry in self.state.players.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return {'players': counts, 'matches': self.matches, 'elapsedSeconds': round(time.monotonic() - self.started, 1)}
+
+
+def read_players(args) -> List[str]:
+    players = list(args.players)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            players.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return players
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill many players into DynamoDB/MongoDB")
+    parser.add_argument('players', nargs='*', help="Riot IDs (Name#TAG) or PUUIDs")
+    parser.add_argument('--file', help="File with one Riot ID or PUUID per line")
+    parser.add_argument('--state', default='backfill_state.json', help="Checkpoint file (default: backfill_state.json)")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('BACKFILL_CONCURRENCY', '2')), help="Players ingested at once")
+    parser.add_argument('--max-attempts', type=int, default=3, help="Attempts per player before giving up")
+    parser.add_argument('--match-count', type=int, default=20, help="Recent matches per player on a first sync")
+    parser.add_argument('--full-season', action='store_true', help="Walk each player's whole season")
+    parser.add_argument('--compact-timelines', action='store_true', help="Store compact timelines only")
+    parser.add_argument('--no-save-local', action='store_true', help="Skip the local archive")
+    parser.add_argument('--match-concurrency', type=int, default=None, help="In-flight match requests per player")
+    parser.add_argument('--interval', type=float, default=15.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    state = BackfillState(Path(args.state))
+    for value in read_players(args):
+        state.add(value)
+    if not state.players:
+        parser.error("no players given (pass Riot IDs/PUUIDs or --file)")
+    state.save()
+
+    service = PlayerDataService()
+    backfill = Backfill(
+        service,
+        state,
+        options={
+            'match_count': args.match_count,
+            'full_season': args.full_season,
+            'compact_timelines': args.compact_timelines,
+            'save_local': not args.no_save_local,
+            'concurrency': args.match_concurrency
+        },
+        concurrency=max(1, args.concurrency),
+        max_attempts=args.max_attempts
+    )
+    try:
+        summary = await backfill.run(args.interval)
+    finally:
+        await service.riot_client.aclose()
+
+    print(json.dumps(summary, indent=2))
+    print(f"State saved to {args.state}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
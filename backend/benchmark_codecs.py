@@ -0,0 +1,94 @@
+"""
+Codec microbenchmark on a synthetic 100-match payload
+- Write path: json.loads + recursive float->Decimal walk vs json.loads(parse_float=Decimal)
+- Read path: boto3 TypeDeserializer + recursive Decimal->float walk vs NativeTypeDeserializer
+
+Usage: python benchmark_codecs.py [match_count] [repeats]
+"""
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from services.dynamo_codec import NativeTypeDeserializer, loads_for_dynamo
+
+
+def synthetic_match(index: int) -> dict:
+    """Roughly match-v5 shaped: 10 participants with int stats, float challenges and perks"""
+    rng = random.Random(index)
+    participants = []
+    for p in range(10):
+        participant = {f'stat{k}': rng.randint(0, 50000) for k in range(90)}
+        participant.update({
+            'puuid': f'puuid-{p}',
+            'championName': f'Champion{rng.randint(1, 160)}',
+            'teamPosition': rng.choice(['TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY']),
+            'win': p < 5,
+            'challenges': {f'challenge{k}': round(rng.uniform(0, 100), 6) for k in range(60)},
+            'perks': {'styles': [{'selections': [{'perk': rng.randint(8000, 9000), 'var1': rng.randint(0, 500)} for _ in range(4)]}]}
+        })
+        participants.append(participant)
+    return {
+        'metadata': {'matchId': f'NA1_{index}', 'participants': [f'puuid-{p}' for p in range(10)]},
+        'info': {'gameCreation': 1700000000000 + index, 'gameDuration': rng.randint(900, 2400), 'participants': participants}
+    }
+
+
+def convert_floats(obj):
+    """The per-module walker the codec layer replaced (write path)"""
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    if isinstance(obj, dict):
+        return {k: convert_floats(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [convert_floats(item) for item in obj]
+    return obj
+
+
+def convert_decimals(obj):
+    """The per-module walker the codec layer replaced (read path)"""
+    if isinstance(obj, dict):
+        return {k: convert_decimals(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [convert_decimals(item) for item in obj]
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return obj
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    match_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    raw = [json.dumps(synthetic_match(i)).encode('utf-8') for i in range(match_count)]
+    print(f"Payload: {match_count} matches, {sum(len(r) for r in raw) / 1024 / 1024:.1f} MB of JSON (best of {repeats})")
+
+    # Write path: Riot JSON -> DynamoDB-ready item
+    walker = best_of(repeats, lambda: [convert_floats(json.loads(r)) for r in raw])
+    codec = best_of(repeats, lambda: [loads_for_dynamo(r) for r in raw])
+    print(f"  write  walker {walker:8.1f} ms   parse_float=Decimal {codec:8.1f} ms   ({walker / codec:.1f}x)")
+
+    # Read path: low-level wire item -> native dict
+    serializer = TypeSerializer()
+    wire = [{'data': serializer.serialize(loads_for_dynamo(r))} for r in raw]
+    boto_deserializer = TypeDeserializer()
+    native_deserializer = NativeTypeDeserializer()
+    walker = best_of(repeats, lambda: [convert_decimals({k: boto_deserializer.deserialize(v) for k, v in item.items()}) for item in wire])
+    codec = best_of(repeats, lambda: [{k: native_deserializer.deserialize(v) for k, v in item.items()} for item in wire])
+    print(f"  read   walker {walker:8.1f} ms   native deserializer {codec:8.1f} ms   ({walker / codec:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
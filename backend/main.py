@@ -2,10 +2,13 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
 from fastapi import UploadFile, File
+import asyncio
 import base64
 import os
 import logging
+import threading
 from dotenv import load_dotenv
 
 from services.riot_api import RiotAPIClient
@@ -15,6 +18,10 @@ from services.coaching_agent import CoachingAgent
 from services.match_chat_agent import MatchChatAgent
 from services.year_recap_chat_agent import YearRecapChatAgent
 from services.timeline_aggregator import TimelineAggregator
+from services.payload_migration import migrate_match_payloads
+from services.data_executor import run_blocking, shutdown_data_executor
+from services.match_repository import get_match_repository
+from services.player_index import backfill_missing_player_names, get_player_index
 from services.s3_service import S3Service
 from services.demo_data import (
     DEMO_PLAYER,
@@ -22,7 +29,7 @@ from services.demo_data import (
     DEMO_INSIGHTS,
     DEMO_STRENGTHS_WEAKNESSES
 )
-from api.player_api import router as player_router
+from api.player_api import router as player_router, player_service, job_manager
 from api.analytics_api import router as analytics_router
 
 # Configure logging
@@ -34,7 +41,59 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-app = FastAPI(title="Rift Rewind API", version="1.0.0")
+
+def log_background_failure(task: asyncio.Task):
+    """Done-callback for fire-and-forget startup tasks, so their errors are not lost"""
+    if not task.cancelled() and task.exception():
+        logger.warning(f"Background task {task.get_name()} failed: {task.exception()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled Riot API connections on startup and close them on shutdown"""
+    await riot_client.open()
+    await player_service.riot_client.open()
+
+    # Opt-in background rewrite of stored match items into DYNAMO_MATCH_PAYLOAD
+    migration, migration_stop = None, threading.Event()
+    if os.getenv('DYNAMO_MATCH_PAYLOAD_MIGRATE', 'false').lower() == 'true':
+        migration = asyncio.create_task(asyncio.to_thread(migrate_match_payloads, stop=migration_stop))
+
+    # Warm the player name index for search/autocomplete without delaying startup
+    index_warmup = asyncio.create_task(run_blocking(get_player_index().ensure_fresh), name='player-index-warmup')
+    index_warmup.add_done_callback(log_background_failure)
+
+    # Name items for players stored before ingestion wrote them (a no-op once the marker exists)
+    name_backfill, name_backfill_stop = None, threading.Event()
+    if os.getenv('PLAYER_NAME_BACKFILL_ON_STARTUP', 'true').lower() == 'true':
+        name_backfill = asyncio.create_task(
+            asyncio.to_thread(backfill_missing_player_names, stop=name_backfill_stop),
+            name='player-name-backfill'
+        )
+        name_backfill.add_done_callback(log_background_failure)
+
+    yield
+
+    # Errors were logged by the done-callback; cancel a load that is still running
+    index_warmup.cancel()
+    await asyncio.gather(index_warmup, return_exceptions=True)
+    if name_backfill is not None:
+        name_backfill_stop.set()
+        await asyncio.gather(name_backfill, return_exceptions=True)
+
+    if migration is not None:
+        migration_stop.set()
+        try:
+            await migration
+        except Exception as e:
+            logger.warning(f"Match payload migration failed: {e}")
+    await job_manager.shutdown()
+    await riot_client.aclose()
+    await player_service.riot_client.aclose()
+    shutdown_data_executor()
+
+
+app = FastAPI(title="Rift Rewind API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware for React frontend
 app.add_middleware(
@@ -165,6 +224,24 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/data")
+async def data_health_check():
+    """Match list cache (hits, misses, bytes) and player name index statistics"""
+    return {"status": "healthy", **get_match_repository().stats(), "playerIndex": get_player_index().stats()}
+
+
+@app.get("/health/riot")
+async def riot_health_check():
+    """Riot API circuit breaker states (per host), scheduler queue depths and cache statistics"""
+    health = riot_client.get_health()
+    open_circuits = [host for host, circuit in health['circuits'].items() if circuit['state'] != 'closed']
+    return {
+        "status": "degraded" if open_circuits else "healthy",
+        "openCircuits": open_circuits,
+        **health
+    }
+
+
 @app.post("/api/player/lookup")
 async def lookup_player(request: PlayerRequest):
     """Look up a player by Riot ID (game name + tag line)"""
@@ -337,7 +414,8 @@ async def get_year_recap_heatmap(request: YearRecapHeatmapRequest):
     """
     try:
         logger.info(f"Generating year recap heatmap for PUUID: {request.puuid[:8]}...")
-        heatmap_data = timeline_aggregator.generate_heatmap_data(
+        heatmap_data = await run_blocking(
+            timeline_aggregator.generate_heatmap_data,
             target_puuid=request.puuid,
             player_name=request.player_name
         )
@@ -363,7 +441,8 @@ async def year_recap_chat(request: YearRecapChatRequest):
     """
     try:
         logger.info(f"Year recap chat request: {request.message[:50]}...")
-        response = year_recap_chat_agent.chat(
+        response = await run_blocking(
+            year_recap_chat_agent.chat,
             message=request.message,
             year_recap_data=request.year_recap_data,
             puuid=request.puuid,
@@ -509,7 +588,8 @@ async def upload_recap_image(request: UploadImageRequest):
         image_bytes = base64.b64decode(image_data)
 
         # Upload to S3
-        url = s3_service.upload_recap_image(
+        url = await run_blocking(
+            s3_service.upload_recap_image,
             file_content=image_bytes,
             puuid=request.puuid,
             recap_type=request.recap_type
@@ -546,7 +626,8 @@ async def upload_recap_video(request: UploadVideoRequest):
         video_bytes = base64.b64decode(video_data)
 
         # Upload to S3
-        url = s3_service.upload_recap_video(
+        url = await run_blocking(
+            s3_service.upload_recap_video,
             file_content=video_bytes,
             puuid=request.puuid,
             file_extension=request.file_extension
@@ -0,0 +1,56 @@
+"""
+Migrate stored match#<id> items to the configured payload format
+- 'zstd' / 'gzip': full match JSON as a compressed binary attribute (dataGz + dataFormat)
+- 'map': back to the nested map (rollback)
+- Only items not already in the target format are rewritten, so it can be stopped and rerun
+
+Usage:
+    python migrate_match_payloads.py --codec zstd --dry-run
+    python migrate_match_payloads.py --codec zstd
+"""
+
+import argparse
+import json
+import os
+
+from dotenv import load_dotenv
+
+from services.payload_migration import migrate_match_payloads
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Rewrite match items into a compressed (or map) payload format")
+    parser.add_argument('--codec', choices=['zstd', 'gzip', 'map'], default=os.getenv('DYNAMO_MATCH_PAYLOAD') or None,
+                        help="Target format (default: DYNAMO_MATCH_PAYLOAD)")
+    parser.add_argument('--page-size', type=int, default=100, help="Items per Scan page")
+    parser.add_argument('--limit', type=int, default=None, help="Stop after this many items")
+    parser.add_argument('--dry-run', action='store_true', help="Measure the savings without writing")
+    args = parser.parse_args()
+    if not args.codec:
+        parser.error("pass --codec or set DYNAMO_MATCH_PAYLOAD")
+
+    def on_page(report):
+        print(f"  scanned {report['scanned']}, {'would rewrite' if args.dry_run else 'rewrote'} {report['migrated']} "
+              f"({report['bytesBefore'] / 1024 / 1024:.1f} MB -> {report['bytesAfter'] / 1024 / 1024:.1f} MB)")
+
+    print(f"Migrating match payloads to '{args.codec}'{' (dry run)' if args.dry_run else ''}...")
+    report = migrate_match_payloads(
+        codec=args.codec,
+        page_size=args.page_size,
+        limit=args.limit,
+        dry_run=args.dry_run,
+        on_page=on_page
+    )
+
+    for failure in report['failed']:
+        print(f"  ⚠️ {failure['key']}: {failure['error']}")
+    if report['bytesBefore']:
+        print(f"✅ Payload bytes {report['bytesBefore']:,} -> {report['bytesAfter']:,} "
+              f"({report['bytesAfter'] / report['bytesBefore']:.0%})")
+    print(json.dumps({**report, 'failed': len(report['failed'])}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
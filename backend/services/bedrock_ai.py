@@ -2,6 +2,8 @@ import boto3
 import json
 from typing import Dict, List, Optional
 
+from services.data_executor import run_blocking
+
 
 class BedrockAIService:
     """Service for interacting with Amazon Bedrock AI models"""
@@ -35,7 +37,8 @@ class BedrockAIService:
         })
 
         try:
-            response = self.bedrock.invoke_model(
+            response = await run_blocking(
+                self.bedrock.invoke_model,
                 modelId=self.model_id,
                 body=body
             )
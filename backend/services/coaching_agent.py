@@ -5,6 +5,7 @@ import boto3
 import json
 from typing import Dict, List, Optional
 from services.agent_tools import AgentTools
+from services.data_executor import run_blocking
 
 
 class CoachingAgent:
@@ -265,7 +266,8 @@ Think step by step and use tools to gather data before giving advice."""
             "tools": self.tool_definitions
         }
 
-        response = self.bedrock.invoke_model(
+        response = await run_blocking(
+            self.bedrock.invoke_model,
             modelId=self.model_id,
             body=json.dumps(body)
         )
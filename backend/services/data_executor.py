@@ -0,0 +1,51 @@
+"""
+Blocking I/O offload for async FastAPI handlers
+- One bounded, process-wide thread pool for the synchronous boto3 (DynamoDB, S3, Bedrock)
+  and pymongo calls that async routes make
+- run_blocking() awaits such a call without holding the event loop, so one slow page or
+  model call no longer stalls every other in-flight request on the worker
+- Calls beyond DATA_EXECUTOR_WORKERS queue instead of spawning more threads
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# Process-wide executor (sized once; botocore and pymongo clients are thread-safe)
+_data_executor = None
+
+
+def get_data_executor() -> ThreadPoolExecutor:
+    """Get or create the shared blocking-I/O executor singleton"""
+    global _data_executor
+    if _data_executor is None:
+        _data_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('DATA_EXECUTOR_WORKERS', '16')),
+            thread_name_prefix='data-io'
+        )
+    return _data_executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking call on the shared data executor and await its result
+
+    Args:
+        fn: Synchronous callable (service method, boto3/pymongo call, ...)
+        *args, **kwargs: Passed through to fn
+
+    Returns:
+        Whatever fn returns (exceptions propagate to the awaiting handler)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_data_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_data_executor():
+    """Stop the executor on app shutdown (waits for running calls)"""
+    global _data_executor
+    if _data_executor is not None:
+        _data_executor.shutdown(wait=True)
+        _data_executor = None
@@ -0,0 +1,234 @@
+"""
+DynamoDB Codecs
+- Riot JSON is decoded straight to DynamoDB-ready types (parse_float=Decimal), no float walk
+- DynamoDB items are read straight into native int/float with a custom TypeDeserializer
+- Low-level client helpers (get_item, item_size) for native items and page sizes; paginated reads live in MatchRepository
+- One shared client and one shared resource per process (the resource backs DynamoBatchWriter)
+- Optional compressed match payloads (dataGz binary + dataFormat marker), decoded on first access
+- Replaces the per-module recursive float/Decimal walkers
+"""
+
+import gzip
+import json
+import os
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Compressed payload attributes (items written as a plain map keep `data` instead)
+PAYLOAD_ATTRIBUTE = 'dataGz'
+FORMAT_ATTRIBUTE = 'dataFormat'
+PAYLOAD_CODECS = {'zstd': 'json+zstd', 'gzip': 'json+gzip'}
+
+
+def loads_for_dynamo(content) -> Any:
+    """Decode JSON with floats as Decimal so the result can be written to DynamoDB as-is"""
+    return json.loads(content, parse_float=Decimal)
+
+
+def load_for_dynamo(fp) -> Any:
+    """json.load counterpart of loads_for_dynamo"""
+    return json.load(fp, parse_float=Decimal)
+
+
+def json_default(obj):
+    """json.dump(s) default= hook for Decimal values (written without a fraction -> int, otherwise float)"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class NativeTypeDeserializer(TypeDeserializer):
+    """
+    TypeDeserializer that returns int/float for numbers instead of Decimal.
+
+    Also dispatches the common types (S, N, M, L, BOOL, NULL) directly instead
+    of through the base class's per-value getattr lookup.
+    """
+
+    def deserialize(self, value: Dict) -> Any:
+        for dynamodb_type, data in value.items():
+            if dynamodb_type == 'S':
+                return data
+            if dynamodb_type == 'N':
+                return self._deserialize_n(data)
+            if dynamodb_type == 'M':
+                return {k: self.deserialize(v) for k, v in data.items()}
+            if dynamodb_type == 'L':
+                return [self.deserialize(v) for v in data]
+            if dynamodb_type == 'BOOL':
+                return data
+            if dynamodb_type == 'NULL':
+                return None
+            if dynamodb_type == 'B':
+                return data
+            return super().deserialize(value)
+
+    def _deserialize_n(self, value: str):
+        if '.' in value or 'e' in value or 'E' in value:
+            return float(value)
+        return int(value)
+
+
+_deserializer = NativeTypeDeserializer()
+_serializer = TypeSerializer()
+
+
+def payload_codec() -> str:
+    """DYNAMO_MATCH_PAYLOAD: 'map' (nested map, default), 'zstd' or 'gzip' (compressed binary)"""
+    codec = os.getenv('DYNAMO_MATCH_PAYLOAD', 'map')
+    if codec != 'map' and codec not in PAYLOAD_CODECS:
+        raise ValueError(f"Unknown match payload codec: {codec}")
+    return codec
+
+
+def encode_payload(data, codec: str) -> bytes:
+    """Compact JSON of a payload, compressed with zstd or gzip"""
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=json_default).encode('utf-8')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed")
+        return zstandard.ZstdCompressor(level=int(os.getenv('DYNAMO_MATCH_PAYLOAD_LEVEL', '6'))).compress(raw)
+    return gzip.compress(raw, compresslevel=int(os.getenv('DYNAMO_MATCH_PAYLOAD_LEVEL', '6')))
+
+
+def decode_payload(blob: bytes, payload_format: str, for_dynamo: bool = False) -> Any:
+    """
+    Decode a dataGz attribute
+
+    Args:
+        blob: Compressed payload
+        payload_format: The item's dataFormat marker
+        for_dynamo: Decode floats as Decimal (for writing the payload back as a map)
+    """
+    if payload_format == PAYLOAD_CODECS['zstd']:
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    elif payload_format == PAYLOAD_CODECS['gzip']:
+        raw = gzip.decompress(blob)
+    else:
+        raise ValueError(f"Unknown payload format: {payload_format}")
+    return loads_for_dynamo(raw) if for_dynamo else json.loads(raw)
+
+
+def pack_payload(item: Dict, codec: Optional[str] = None) -> Dict:
+    """
+    Store an item's `data` in the configured payload format
+
+    Args:
+        item: Item with a `data` attribute (Decimal numbers, as written to DynamoDB)
+        codec: 'map', 'zstd' or 'gzip' (default: DYNAMO_MATCH_PAYLOAD)
+
+    Returns:
+        The item unchanged for 'map', else a copy with dataGz + dataFormat instead of data
+    """
+    codec = codec or payload_codec()
+    if codec == 'map':
+        return item
+    packed = {key: value for key, value in item.items() if key != 'data'}
+    packed[PAYLOAD_ATTRIBUTE] = encode_payload(item['data'], codec)
+    packed[FORMAT_ATTRIBUTE] = PAYLOAD_CODECS[codec]
+    return packed
+
+
+class PayloadItem(dict):
+    """
+    Native item whose compressed payload is decoded into `data` on first access.
+
+    item['data'], item.get('data') and 'data' in item behave as for a plain
+    map item; the blob is only decompressed and parsed when a caller reads it.
+    """
+
+    def __missing__(self, key):
+        if key == 'data' and PAYLOAD_ATTRIBUTE in self.keys():
+            data = decode_payload(self.pop(PAYLOAD_ATTRIBUTE), self.pop(FORMAT_ATTRIBUTE, None))
+            self['data'] = data
+            return data
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or (key == 'data' and dict.__contains__(self, PAYLOAD_ATTRIBUTE))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
+def deserialize_item(item: Dict) -> Dict:
+    """Low-level item ({attr: {type: value}}) -> native Python dict (PayloadItem if the payload is compressed)"""
+    native = {key: _deserializer.deserialize(value) for key, value in item.items()}
+    return PayloadItem(native) if PAYLOAD_ATTRIBUTE in native else native
+
+
+def _value_size(value: Dict) -> int:
+    for dynamodb_type, data in value.items():
+        if dynamodb_type in ('S', 'B'):
+            # Characters rather than UTF-8 bytes for strings; Riot data is almost all ASCII
+            return len(data)
+        if dynamodb_type == 'N':
+            return len(data) // 2 + 1
+        if dynamodb_type == 'M':
+            return 3 + sum(len(k) + _value_size(v) for k, v in data.items())
+        if dynamodb_type == 'L':
+            return 3 + sum(_value_size(v) + 1 for v in data)
+        if dynamodb_type in ('SS', 'NS', 'BS'):
+            return sum(len(v) for v in data)
+        return 1
+
+
+def item_size(item: Dict) -> int:
+    """Approximate stored size of a low-level item in bytes, by DynamoDB's item size rules"""
+    return sum(len(name) + _value_size(value) for name, value in item.items())
+
+
+def serialize_values(values: Dict) -> Dict:
+    """Native values -> low-level attribute values (keys, ExpressionAttributeValues)"""
+    return {key: _serializer.serialize(value) for key, value in values.items()}
+
+
+# Process-wide low-level client (botocore clients are thread-safe)
+_dynamodb_client = None
+
+# Process-wide resource for the batched writer (its client applies the Decimal/Binary transforms)
+_dynamodb_resource = None
+
+
+def get_dynamodb_client():
+    """Get or create the shared low-level DynamoDB client singleton"""
+    global _dynamodb_client
+    if _dynamodb_client is None:
+        _dynamodb_client = boto3.client('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+    return _dynamodb_client
+
+
+def get_dynamodb_resource():
+    """Get or create the shared DynamoDB resource singleton (for DynamoBatchWriter)"""
+    global _dynamodb_resource
+    if _dynamodb_resource is None:
+        _dynamodb_resource = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+    return _dynamodb_resource
+
+
+def get_item(
+    table_name: str,
+    key: Dict,
+    projection: Optional[str] = None,
+    client=None,
+    names: Optional[Dict[str, str]] = None
+) -> Optional[Dict]:
+    """Low-level GetItem returning a native item (or None)"""
+    client = client or get_dynamodb_client()
+    params = {'TableName': table_name, 'Key': serialize_values(key)}
+    if projection:
+        params['ProjectionExpression'] = projection
+    if names:
+        params['ExpressionAttributeNames'] = names
+    item = client.get_item(**params).get('Item')
+    return deserialize_item(item) if item else None
@@ -0,0 +1,221 @@
+"""
+Batched DynamoDB Writer
+- Packs items into 25-item BatchWriteItem requests
+- Retries UnprocessedItems with exponential backoff and jitter
+- Runs batches concurrently on a thread pool, throttled by a shared write-capacity budget
+- Reports consumed capacity, batch count, retries and failed keys
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# DynamoDB BatchWriteItem accepts at most 25 put/delete requests
+BATCH_WRITE_LIMIT = 25
+
+
+class WriteCapacityBudget:
+    """
+    Token bucket of write capacity units per second, shared by every writer.
+
+    capacity <= 0 disables throttling (e.g. on-demand tables). Batches reserve
+    their estimated WCUs up front and settle the difference once DynamoDB
+    reports what they actually consumed.
+    """
+
+    def __init__(self, capacity: Optional[float] = None):
+        if capacity is None:
+            capacity = float(os.getenv('DYNAMO_WRITE_CAPACITY', '0'))
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity)
+        self.updated = now
+
+    def acquire(self, units: float):
+        """Block until `units` WCUs are available (a batch larger than the budget waits for a full bucket)"""
+        if not self.enabled:
+            return
+        units = min(units, self.capacity)
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= units:
+                    self.tokens -= units
+                    return
+                wait = (units - self.tokens) / self.capacity
+            time.sleep(wait)
+
+    def settle(self, reserved: float, consumed: float):
+        """Return over-reserved units (or charge under-reserved ones)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + min(reserved, self.capacity) - consumed)
+
+
+def item_size(item: Dict) -> int:
+    """Approximate item size in bytes (binary attributes count their raw length)"""
+    binary = {key: value for key, value in item.items() if isinstance(value, (bytes, bytearray))}
+    rest = {key: value for key, value in item.items() if key not in binary}
+    return len(json.dumps(rest, default=str)) + sum(len(key) + len(value) for key, value in binary.items())
+
+
+def estimate_write_units(item: Dict) -> int:
+    """One WCU per started KB of item size"""
+    return max(1, math.ceil(item_size(item) / 1024))
+
+
+class DynamoBatchWriter:
+    """
+    Buffered, concurrent BatchWriteItem writer for one table.
+
+    put() buffers items and hands every full 25-item batch to the thread pool;
+    close() flushes the remainder, waits for all batches and returns the
+    report. Items with the same key in one batch are collapsed (last wins),
+    since DynamoDB rejects duplicate keys within a request. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        dynamodb,
+        table_name: str,
+        key_attributes: Tuple[str, ...] = ('puuid', 'dataType'),
+        max_workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        budget: Optional[WriteCapacityBudget] = None
+    ):
+        # The resource's client applies the high-level type transforms (Decimal, Binary, ...)
+        self.client = dynamodb.meta.client
+        self.table_name = table_name
+        self.key_attributes = key_attributes
+        self.max_workers = max_workers or int(os.getenv('DYNAMO_WRITE_WORKERS', '4'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('DYNAMO_WRITE_MAX_RETRIES', '8'))
+        self.budget = budget or get_write_budget()
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='dynamo-writer')
+        # Bounds buffered memory: at most two batches queued per worker
+        self._slots = threading.BoundedSemaphore(self.max_workers * 2)
+        self._lock = threading.Lock()
+        self._buffer: Dict[Tuple, Dict] = {}
+        self._futures: List[Future] = []
+        self._started = time.perf_counter()
+
+        self._report = {
+            'items': 0,
+            'batches': 0,
+            'unprocessedRetries': 0,
+            'consumedCapacity': 0.0,
+            'failed': []
+        }
+
+    def put(self, item: Dict):
+        """Buffer an item; blocks while too many batches are in flight"""
+        key = tuple(item[attr] for attr in self.key_attributes)
+        with self._lock:
+            self._buffer[key] = item
+            if len(self._buffer) < BATCH_WRITE_LIMIT:
+                return
+            batch = list(self._buffer.values())
+            self._buffer = {}
+        self._submit(batch)
+
+    def put_many(self, items: List[Dict]):
+        for item in items:
+            self.put(item)
+
+    def _submit(self, batch: List[Dict]):
+        self._slots.acquire()
+        future = self._executor.submit(self._write_batch, batch)
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._futures.append(future)
+
+    def _write_batch(self, batch: List[Dict]):
+        units = sum(estimate_write_units(item) for item in batch) if self.budget.enabled else 0
+        self.budget.acquire(units)
+
+        requests = [{'PutRequest': {'Item': item}} for item in batch]
+        consumed = 0.0
+        retries = 0
+        try:
+            while requests:
+                response = self.client.batch_write_item(
+                    RequestItems={self.table_name: requests},
+                    ReturnConsumedCapacity='TOTAL'
+                )
+                consumed += sum(c.get('CapacityUnits', 0) for c in response.get('ConsumedCapacity', []))
+                requests = response.get('UnprocessedItems', {}).get(self.table_name, [])
+                if not requests:
+                    break
+                if retries >= self.max_retries:
+                    raise RuntimeError(f"{len(requests)} items still unprocessed after {retries} retries")
+                retries += 1
+                time.sleep(random.uniform(0, min(5.0, 0.05 * (2 ** retries))))
+        except Exception as e:
+            logger.warning(f"BatchWriteItem to {self.table_name} failed: {e}")
+            failed = [
+                {'key': {attr: r['PutRequest']['Item'].get(attr) for attr in self.key_attributes}, 'error': str(e)}
+                for r in requests or [{'PutRequest': {'Item': item}} for item in batch]
+            ]
+        else:
+            failed = []
+        finally:
+            self.budget.settle(units, consumed)
+
+        with self._lock:
+            self._report['batches'] += 1
+            self._report['items'] += len(batch) - len(failed)
+            self._report['unprocessedRetries'] += retries
+            self._report['consumedCapacity'] += consumed
+            self._report['failed'].extend(failed)
+
+    def close(self) -> Dict:
+        """
+        Flush buffered items and wait for every batch
+
+        Returns:
+            Dict with items written, batches, unprocessedRetries,
+            consumedCapacity (WCUs), failed ({key, error}) and durationMs
+        """
+        with self._lock:
+            batch = list(self._buffer.values())
+            self._buffer = {}
+        if batch:
+            self._submit(batch)
+
+        for future in list(self._futures):
+            future.result()
+        self._executor.shutdown(wait=True)
+
+        report = dict(self._report)
+        report['consumedCapacity'] = round(report['consumedCapacity'], 1)
+        report['durationMs'] = round((time.perf_counter() - self._started) * 1000, 1)
+        return report
+
+
+# Process-wide budget (the table's write capacity is shared by every ingestion run)
+_write_budget = None
+
+
+def get_write_budget() -> WriteCapacityBudget:
+    """Get or create the shared write-capacity budget singleton"""
+    global _write_budget
+    if _write_budget is None:
+        _write_budget = WriteCapacityBudget()
+    return _write_budget
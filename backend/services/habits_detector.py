@@ -3,10 +3,10 @@ Habits Detection System
 Identifies persistent gameplay patterns (both good and bad habits)
 """
 import logging
+from itertools import islice
 from typing import Dict, List, Optional
-import boto3
-from boto3.dynamodb.conditions import Key
 import statistics
+from services.match_repository import get_match_repository
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +14,6 @@ logger = logging.getLogger(__name__)
 class HabitsDetector:
     """Detects persistent gameplay habits across matches"""
 
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        self.table = self.dynamodb.Table('lol-player-data')
-
     def detect_habits(
         self,
         puuid: str,
@@ -72,17 +68,10 @@ class HabitsDetector:
     def _fetch_matches(self, puuid: str, time_range: Optional[int]) -> List[Dict]:
         """Fetch match data from DynamoDB"""
         try:
-            response = self.table.query(
-                KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-            )
-
-            matches = response['Items']
+            items = get_match_repository().matches(puuid)
 
             # Limit to time_range if specified
-            if time_range:
-                matches = matches[:time_range]
-
-            return matches
+            return list(islice(items, time_range) if time_range else items)
 
         except Exception as e:
             logger.error(f"Error fetching matches: {e}", exc_info=True)
@@ -117,9 +106,9 @@ class HabitsDetector:
             patterns['total_games'] += 1
 
             # Vision patterns
-            vision_score = int(participant.get('visionScore', 0))
-            control_wards = int(participant.get('visionWardsBoughtInGame', 0))
-            wards_placed = int(participant.get('wardsPlaced', 0))
+            vision_score = participant.get('visionScore', 0)
+            control_wards = participant.get('visionWardsBoughtInGame', 0)
+            wards_placed = participant.get('wardsPlaced', 0)
 
             patterns['vision_data'].append({
                 'vision_score': vision_score,
@@ -132,12 +121,12 @@ class HabitsDetector:
 
             # Early game aggression
             challenges = participant.get('challenges', {})
-            early_kills = int(challenges.get('killsBeforeLevel10', 0) or 0)
+            early_kills = challenges.get('killsBeforeLevel10', 0) or 0
             patterns['early_kills'].append(early_kills)
 
             # Late game deaths (after 25 minutes)
-            deaths = int(participant.get('deaths', 0))
-            game_duration_seconds = int(match_data.get('info', {}).get('gameDuration', 0))
+            deaths = participant.get('deaths', 0)
+            game_duration_seconds = match_data.get('info', {}).get('gameDuration', 0)
             game_duration_minutes = game_duration_seconds / 60
 
             if game_duration_minutes > 25:
@@ -147,13 +136,13 @@ class HabitsDetector:
                 patterns['late_deaths'].append(estimated_late_deaths)
 
             # Objective participation
-            dragon_takedowns = int(challenges.get('dragonTakedowns', 0) or 0)
-            baron_kills = int(challenges.get('teamBaronKills', 0) or 0)
+            dragon_takedowns = challenges.get('dragonTakedowns', 0) or 0
+            baron_kills = challenges.get('teamBaronKills', 0) or 0
             patterns['objective_participation'].append(dragon_takedowns + baron_kills)
 
             # CS and gold efficiency
-            cs = int(participant.get('totalMinionsKilled', 0)) + int(participant.get('neutralMinionsKilled', 0))
-            gold = int(participant.get('goldEarned', 0))
+            cs = participant.get('totalMinionsKilled', 0) + participant.get('neutralMinionsKilled', 0)
+            gold = participant.get('goldEarned', 0)
 
             if game_duration_minutes > 0:
                 cs_per_min = cs / game_duration_minutes
@@ -162,13 +151,13 @@ class HabitsDetector:
                 patterns['gold_per_min'].append(gold_per_min)
 
             # KDA and damage
-            kills = int(participant.get('kills', 0))
-            assists = int(participant.get('assists', 0))
+            kills = participant.get('kills', 0)
+            assists = participant.get('assists', 0)
             kda = (kills + assists) / max(deaths, 1)
             patterns['kda'].append(kda)
 
             # Damage share
-            damage_share = float(challenges.get('teamDamagePercentage', 0) or 0) * 100
+            damage_share = (challenges.get('teamDamagePercentage', 0) or 0) * 100
             patterns['damage_share'].append(damage_share)
 
             # Game duration
@@ -178,7 +167,7 @@ class HabitsDetector:
             if participant.get('firstBloodKill'):
                 patterns['first_blood_games'] += 1
 
-            pentakills = int(participant.get('pentaKills', 0))
+            pentakills = participant.get('pentaKills', 0)
             patterns['pentakills'] += pentakills
 
             # Wins
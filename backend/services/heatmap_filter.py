@@ -3,11 +3,12 @@ Shared heatmap filtering logic
 Used by both the API endpoint and the year recap chat agent
 """
 import os
-import boto3
-from boto3.dynamodb.conditions import Key
 from pymongo import MongoClient
 import logging
 
+from services.match_repository import get_match_repository
+from services.timeline_store import classify_event, load_player_timelines, participant_id_for
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,17 +36,12 @@ def filter_heatmap_events(puuid: str, event_type: str, champion_name: str = None
         mongo_client = MongoClient(mongo_connection, serverSelectionTimeoutMS=10000)
         mongo_db = mongo_client['lol_timelines']
 
-        # Connect to DynamoDB
-        dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        table = dynamodb.Table('lol-player-data')
-
         logger.info(f"Filtering {event_type} - Champion: {champion_name}, Role: {role}, MatchCount: {match_count}, GameTime: {game_time_start}-{game_time_end}")
 
-        # Get timelines
-        timelines_cursor = mongo_db.timelines.find({'puuid': puuid})
-        timelines = list(timelines_cursor)
+        # Get compact timelines (event tables only, newest match first)
+        timelines_to_process = load_player_timelines(mongo_db, puuid, limit=match_count)
 
-        if not timelines:
+        if not timelines_to_process:
             return {
                 "success": True,
                 "filtered_events": [],
@@ -61,48 +57,47 @@ def filter_heatmap_events(puuid: str, event_type: str, champion_name: str = None
                 }
             }
 
-        # Build match metadata
+        # Champion and role per match: one small projected query over the player's summaries,
+        # or the full match item for players without summaries yet
+        repository = get_match_repository()
+        champion_roles = repository.champion_roles(puuid)
         match_metadata = {}
-        participant_id_map = {}
 
-        timelines_to_process = timelines[:match_count] if match_count else timelines
-
-        for timeline_doc in timelines_to_process:
-            match_id = timeline_doc['matchId']
+        for timeline in timelines_to_process:
+            match_id = timeline['matchId']
 
             try:
-                response = table.query(
-                    KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').eq(f'match#{match_id}')
-                )
-
-                if response['Items']:
-                    match_data = response['Items'][0].get('data', {})
-
-                    # Find participant ID
-                    participants_puuids = match_data.get('metadata', {}).get('participants', [])
-                    for idx, p_uuid in enumerate(participants_puuids, 1):
-                        if p_uuid == puuid:
-                            participant_id_map[match_id] = idx
-                            break
-
-                    # Extract champion and role
-                    participants = match_data.get('info', {}).get('participants', [])
-                    for participant in participants:
-                        if participant.get('puuid') == puuid:
-                            match_metadata[match_id] = {
-                                'champion_name': participant.get('championName', 'Unknown'),
-                                'role': participant.get('teamPosition', 'Unknown')
-                            }
-                            break
+                if match_id not in champion_roles:
+                    match_item = repository.get_match(puuid, match_id)
+                    participants = (match_item or {}).get('data', {}).get('info', {}).get('participants', [])
+                    participant = next((p for p in participants if p.get('puuid') == puuid), None)
+                    if participant is None:
+                        continue
+                    champion_roles[match_id] = {
+                        'championName': participant.get('championName'),
+                        'role': participant.get('teamPosition')
+                    }
+
+                match_metadata[match_id] = {
+                    'champion_name': champion_roles[match_id]['championName'] or 'Unknown',
+                    'role': champion_roles[match_id]['role'] or 'Unknown'
+                }
             except Exception as e:
                 logger.error(f"Error fetching match {match_id}: {e}")
                 continue
 
+        # Participant IDs come from the compact timelines' participant lists
+        participant_id_map = {}
+        for timeline in timelines_to_process:
+            participant_id = participant_id_for(timeline, puuid)
+            if participant_id is not None:
+                participant_id_map[timeline['matchId']] = participant_id
+
         # Filter events
         filtered_events = []
 
-        for timeline_doc in timelines_to_process:
-            match_id = timeline_doc['matchId']
+        for timeline in timelines_to_process:
+            match_id = timeline['matchId']
 
             if match_id not in participant_id_map or match_id not in match_metadata:
                 continue
@@ -116,59 +111,30 @@ def filter_heatmap_events(puuid: str, event_type: str, champion_name: str = None
             if role and metadata['role'] != role:
                 continue
 
-            # Process timeline
-            timeline_data = timeline_doc['data']
-
-            for frame in timeline_data['info']['frames']:
-                for event in frame.get('events', []):
-                    if not event.get('position'):
-                        continue
-
-                    pos = event['position']
-                    timestamp = event['timestamp']
-
-                    # Apply game time filter (timestamp is in milliseconds)
-                    game_time_minutes = timestamp / 60000  # Convert ms to minutes
-                    if game_time_start is not None and game_time_minutes < game_time_start:
-                        continue
-                    if game_time_end is not None and game_time_minutes > game_time_end:
-                        continue
-
-                    event_matched = False
-                    event_data = {
-                        'x': pos['x'],
-                        'y': pos['y'],
-                        'timestamp': timestamp,
-                        'match_id': match_id,
-                        'champion_name': metadata['champion_name'],
-                        'role': metadata['role']
-                    }
-
-                    # Match event type
-                    if event_type == 'deaths':
-                        if event['type'] == 'CHAMPION_KILL' and event.get('victimId') == participant_id:
-                            event_data['killer_id'] = event.get('killerId')
-                            event_matched = True
-                    elif event_type == 'kills':
-                        if event['type'] == 'CHAMPION_KILL' and event.get('killerId') == participant_id:
-                            event_data['victim_id'] = event.get('victimId')
-                            event_matched = True
-                    elif event_type == 'assists':
-                        if event['type'] == 'CHAMPION_KILL' and participant_id in event.get('assistingParticipantIds', []):
-                            event_data['victim_id'] = event.get('victimId')
-                            event_matched = True
-                    elif event_type == 'objectives':
-                        if event['type'] == 'ELITE_MONSTER_KILL' and event.get('killerId') == participant_id:
-                            event_data['monster_type'] = event.get('monsterType')
-                            event_matched = True
-                        elif event['type'] == 'BUILDING_KILL':
-                            assisting = event.get('assistingParticipantIds', [])
-                            if participant_id in assisting or event.get('killerId') == participant_id:
-                                event_data['building_type'] = event.get('buildingType')
-                                event_matched = True
-
-                    if event_matched:
-                        filtered_events.append(event_data)
+            # Process the timeline's positional event table
+            for event in timeline.get('events', []):
+                timestamp = event['timestamp']
+
+                # Apply game time filter (timestamp is in milliseconds)
+                game_time_minutes = timestamp / 60000  # Convert ms to minutes
+                if game_time_start is not None and game_time_minutes < game_time_start:
+                    continue
+                if game_time_end is not None and game_time_minutes > game_time_end:
+                    continue
+
+                classified = classify_event(event, participant_id)
+                if classified is None or classified[0] != event_type:
+                    continue
+
+                filtered_events.append({
+                    'x': event['x'],
+                    'y': event['y'],
+                    'timestamp': timestamp,
+                    'match_id': match_id,
+                    'champion_name': metadata['champion_name'],
+                    'role': metadata['role'],
+                    **classified[1]
+                })
 
         logger.info(f"Filtered to {len(filtered_events)} events from {len(match_metadata)} matches")
 
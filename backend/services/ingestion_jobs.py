@@ -0,0 +1,239 @@
+"""
+Ingestion Job Manager
+- Runs player ingestion (fetch → save → upload) as background jobs
+- Jobs report per-stage progress events that clients can poll or stream (SSE)
+- Duplicate requests (same Riot ID and options) coalesce onto the queued/running job
+- Bounded number of concurrent jobs; finished jobs are kept for a retention window
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# runner(game_name, tag_line, progress=callback, **options) -> process_player result
+JobRunner = Callable[..., Awaitable[Dict]]
+
+
+class JobStatus:
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    FINISHED = (SUCCEEDED, FAILED)
+
+
+def riot_id_key(game_name: str, tag_line: str) -> str:
+    """Riot IDs are case-insensitive, so normalize before coalescing"""
+    return f"{game_name.strip().lower()}#{tag_line.strip().lower()}"
+
+
+def coalesce_key(game_name: str, tag_line: str, options: Dict) -> Tuple[str, Tuple]:
+    """Riot ID plus the options that were set (None means default): only identical requests share a job"""
+    return riot_id_key(game_name, tag_line), tuple(sorted((name, value) for name, value in options.items() if value is not None))
+
+
+class IngestionJob:
+    """State and progress event log for one ingestion run"""
+
+    def __init__(self, game_name: str, tag_line: str, options: Dict):
+        self.id = uuid.uuid4().hex
+        self.key = riot_id_key(game_name, tag_line)
+        self.coalesce_key = coalesce_key(game_name, tag_line, options)
+        self.game_name = game_name
+        self.tag_line = tag_line
+        self.options = options
+
+        self.status = JobStatus.QUEUED
+        self.stage: Optional[str] = None
+        self.stages: Dict[str, Dict] = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.coalesced = 0
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self.events: List[Dict] = []
+        self._subscribers: List[asyncio.Queue] = []
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in JobStatus.FINISHED
+
+    def emit(self, event: str, **data):
+        """Record a progress event and push it to every live subscriber"""
+        payload = {'jobId': self.id, 'event': event, 'timestamp': time.time(), **data}
+        self.events.append(payload)
+        for queue in self._subscribers:
+            queue.put_nowait(payload)
+
+    def report(self, stage: str, status: str, detail: Optional[Dict] = None):
+        """Progress callback handed to PlayerDataService.process_player"""
+        entry = self.stages.setdefault(stage, {})
+        entry['status'] = status
+        if detail:
+            entry.update(detail)
+        if status == 'running':
+            self.stage = stage
+        self.emit('progress', stage=stage, status=status, detail=detail or {})
+
+    async def subscribe(self, keepalive: Optional[float] = None) -> AsyncIterator[Optional[Dict]]:
+        """
+        Replay past events, then yield new ones until the job finishes
+
+        Yields None every `keepalive` seconds without events so streaming
+        responses can send a heartbeat.
+        """
+        # Snapshot and register without awaiting in between so no event is missed
+        backlog = list(self.events)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            for payload in backlog:
+                yield payload
+                if payload['event'] in JobStatus.FINISHED:
+                    return
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield payload
+                if payload['event'] in JobStatus.FINISHED:
+                    return
+        finally:
+            self._subscribers.remove(queue)
+
+    def snapshot(self, include_result: bool = True) -> Dict:
+        data = {
+            'jobId': self.id,
+            'player': f"{self.game_name}#{self.tag_line}",
+            'options': self.options,
+            'status': self.status,
+            'stage': self.stage,
+            'stages': self.stages,
+            'coalesced': self.coalesced,
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+            'error': self.error
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class IngestionJobManager:
+    """
+    Background job queue for player ingestion.
+
+    Jobs run on the event loop as asyncio tasks, at most max_concurrent at a
+    time. While a job for a Riot ID is queued or running, new submissions for
+    the same Riot ID with the same options return that job instead of starting
+    another one; different options (matchCount, fullSeason, ...) get their own job.
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        max_concurrent: Optional[int] = None,
+        retention_seconds: Optional[float] = None
+    ):
+        self.runner = runner
+        self.max_concurrent = max_concurrent or int(os.getenv('INGESTION_MAX_CONCURRENT_JOBS', '2'))
+        self.retention_seconds = (
+            retention_seconds if retention_seconds is not None
+            else float(os.getenv('INGESTION_JOB_RETENTION_SECONDS', '3600'))
+        )
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._active: Dict[Tuple[str, Tuple], IngestionJob] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(self, game_name: str, tag_line: str, **options: Any) -> Tuple[IngestionJob, bool]:
+        """
+        Enqueue an ingestion job, or join the active one for the same Riot ID and options
+
+        Returns:
+            (job, created) where created is False if the request was coalesced
+        """
+        self._prune()
+
+        key = coalesce_key(game_name, tag_line, options)
+        active = self._active.get(key)
+        if active is not None:
+            active.coalesced += 1
+            active.emit('coalesced', count=active.coalesced)
+            return active, False
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        job = IngestionJob(game_name, tag_line, options)
+        self._jobs[job.id] = job
+        self._active[key] = job
+        job.emit(JobStatus.QUEUED)
+        job.task = asyncio.create_task(self._run(job))
+        return job, True
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: IngestionJob):
+        try:
+            async with self._semaphore:
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                job.emit(JobStatus.RUNNING)
+
+                result = await self.runner(job.game_name, job.tag_line, progress=job.report, **job.options)
+
+            job.result = result
+            if result.get('success'):
+                job.status = JobStatus.SUCCEEDED
+            else:
+                job.status = JobStatus.FAILED
+                job.error = result.get('error', 'Failed to process player')
+        except asyncio.CancelledError:
+            job.status = JobStatus.FAILED
+            job.error = 'Job cancelled'
+            raise
+        except Exception as e:
+            logger.exception(f"Ingestion job {job.id} for {job.key} failed")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self._active.pop(job.coalesce_key, None)
+            job.emit(job.status, error=job.error, puuid=(job.result or {}).get('puuid'))
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict:
+        counts = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {'jobs': counts, 'maxConcurrent': self.max_concurrent}
+
+    async def shutdown(self):
+        """Cancel queued and running jobs (called on application shutdown)"""
+        tasks = [job.task for job in self._active.values() if job.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
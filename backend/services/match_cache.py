@@ -0,0 +1,197 @@
+"""
+Match Payload Cache
+- Persistent on-disk cache for immutable Riot payloads (finished matches and timelines)
+- Content-addressed gzip files keyed by match ID
+- Size-bounded with least-recently-used eviction
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MatchPayloadCache:
+    """
+    Disk cache for raw match-v5 JSON payloads.
+
+    Finished matches and their timelines never change, so entries never
+    expire; they are only evicted (least recently used first) when the cache
+    grows past max_bytes. Access order survives restarts through file mtimes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or os.getenv('RIOT_MATCH_CACHE_DIR', 'cache/riot_matches'))
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('RIOT_MATCH_CACHE_MAX_MB', '1024')) * 1024 * 1024)
+        self.max_bytes = max_bytes
+
+        # path -> compressed size, oldest access first
+        self._entries: "OrderedDict[Path, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _load_index(self):
+        """Rebuild the LRU index from the files already on disk"""
+        if not self.enabled or not self.cache_dir.exists():
+            return
+
+        files = []
+        for path in self.cache_dir.glob('*/*.json.gz'):
+            try:
+                stat = path.stat()
+                files.append((stat.st_mtime, path, stat.st_size))
+            except OSError:
+                continue
+
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self._total_bytes += size
+
+        logger.info(f"Match cache: {len(self._entries)} entries, {self._total_bytes / 1024 / 1024:.1f} MB")
+
+    def _path(self, kind: str, match_id: str) -> Path:
+        digest = hashlib.sha256(f"{kind}:{match_id}".encode('utf-8')).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json.gz"
+
+    def get(self, kind: str, match_id: str) -> Optional[bytes]:
+        """
+        Read a cached payload
+
+        Args:
+            kind: Payload kind ("match" or "timeline")
+            match_id: Riot match ID
+
+        Returns:
+            Raw JSON bytes, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(kind, match_id)
+        with self._lock:
+            known = path in self._entries
+
+        if not known:
+            self.misses += 1
+            return None
+
+        try:
+            with gzip.open(path, 'rb') as f:
+                content = f.read()
+            os.utime(path)
+        except (OSError, EOFError) as e:
+            logger.warning(f"Dropping unreadable cache entry {path.name}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+        self.hits += 1
+        return content
+
+    def put(self, kind: str, match_id: str, content: bytes):
+        """Store raw JSON bytes for a payload, evicting old entries if needed"""
+        if not self.enabled:
+            return
+        self._write(kind, match_id, gzip.compress(content, compresslevel=6))
+
+    def put_compressed(self, kind: str, match_id: str, compressed: bytes):
+        """Store a payload that is already gzip-compressed (e.g. compressed while streaming)"""
+        if not self.enabled:
+            return
+        self._write(kind, match_id, compressed)
+
+    def _write(self, kind: str, match_id: str, compressed: bytes):
+        path = self._path(kind, match_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial entry
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            size = len(compressed)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry for {kind} {match_id}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            evicted = self._evict_locked()
+
+        for old_path in evicted:
+            old_path.unlink(missing_ok=True)
+
+    def _evict_locked(self):
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            old_path, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(old_path)
+        return evicted
+
+    def _remove(self, path: Path):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(path, 0)
+        path.unlink(missing_ok=True)
+
+    async def aget(self, kind: str, match_id: str) -> Optional[bytes]:
+        """Async get (file I/O runs on a worker thread)"""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self.get, kind, match_id)
+
+    async def aput(self, kind: str, match_id: str, content: bytes):
+        """Async put (compression and file I/O run on a worker thread)"""
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.put, kind, match_id, content)
+
+    async def aput_compressed(self, kind: str, match_id: str, compressed: bytes):
+        """Async put_compressed (file I/O runs on a worker thread)"""
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self.put_compressed, kind, match_id, compressed)
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# Process-wide cache (all clients share the same directory and size budget)
+_match_cache = None
+
+
+def get_match_cache() -> MatchPayloadCache:
+    """Get or create the shared match payload cache singleton"""
+    global _match_cache
+    if _match_cache is None:
+        _match_cache = MatchPayloadCache()
+    return _match_cache
@@ -7,6 +7,7 @@ import logging
 import boto3
 from typing import Dict, List, Optional
 from .tool_handlers import ToolHandlers
+from .data_executor import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -268,7 +269,8 @@ class MatchChatAgent:
                 "tools": self.tools
             }
             
-            response = self.bedrock.invoke_model(
+            response = await run_blocking(
+                self.bedrock.invoke_model,
                 modelId=self.model_id,
                 body=json.dumps(body)
             )
@@ -0,0 +1,316 @@
+"""
+Match Repository
+- One process-wide entry point for reading a player's items from lol-player-data
+- Reuses the shared low-level DynamoDB client (no boto3 resource per request)
+- Pipelined pagination: the next Query page is fetched on a worker thread while the
+  caller processes the current one
+- Sync and async iteration over a player's matches (summary items by default,
+  full match items on request or until every stored match of the player has a summary)
+- Fully read match lists are cached in process, keyed by the player's data version
+  (one small GetItem per read decides whether the cached list is still current;
+  players without a version item are always read uncached); callers get copies,
+  never the cached items
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from services.dynamo_codec import deserialize_item, get_dynamodb_client, get_item, item_size, serialize_values
+from services.match_summaries import SUMMARY_NAMES, SUMMARY_PREFIX, SUMMARY_PROJECTION
+from services.player_match_cache import PlayerMatchCache, clone_item
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'lol-player-data'
+MATCH_PREFIX = 'match#'
+
+# Per-player item whose counter ingestion bumps whenever it writes the player's matches;
+# it also carries summariesComplete once every stored match has a summary item
+VERSION_DATA_TYPE = 'version'
+
+PLAYER_PREFIX_CONDITION = 'puuid = :puuid AND begins_with(dataType, :prefix)'
+
+
+class MatchRepository:
+    """
+    Paginated, prefetching reads of a player's match items.
+
+    matches() and amatches() yield summary#<id> items (projected to matchId,
+    gameCreation and data) in matchId order, or the full match#<id> items
+    with summaries=False. Players whose summaries are not marked complete
+    (ingested before summaries existed, not yet backfilled) get the full
+    items. Every item is a native dict whose `data` has the player in
+    info.participants.
+
+    Lists that were read to the end are cached per player and version
+    (players without a version item are never cached). The cache holds its
+    own copies, taken on the fetch thread, and every cached read yields fresh
+    copies, so callers may mutate the items they get.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        table_name: str = TABLE_NAME,
+        max_workers: Optional[int] = None,
+        cache: Optional[PlayerMatchCache] = None
+    ):
+        self._client = client
+        self.table_name = table_name
+        self.cache = cache or PlayerMatchCache()
+        # Page fetches (Query + deserialize) run here, so the next page overlaps with processing
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('MATCH_REPOSITORY_WORKERS', '8')),
+            thread_name_prefix='match-repo'
+        )
+
+    @property
+    def client(self):
+        return self._client or get_dynamodb_client()
+
+    def _query_params(self, puuid: str, prefix: Optional[str], projection: Optional[str] = None,
+                      names: Optional[Dict[str, str]] = None) -> Dict:
+        if prefix is None:
+            params = {
+                'TableName': self.table_name,
+                'KeyConditionExpression': 'puuid = :puuid',
+                'ExpressionAttributeValues': serialize_values({':puuid': puuid})
+            }
+        else:
+            params = {
+                'TableName': self.table_name,
+                'KeyConditionExpression': PLAYER_PREFIX_CONDITION,
+                'ExpressionAttributeValues': serialize_values({':puuid': puuid, ':prefix': prefix})
+            }
+        if projection:
+            params['ProjectionExpression'] = projection
+        if names:
+            params['ExpressionAttributeNames'] = names
+        return params
+
+    def _fetch_page(self, params: Dict, for_cache: bool = False) -> Tuple[List[Dict], Optional[Dict], Optional[List[Dict]], int]:
+        """
+        One Query page as native items, plus the key to continue from
+
+        With for_cache, also a private copy of the items for the cache and the page's
+        stored size, both made here on the worker thread.
+        """
+        response = self.client.query(**params)
+        raw_items = response.get('Items', [])
+        items = [deserialize_item(item) for item in raw_items]
+        if not for_cache:
+            return items, response.get('LastEvaluatedKey'), None, 0
+        copies = [clone_item(item) for item in items]
+        return items, response.get('LastEvaluatedKey'), copies, sum(item_size(item) for item in raw_items)
+
+    @staticmethod
+    def _next_params(params: Dict, last_evaluated_key: Dict) -> Dict:
+        return {**params, 'ExclusiveStartKey': last_evaluated_key}
+
+    def _pages(self, params: Dict, for_cache: bool = False) -> Iterator[Tuple[List[Dict], Optional[List[Dict]], int]]:
+        """(items, cache copies, size) per Query page, fetching page N+1 while page N is being consumed"""
+        future: Future = self._executor.submit(self._fetch_page, params, for_cache)
+        try:
+            while future is not None:
+                items, last_evaluated_key, copies, size = future.result()
+                future = self._executor.submit(
+                    self._fetch_page, self._next_params(params, last_evaluated_key), for_cache
+                ) if last_evaluated_key else None
+                yield items, copies, size
+        finally:
+            # Caller stopped early (islice, break): drop the prefetched page
+            if future is not None:
+                future.cancel()
+
+    async def _apages(self, params: Dict, for_cache: bool = False) -> AsyncIterator[Tuple[List[Dict], Optional[List[Dict]], int]]:
+        """Async counterpart of _pages(); page fetches never block the event loop"""
+        loop = asyncio.get_running_loop()
+        pending = loop.run_in_executor(self._executor, self._fetch_page, params, for_cache)
+        try:
+            while pending is not None:
+                items, last_evaluated_key, copies, size = await pending
+                pending = loop.run_in_executor(
+                    self._executor, self._fetch_page, self._next_params(params, last_evaluated_key), for_cache
+                ) if last_evaluated_key else None
+                yield items, copies, size
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def query(self, params: Dict) -> Iterator[Dict]:
+        """All items of a Query, fetching page N+1 while page N is being consumed"""
+        for items, _, _ in self._pages(params):
+            yield from items
+
+    async def aquery(self, params: Dict) -> AsyncIterator[Dict]:
+        """Async counterpart of query()"""
+        async for items, _, _ in self._apages(params):
+            for item in items:
+                yield item
+
+    def _match_params(self, puuid: str, summaries: bool) -> Dict:
+        if summaries:
+            return self._query_params(puuid, SUMMARY_PREFIX, SUMMARY_PROJECTION, SUMMARY_NAMES)
+        return self._query_params(puuid, MATCH_PREFIX)
+
+    def _match_kind(self, puuid: str, summaries: bool) -> Tuple[bool, Optional[int]]:
+        """
+        (read summary items?, data version) for a player
+
+        Summary items are only read once the player's version item says every
+        stored match has one; until then a summaries=True read gets the full
+        match items, the player's complete history.
+        """
+        try:
+            state = self.player_state(puuid)
+        except Exception as e:
+            logger.warning(f"Data version read failed for {puuid[:8]}, reading full match items uncached: {e}")
+            return False, None
+
+        use_summaries = summaries and state['summariesComplete']
+        if summaries and not use_summaries:
+            logger.info(f"Match summaries for {puuid[:8]} are incomplete, reading full match items")
+        return use_summaries, state['version']
+
+    def matches(self, puuid: str, summaries: bool = True) -> Iterator[Dict]:
+        """
+        A player's matches, in matchId order (from the cache while the player's version is unchanged)
+
+        Args:
+            puuid: Player PUUID
+            summaries: Slim summary items (default), or the full match items
+        """
+        use_summaries, version = self._match_kind(puuid, summaries)
+        params = self._match_params(puuid, use_summaries)
+        # Never bumped (version None): nothing would invalidate a cached list
+        if not self.cache.enabled or version is None:
+            yield from self.query(params)
+            return
+
+        cached = self.cache.get(puuid, use_summaries, version)
+        if cached is not None:
+            for item in cached:
+                yield clone_item(item)
+            return
+
+        copies, size = [], 0
+        for items, page_copies, page_size in self._pages(params, for_cache=True):
+            copies.extend(page_copies)
+            size += page_size
+            yield from items
+        # Only reached when the caller read the whole list
+        self.cache.put(puuid, use_summaries, version, copies, size)
+
+    async def amatches(self, puuid: str, summaries: bool = True) -> AsyncIterator[Dict]:
+        """Async iteration over a player's matches (see matches())"""
+        loop = asyncio.get_running_loop()
+        use_summaries, version = await loop.run_in_executor(self._executor, self._match_kind, puuid, summaries)
+        params = self._match_params(puuid, use_summaries)
+        if not self.cache.enabled or version is None:
+            async for item in self.aquery(params):
+                yield item
+            return
+
+        cached = self.cache.get(puuid, use_summaries, version)
+        if cached is not None:
+            # Copied on a worker thread (full match items are large)
+            for item in await loop.run_in_executor(self._executor, clone_item, cached):
+                yield item
+            return
+
+        copies, size = [], 0
+        async for items, page_copies, page_size in self._apages(params, for_cache=True):
+            copies.extend(page_copies)
+            size += page_size
+            for item in items:
+                yield item
+        self.cache.put(puuid, use_summaries, version, copies, size)
+
+    def player_state(self, puuid: str) -> Dict:
+        """
+        The player's version item as {version, summariesComplete}
+
+        version is None before the first versioned ingest; summariesComplete is
+        set once every stored match item has its summary item.
+        """
+        item = get_item(
+            self.table_name,
+            {'puuid': puuid, 'dataType': VERSION_DATA_TYPE},
+            projection='#version, summariesComplete',
+            names={'#version': 'version'},
+            client=self.client
+        ) or {}
+        return {'version': item.get('version'), 'summariesComplete': bool(item.get('summariesComplete'))}
+
+    def bump_version(self, puuid: str, summaries_complete: Optional[bool] = None) -> int:
+        """
+        Mark the player's stored matches as changed (called by ingestion after writing)
+
+        Args:
+            puuid: Player PUUID
+            summaries_complete: True records that every stored match has a summary item,
+                                False clears that (a summary write failed), None leaves it
+
+        Returns:
+            The new version
+        """
+        update = 'ADD #version :one SET updatedAt = :now'
+        values = {':one': 1, ':now': datetime.utcnow().isoformat()}
+        if summaries_complete:
+            update += ', summariesComplete = :complete'
+            values[':complete'] = True
+        elif summaries_complete is not None:
+            update += ' REMOVE summariesComplete'
+        response = self.client.update_item(
+            TableName=self.table_name,
+            Key=serialize_values({'puuid': puuid, 'dataType': VERSION_DATA_TYPE}),
+            UpdateExpression=update,
+            ExpressionAttributeNames={'#version': 'version'},
+            ExpressionAttributeValues=serialize_values(values),
+            ReturnValues='UPDATED_NEW'
+        )
+        self.cache.invalidate(puuid)
+        return int(response['Attributes']['version']['N'])
+
+    def stats(self) -> dict:
+        return {'cache': self.cache.stats()}
+
+    def champion_roles(self, puuid: str) -> Dict[str, Dict]:
+        """
+        {matchId: {championName, role}} from the summaries' top-level attributes (a few bytes per match)
+
+        Empty when the player has no summaries yet.
+        """
+        params = self._query_params(puuid, SUMMARY_PREFIX, 'matchId, championName, #role', {'#role': 'role'})
+        return {
+            item['matchId']: {'championName': item.get('championName'), 'role': item.get('role')}
+            for item in self.query(params)
+        }
+
+    def player_items(self, puuid: str) -> Iterator[Dict]:
+        """Every item stored for a player (profile items, matches and summaries)"""
+        return self.query(self._query_params(puuid, None))
+
+    def aplayer_items(self, puuid: str) -> AsyncIterator[Dict]:
+        """Async counterpart of player_items()"""
+        return self.aquery(self._query_params(puuid, None))
+
+    def get_match(self, puuid: str, match_id: str) -> Optional[Dict]:
+        """One full match#<id> item, or None"""
+        return get_item(self.table_name, {'puuid': puuid, 'dataType': f'{MATCH_PREFIX}{match_id}'}, client=self.client)
+
+
+# Process-wide repository (shares the low-level client and one prefetch pool)
+_match_repository = None
+
+
+def get_match_repository() -> MatchRepository:
+    """Get or create the shared MatchRepository singleton"""
+    global _match_repository
+    if _match_repository is None:
+        _match_repository = MatchRepository()
+    return _match_repository
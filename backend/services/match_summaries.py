@@ -0,0 +1,239 @@
+"""
+Match Summaries
+- Ingestion writes a slim summary#<matchId> item per player next to the full match#<matchId> item
+- It holds the player's participant (stats, challenges, perks), champion, role, queue and gameCreation
+- `data` keeps the match shape with a single participant, so readers that look the player up
+  in info.participants work on summaries unchanged
+- Readers get them through MatchRepository with a projection, but only once the player's version
+  item is marked summariesComplete; until then they read the full match items
+- Ingestion fills in missing summaries for the player it refreshes and sets the mark;
+  backfill_match_summaries.py does the same for every stored player
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Optional, Set
+
+
+from services.dynamo_codec import get_dynamodb_client, get_dynamodb_resource, serialize_values
+from services.dynamo_writer import DynamoBatchWriter
+from services.payload_migration import repack_item
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'lol-player-data'
+SUMMARY_PREFIX = 'summary#'
+
+# Match-level fields copied into the summary's info
+SUMMARY_INFO_FIELDS = ('gameCreation', 'gameDuration', 'gameEndTimestamp', 'gameMode', 'gameVersion', 'queueId', 'mapId')
+
+# What the analytics readers need from a summary item
+SUMMARY_PROJECTION = 'matchId, gameCreation, #data'
+SUMMARY_NAMES = {'#data': 'data'}
+
+
+def build_summary_item(puuid: str, match: Dict, uploaded_at: str) -> Optional[Dict]:
+    """
+    Build the summary#<matchId> item for one player and match
+
+    Args:
+        puuid: Player the summary is for
+        match: Full match-v5 payload (Decimal numbers, as written to DynamoDB)
+        uploaded_at: ISO timestamp
+
+    Returns:
+        Summary item, or None if the player is not a participant
+    """
+    info = match.get('info', {})
+    participant = next((p for p in info.get('participants', []) if p.get('puuid') == puuid), None)
+    if participant is None:
+        return None
+
+    match_id = match['metadata']['matchId']
+    return {
+        'puuid': puuid,
+        'dataType': f'{SUMMARY_PREFIX}{match_id}',
+        'matchId': match_id,
+        'championName': participant.get('championName'),
+        'role': participant.get('teamPosition'),
+        'queueId': info.get('queueId'),
+        'gameCreation': info.get('gameCreation'),
+        'win': participant.get('win'),
+        'data': {
+            'metadata': {'matchId': match_id},
+            'info': {
+                **{field: info[field] for field in SUMMARY_INFO_FIELDS if field in info},
+                'participants': [participant]
+            }
+        },
+        'uploadedAt': uploaded_at
+    }
+
+
+def _stored_match_ids(client, puuid: str, prefix: str) -> Set[str]:
+    """matchIds of a player's items under a dataType prefix (keys and matchId only)"""
+    params = {
+        'TableName': TABLE_NAME,
+        'KeyConditionExpression': 'puuid = :puuid AND begins_with(dataType, :prefix)',
+        'ExpressionAttributeValues': serialize_values({':puuid': puuid, ':prefix': prefix}),
+        'ProjectionExpression': 'dataType'
+    }
+    match_ids = set()
+    while True:
+        response = client.query(**params)
+        match_ids.update(item['dataType']['S'][len(prefix):] for item in response.get('Items', []))
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if not last_evaluated_key:
+            return match_ids
+        params['ExclusiveStartKey'] = last_evaluated_key
+
+
+def complete_player_summaries(puuid: str, client=None) -> Dict:
+    """
+    Write summary items for a player's stored matches that lack one, then mark the
+    player's summaries complete (which bumps their data version)
+
+    A no-op (one GetItem) for players already marked complete.
+
+    Args:
+        puuid: Player PUUID
+
+    Returns:
+        Dict with complete, written, skipped (player not in the match) and failed
+    """
+    # Imported here: match_repository imports this module
+    from services.match_repository import MatchRepository, get_match_repository
+
+    repository = get_match_repository() if client is None else MatchRepository(client=client, max_workers=1)
+    report = {'complete': True, 'written': 0, 'skipped': 0, 'failed': []}
+    if repository.player_state(puuid)['summariesComplete']:
+        return report
+
+    client = client or get_dynamodb_client()
+    missing = _stored_match_ids(client, puuid, 'match#') - _stored_match_ids(client, puuid, SUMMARY_PREFIX)
+    if missing:
+        writer = DynamoBatchWriter(get_dynamodb_resource(), TABLE_NAME)
+        try:
+            for match_id in sorted(missing):
+                try:
+                    item = client.get_item(
+                        TableName=TABLE_NAME,
+                        Key=serialize_values({'puuid': puuid, 'dataType': f'match#{match_id}'})
+                    ).get('Item')
+                    if item is None:
+                        continue
+                    native, _ = repack_item(item, 'map')
+                    summary = build_summary_item(puuid, native['data'], native.get('uploadedAt'))
+                except Exception as e:
+                    report['failed'].append({'key': f'match#{match_id}', 'error': str(e)})
+                    continue
+                if summary is None:
+                    report['skipped'] += 1
+                    continue
+                writer.put(summary)
+                report['written'] += 1
+        finally:
+            write_report = writer.close()
+            report['failed'].extend(
+                {'key': failure['key']['dataType'], 'error': failure['error']}
+                for failure in write_report['failed']
+            )
+            report['written'] -= len(write_report['failed'])
+
+    report['complete'] = not report['failed']
+    if report['complete']:
+        repository.bump_version(puuid, summaries_complete=True)
+    return report
+
+
+def backfill_match_summaries(
+    page_size: int = 100,
+    stop: Optional[threading.Event] = None,
+    on_page: Optional[Callable[[Dict], None]] = None,
+    client=None
+) -> Dict:
+    """
+    Write summary items for every stored match item (existing summaries are overwritten),
+    then bump the data version of every player that got one, so cached match lists are re-read.
+    After a full scan, players without failures are marked summariesComplete in the same update.
+
+    Args:
+        page_size: Items per Scan page
+        stop: Set to stop after the current page
+        on_page: Called with the running report after every page
+
+    Returns:
+        Dict with scanned, written, skipped (player not in the match), players, failed and stopped
+    """
+    # Imported here: match_repository imports this module
+    from services.match_repository import MatchRepository, get_match_repository
+
+    repository = get_match_repository() if client is None else MatchRepository(client=client, max_workers=1)
+    client = client or get_dynamodb_client()
+    report = {'scanned': 0, 'written': 0, 'skipped': 0, 'players': 0, 'failed': [], 'stopped': False}
+    players, failed_players = set(), set()
+    scanned_all = False
+    writer = DynamoBatchWriter(get_dynamodb_resource(), TABLE_NAME)
+
+    params = {
+        'TableName': TABLE_NAME,
+        'FilterExpression': 'begins_with(dataType, :prefix)',
+        'ExpressionAttributeValues': serialize_values({':prefix': 'match#'}),
+        'Limit': page_size
+    }
+    try:
+        while True:
+            if stop is not None and stop.is_set():
+                report['stopped'] = True
+                break
+
+            response = client.scan(**params)
+            report['scanned'] += response.get('ScannedCount', 0)
+            for item in response.get('Items', []):
+                try:
+                    # Decimal-preserving decode of map and compressed payloads
+                    native, _ = repack_item(item, 'map')
+                    summary = build_summary_item(native['puuid'], native['data'], native.get('uploadedAt'))
+                except Exception as e:
+                    report['failed'].append({'key': item['dataType']['S'], 'error': str(e)})
+                    failed_players.add(item['puuid']['S'])
+                    continue
+                if summary is None:
+                    report['skipped'] += 1
+                    continue
+                writer.put(summary)
+                players.add(native['puuid'])
+                report['written'] += 1
+
+            if on_page:
+                on_page(report)
+
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                scanned_all = True
+                break
+            params['ExclusiveStartKey'] = last_evaluated_key
+    finally:
+        write_report = writer.close()
+        report['failed'].extend(
+            {'key': failure['key']['dataType'], 'error': failure['error']}
+            for failure in write_report['failed']
+        )
+        report['written'] -= len(write_report['failed'])
+        failed_players.update(failure['key']['puuid'] for failure in write_report['failed'])
+
+        # Same atomic ADD as ingestion; lists cached before the backfill are stale now.
+        # A stopped scan leaves the mark alone, a failed summary clears it.
+        for puuid in players | failed_players:
+            if puuid in failed_players:
+                complete = False
+            else:
+                complete = True if scanned_all else None
+            try:
+                repository.bump_version(puuid, summaries_complete=complete)
+                report['players'] += 1
+            except Exception as e:
+                report['failed'].append({'key': f'{puuid}/version', 'error': str(e)})
+
+    logger.info(f"Match summary backfill: {report['written']} written, {report['skipped']} skipped, {len(report['failed'])} failed")
+    return report
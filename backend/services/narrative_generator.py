@@ -5,10 +5,10 @@ Spotify Wrapped-style storytelling for League of Legends year recap
 import logging
 from typing import Dict, List, Optional
 import boto3
-from boto3.dynamodb.conditions import Key
 from collections import defaultdict, Counter
 from datetime import datetime
 import statistics
+from services.match_repository import get_match_repository
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +17,6 @@ class NarrativeGenerator:
     """Generates engaging Spotify Wrapped-style narratives from player data"""
 
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        self.table = self.dynamodb.Table('lol-player-data')
-
         # Optional: Try to initialize Bedrock for AI narratives
         try:
             self.bedrock = boto3.client(
@@ -90,26 +87,7 @@ class NarrativeGenerator:
         """Fetch and aggregate all match data"""
         try:
             # Fetch ALL matches with pagination
-            matches = []
-            last_evaluated_key = None
-
-            while True:
-                if last_evaluated_key:
-                    response = self.table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#'),
-                        ExclusiveStartKey=last_evaluated_key
-                    )
-                else:
-                    response = self.table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-                    )
-
-                matches.extend(response['Items'])
-
-                # Check if there are more results
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
+            matches = list(get_match_repository().matches(puuid))
 
             logger.info(f"Fetched {len(matches)} total matches for narrative generation")
 
@@ -160,31 +138,31 @@ class NarrativeGenerator:
 
                 # Basic stats
                 won = participant.get('win', False)
-                kills = int(participant.get('kills', 0))
-                deaths = int(participant.get('deaths', 0))
-                assists = int(participant.get('assists', 0))
+                kills = participant.get('kills', 0)
+                deaths = participant.get('deaths', 0)
+                assists = participant.get('assists', 0)
 
                 data['wins'] += 1 if won else 0
                 data['losses'] += 0 if won else 1
                 data['total_kills'] += kills
                 data['total_deaths'] += deaths
                 data['total_assists'] += assists
-                data['total_damage'] += int(participant.get('totalDamageDealtToChampions', 0))
-                data['total_gold'] += int(participant.get('goldEarned', 0))
-                data['total_cs'] += int(participant.get('totalMinionsKilled', 0)) + int(participant.get('neutralMinionsKilled', 0))
-                data['total_vision_score'] += int(participant.get('visionScore', 0))
-                data['total_wards_placed'] += int(participant.get('wardsPlaced', 0))
+                data['total_damage'] += participant.get('totalDamageDealtToChampions', 0)
+                data['total_gold'] += participant.get('goldEarned', 0)
+                data['total_cs'] += participant.get('totalMinionsKilled', 0) + participant.get('neutralMinionsKilled', 0)
+                data['total_vision_score'] += participant.get('visionScore', 0)
+                data['total_wards_placed'] += participant.get('wardsPlaced', 0)
 
                 # Game duration
-                game_duration = int(match_data.get('info', {}).get('gameDuration', 0))
+                game_duration = match_data.get('info', {}).get('gameDuration', 0)
                 data['total_game_time'] += game_duration
                 data['longest_game'] = max(data['longest_game'], game_duration)
                 data['shortest_game'] = min(data['shortest_game'], game_duration)
 
                 # Multikills
-                data['pentakills'] += int(participant.get('pentaKills', 0))
-                data['quadrakills'] += int(participant.get('quadraKills', 0))
-                data['triple_kills'] += int(participant.get('tripleKills', 0))
+                data['pentakills'] += participant.get('pentaKills', 0)
+                data['quadrakills'] += participant.get('quadraKills', 0)
+                data['triple_kills'] += participant.get('tripleKills', 0)
                 data['first_bloods'] += 1 if participant.get('firstBloodKill') else 0
 
                 # Champions and roles
@@ -195,7 +173,7 @@ class NarrativeGenerator:
                     data['roles_played'][role] += 1
 
                 # Monthly tracking
-                game_creation = int(match_data.get('info', {}).get('gameCreation', 0))
+                game_creation = match_data.get('info', {}).get('gameCreation', 0)
                 if game_creation:
                     date = datetime.fromtimestamp(game_creation / 1000)
                     month_key = date.strftime('%Y-%m')
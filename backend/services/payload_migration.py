@@ -0,0 +1,167 @@
+"""
+Match Payload Migration
+- Rewrites existing match#<id> items in lol-player-data into the configured payload format
+  (nested map -> compressed dataGz binary, or back to a map with codec 'map')
+- Scans only items not yet in the target format; writes go through the batched writer and
+  its shared write-capacity budget, so a background run throttles alongside ingestion
+- Can be stopped between pages (threading.Event) and simply rerun to continue
+"""
+
+import json
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from services.dynamo_codec import (
+    FORMAT_ATTRIBUTE,
+    PAYLOAD_ATTRIBUTE,
+    PAYLOAD_CODECS,
+    decode_payload,
+    get_dynamodb_client,
+    get_dynamodb_resource,
+    json_default,
+    pack_payload,
+    payload_codec,
+    serialize_values
+)
+from services.dynamo_writer import DynamoBatchWriter
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'lol-player-data'
+
+# Decimal-preserving deserializer for the attributes written back unchanged
+_deserializer = TypeDeserializer()
+
+
+def _scan_filter(codec: str):
+    """FilterExpression, names and values selecting match items not stored as `codec`"""
+    if codec == 'map':
+        return (
+            'begins_with(dataType, :prefix) AND attribute_exists(#payload)',
+            {'#payload': PAYLOAD_ATTRIBUTE},
+            {':prefix': 'match#'}
+        )
+    return (
+        'begins_with(dataType, :prefix) AND (attribute_exists(#data) OR #format <> :format)',
+        {'#data': 'data', '#format': FORMAT_ATTRIBUTE},
+        {':prefix': 'match#', ':format': PAYLOAD_CODECS[codec]}
+    )
+
+
+def payload_size(item: Dict) -> int:
+    """Bytes of an item's payload: the compressed blob, or the map as compact JSON"""
+    if PAYLOAD_ATTRIBUTE in item:
+        return len(item[PAYLOAD_ATTRIBUTE])
+    return len(json.dumps(item.get('data'), separators=(',', ':'), default=json_default))
+
+
+def repack_item(item: Dict, codec: str) -> Tuple[Dict, int]:
+    """
+    Low-level match item -> (item in the target format for the writer, size of the old payload)
+    """
+    native = {
+        key: _deserializer.deserialize(value)
+        for key, value in item.items()
+        if key not in (PAYLOAD_ATTRIBUTE, FORMAT_ATTRIBUTE)
+    }
+    if PAYLOAD_ATTRIBUTE in item:
+        blob = item[PAYLOAD_ATTRIBUTE]['B']
+        native['data'] = decode_payload(blob, item[FORMAT_ATTRIBUTE]['S'], for_dynamo=True)
+        before = len(blob)
+    else:
+        before = payload_size(native)
+    return pack_payload(native, codec), before
+
+
+def migrate_match_payloads(
+    codec: Optional[str] = None,
+    page_size: int = 100,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+    stop: Optional[threading.Event] = None,
+    on_page: Optional[Callable[[Dict], None]] = None,
+    client=None
+) -> Dict:
+    """
+    Rewrite match items that are not yet in the target payload format
+
+    Args:
+        codec: Target format ('map', 'zstd', 'gzip'; default: DYNAMO_MATCH_PAYLOAD)
+        page_size: Items per Scan page
+        limit: Stop after this many items
+        dry_run: Count and measure only, write nothing
+        stop: Set to stop after the current page
+        on_page: Called with the running report after every page
+
+    Returns:
+        Dict with codec, scanned, migrated, failed, bytesBefore/bytesAfter (payload sizes) and stopped
+    """
+    codec = codec or payload_codec()
+    client = client or get_dynamodb_client()
+    filter_expression, names, values = _scan_filter(codec)
+
+    report = {
+        'codec': codec,
+        'scanned': 0,
+        'migrated': 0,
+        'failed': [],
+        'bytesBefore': 0,
+        'bytesAfter': 0,
+        'stopped': False
+    }
+    writer = None if dry_run else DynamoBatchWriter(get_dynamodb_resource(), TABLE_NAME)
+
+    params = {
+        'TableName': TABLE_NAME,
+        'FilterExpression': filter_expression,
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': serialize_values(values),
+        'Limit': page_size,
+        'ReturnConsumedCapacity': 'TOTAL'
+    }
+    try:
+        while True:
+            if stop is not None and stop.is_set():
+                report['stopped'] = True
+                break
+
+            response = client.scan(**params)
+            report['scanned'] += response.get('ScannedCount', 0)
+            for item in response.get('Items', []):
+                try:
+                    packed, before = repack_item(item, codec)
+                except Exception as e:
+                    report['failed'].append({'key': item['dataType']['S'], 'error': str(e)})
+                    continue
+
+                report['bytesBefore'] += before
+                report['bytesAfter'] += payload_size(packed)
+
+                if writer is not None:
+                    writer.put(packed)
+                report['migrated'] += 1
+
+            if on_page:
+                on_page(report)
+
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key or (limit and report['migrated'] >= limit):
+                break
+            params['ExclusiveStartKey'] = last_evaluated_key
+    finally:
+        if writer is not None:
+            write_report = writer.close()
+            report['failed'].extend(
+                {'key': failure['key']['dataType'], 'error': failure['error']}
+                for failure in write_report['failed']
+            )
+            report['migrated'] -= len(write_report['failed'])
+
+    logger.info(
+        f"Match payload migration to '{codec}': {report['migrated']} items rewritten, "
+        f"{len(report['failed'])} failed, {report['scanned']} scanned"
+    )
+    return report
@@ -0,0 +1,266 @@
+"""
+Player Archive
+- One compressed, line-delimited JSON bundle per player (zstd when installed, otherwise gzip)
+- Every record is its own compressed frame, so the match index can seek straight to one match
+- The bundle and its index are written to temp files and renamed into place (index last)
+- The previous generation's bundle is kept until the next swap, for readers still holding the old index
+- Records from the previous bundle that a run did not rewrite are carried over without recompressing
+"""
+
+import gzip
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from services.dynamo_codec import json_default
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+ARCHIVE_INDEX = 'archive.index.json'
+ARCHIVE_FORMAT = 1
+
+CODEC_EXTENSIONS = {'zstd': 'zst', 'gzip': 'gz'}
+
+
+def default_codec() -> str:
+    """LOCAL_ARCHIVE_CODEC if set, else zstd when zstandard is installed, else gzip"""
+    codec = os.getenv('LOCAL_ARCHIVE_CODEC')
+    if codec:
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown archive codec: {codec}")
+        return codec
+    return 'zstd' if zstandard is not None else 'gzip'
+
+
+def compress_frame(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed")
+        return zstandard.ZstdCompressor(level=int(os.getenv('LOCAL_ARCHIVE_LEVEL', '3'))).compress(data)
+    return gzip.compress(data, compresslevel=int(os.getenv('LOCAL_ARCHIVE_LEVEL', '6')))
+
+
+def decompress_frame(frame: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(frame)
+    return gzip.decompress(frame)
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f"{path.name}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_index(player_dir: Path) -> Optional[Dict]:
+    """The player's archive index, or None if there is no archive yet"""
+    try:
+        with open(Path(player_dir) / ARCHIVE_INDEX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class PlayerArchiveWriter:
+    """
+    Writes one run's records into a new bundle generation for a player.
+
+    Records are (type, key) pairs: ('match', matchId), ('timeline', matchId),
+    ('timeline_compact', matchId) and ('profile', name). add() compresses a
+    record into its own frame and appends it to a temp file; close() carries
+    over untouched records from the previous bundle, renames the bundle into
+    place and then swaps the index, so readers always see a complete
+    generation. Thread-safe (persist workers add records concurrently).
+    """
+
+    def __init__(self, player_dir: Path, codec: Optional[str] = None):
+        self.player_dir = Path(player_dir)
+        self.player_dir.mkdir(parents=True, exist_ok=True)
+        self.codec = codec or default_codec()
+        self.bundle_name = f"bundle-{uuid.uuid4().hex[:12]}.ndjson.{CODEC_EXTENSIONS[self.codec]}"
+        self._tmp_path = self.player_dir / f"{self.bundle_name}.tmp"
+        self._file = open(self._tmp_path, 'wb')
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._raw_bytes = 0
+        self._records: Dict[Tuple[str, str], Dict] = {}
+        self._closed = False
+
+    def add(self, record_type: str, key: str, data, meta: Optional[Dict] = None):
+        """Append one record (later adds of the same type and key win)"""
+        line = json.dumps(
+            {'type': record_type, 'key': key, 'data': data},
+            separators=(',', ':'), ensure_ascii=False, default=json_default
+        ).encode('utf-8') + b'\n'
+        frame = compress_frame(line, self.codec)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Archive writer is closed")
+            self._file.write(frame)
+            self._records[(record_type, key)] = {
+                'type': record_type,
+                'key': key,
+                'offset': self._offset,
+                'length': len(frame),
+                **(meta or {})
+            }
+            self._offset += len(frame)
+            self._raw_bytes += len(line)
+
+    def add_match(self, index: int, match: Dict):
+        """Add a match summary (index is the 1-based position in the match history)"""
+        info = match.get('info', {})
+        self.add('match', match['metadata']['matchId'], match, {
+            'index': index,
+            'gameCreation': info.get('gameCreation'),
+            'queueId': info.get('queueId')
+        })
+
+    def add_timeline(self, timeline_obj: Dict):
+        """Add a timeline ({matchId, data} or {matchId, compact})"""
+        if 'compact' in timeline_obj:
+            self.add('timeline_compact', timeline_obj['matchId'], timeline_obj['compact'])
+        else:
+            self.add('timeline', timeline_obj['matchId'], timeline_obj['data'])
+
+    def add_profile(self, name: str, data):
+        self.add('profile', name, data)
+
+    def _carry_over(self, previous: Dict) -> int:
+        """Copy records of the previous generation that this run did not rewrite"""
+        old_path = self.player_dir / previous['bundle']
+        carried = [r for r in previous['records'] if (r['type'], r['key']) not in self._records]
+        if not carried or not old_path.exists():
+            return 0
+
+        with open(old_path, 'rb') as old:
+            for record in carried:
+                old.seek(record['offset'])
+                frame = old.read(record['length'])
+                if previous.get('codec') != self.codec:
+                    frame = compress_frame(decompress_frame(frame, previous['codec']), self.codec)
+                self._file.write(frame)
+                self._records[(record['type'], record['key'])] = {**record, 'offset': self._offset, 'length': len(frame)}
+                self._offset += len(frame)
+        return len(carried)
+
+    def close(self, player: Optional[Dict] = None) -> Dict:
+        """
+        Publish the new generation (blocking; run it on a worker thread)
+
+        Args:
+            player: Player metadata stored in the index (puuid, gameName, tagLine)
+
+        Returns:
+            Dict with bundle name, codec, record counts, bytes and rawBytes
+        """
+        with self._lock:
+            self._closed = True
+
+        previous = read_index(self.player_dir)
+        carried = self._carry_over(previous) if previous else 0
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.player_dir / self.bundle_name)
+
+        records = sorted(
+            self._records.values(),
+            key=lambda r: (r['type'], -(r.get('gameCreation') or 0), r['key'])
+        )
+        counts = {}
+        for record in records:
+            counts[record['type']] = counts.get(record['type'], 0) + 1
+
+        index = {
+            'format': ARCHIVE_FORMAT,
+            'codec': self.codec,
+            'bundle': self.bundle_name,
+            'updatedAt': datetime.utcnow().isoformat(),
+            'player': {**((previous or {}).get('player') or {}), **(player or {})},
+            'counts': counts,
+            'bytes': self._offset,
+            'records': records
+        }
+        _write_atomic(self.player_dir / ARCHIVE_INDEX, json.dumps(index).encode('utf-8'))
+
+        # Readers that loaded the previous index may still be seeking into its bundle,
+        # so it is kept until the next swap; only older generations are removed
+        keep = {self.bundle_name, (previous or {}).get('bundle')}
+        for path in self.player_dir.glob('bundle-*'):
+            if path.name not in keep and not path.name.endswith('.tmp'):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+        return {
+            'bundle': str(self.player_dir / self.bundle_name),
+            'codec': self.codec,
+            'records': len(records),
+            'carried': carried,
+            'counts': counts,
+            'bytes': self._offset,
+            'rawBytes': self._raw_bytes
+        }
+
+    def abort(self):
+        """Discard this generation; the previous bundle stays current"""
+        with self._lock:
+            self._closed = True
+        self._file.close()
+        try:
+            self._tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class PlayerArchive:
+    """Read access to a player's published archive generation"""
+
+    def __init__(self, player_dir: Path):
+        self.player_dir = Path(player_dir)
+        self.index = read_index(self.player_dir)
+        if self.index is None:
+            raise FileNotFoundError(f"No archive in {self.player_dir}")
+        self.codec = self.index['codec']
+        self.bundle_path = self.player_dir / self.index['bundle']
+        self._records = {(r['type'], r['key']): r for r in self.index['records']}
+
+    def match_ids(self):
+        """Match IDs in the archive, newest first"""
+        return [r['key'] for r in self.index['records'] if r['type'] == 'match']
+
+    def _read(self, f, record: Dict):
+        f.seek(record['offset'])
+        line = decompress_frame(f.read(record['length']), self.codec)
+        return json.loads(line)['data']
+
+    def get(self, record_type: str, key: str):
+        """One record's data via the index (a single seek and frame decompress), or None"""
+        record = self._records.get((record_type, key))
+        if record is None:
+            return None
+        with open(self.bundle_path, 'rb') as f:
+            return self._read(f, record)
+
+    def iter_records(self, record_type: Optional[str] = None) -> Iterator[Tuple[Dict, object]]:
+        """Yield (index entry, data) for every record, optionally of one type"""
+        with open(self.bundle_path, 'rb') as f:
+            for record in self.index['records']:
+                if record_type is None or record['type'] == record_type:
+                    yield record, self._read(f, record)
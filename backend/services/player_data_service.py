@@ -1,364 +1,748 @@
 """
 Dynamic Player Data Service
 - Fetches player data from Riot API
-- Saves to local filesystem
+- Saves to a compressed local archive (or the per-file directory layout)
 - Uploads to DynamoDB and MongoDB Atlas
 """
 
 import os
 import json
+import asyncio
+import time
 import httpx
-import boto3
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 from pymongo import MongoClient
 from dotenv import load_dotenv
 
+from services.rate_limiter import RequestPriority
+from services.riot_api import RiotAPIClient
+from services.dynamo_codec import get_dynamodb_resource, json_default, pack_payload
+from services.dynamo_writer import DynamoBatchWriter
+from services.match_repository import get_match_repository
+from services.player_index import NAME_PREFIX, get_player_index, name_item, normalize_name
+from services.match_summaries import SUMMARY_PREFIX, build_summary_item, complete_player_summaries
+from services.player_archive import PlayerArchive, PlayerArchiveWriter
+from services.stored_matches import StoredMatchIndex
+from services.timeline_parser import compact_timeline
+from services.timeline_writer import TimelineBulkWriter, build_compact_timeline_document, build_timeline_document
+
+# progress(stage, status, detail) - status is 'running', 'completed' or 'failed'
+ProgressCallback = Callable[[str, str, Optional[Dict]], None]
+
+# on_item(puuid, resource, index, payload) - resource is 'match' or 'timeline'
+ItemCallback = Callable[[str, str, int, Dict], Awaitable[Any]]
+
+# on_persisted(resource, match_id) - called once a match/timeline has been handed to the stores
+PersistedCallback = Callable[[str, str], None]
+
 load_dotenv()
 
 class PlayerDataService:
-    def __init__(self):
+    def __init__(self, riot_client: Optional[RiotAPIClient] = None):
         self.riot_api_key = os.getenv('RIOT_API_KEY')
         self.aws_region = os.getenv('AWS_REGION', 'us-east-1')
         self.mongodb_connection = os.getenv('MONGODB_CONNECTION_STRING')
 
-        # Riot API base URLs
-        self.base_url_americas = "https://americas.api.riotgames.com"
-        self.base_url_na = "https://na1.api.riotgames.com"
-
-        # AWS DynamoDB
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.aws_region)
+        # Riot API routing (account/match-v5 use the regional host, the rest the platform host)
+        self.region = "americas"
+        self.platform = "na1"
+
+        # Riot API client (pooled connections + shared rate limiter). Ingestion is
+        # bulk traffic, so it only uses capacity left over by interactive lookups.
+        # Payloads are decoded with floats as Decimal so they can be written to
+        # DynamoDB as-is (an injected client should set decode_decimals=True too).
+        self.riot_client = riot_client or RiotAPIClient(
+            api_key=self.riot_api_key,
+            priority=RequestPriority.BACKFILL,
+            decode_decimals=True
+        )
+
+        # AWS DynamoDB (the process-wide resource shared with the other batched writers)
+        self.dynamodb = get_dynamodb_resource()
         self.dynamodb_table = self.dynamodb.Table('lol-player-data')
 
         # MongoDB Atlas
         self.mongo_client = MongoClient(self.mongodb_connection)
         self.mongo_db = self.mongo_client['lol_timelines']
 
-    async def fetch_player_data(self, game_name: str, tag_line: str, match_count: int = 10):
+        # Pre-flight check for matches that are already stored
+        self.stored_matches = StoredMatchIndex(self.dynamodb, 'lol-player-data', self.mongo_db)
+
+    async def fetch_player_data(
+        self,
+        game_name: str,
+        tag_line: str,
+        match_count: int = 10,
+        incremental: bool = True,
+        full_season: bool = False,
+        compact_timelines: bool = False,
+        concurrency: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        on_item: Optional[ItemCallback] = None,
+        skip_stored: bool = True
+    ):
         """
         Fetch all player data from Riot API
 
+        Runs as a dependency-aware pipeline: once the account (PUUID) is known,
+        summoner → ranked, match IDs → matches + timelines, mastery and
+        challenges all run concurrently, and every match/timeline request is
+        issued as soon as the match IDs arrive.
+
         Args:
             game_name: Player's game name (e.g., "Sneaky")
             tag_line: Player's tag line (e.g., "NA1")
-            match_count: Number of recent matches to fetch (default: 10)
+            match_count: Number of recent matches to fetch on a first sync (default: 10)
+            incremental: Only fetch matches newer than the player's sync cursor
+            full_season: Walk the whole season instead of the last match_count matches
+            compact_timelines: Stream-parse timelines into the compact form instead
+                               of holding each ~1 MB raw timeline in memory
+            concurrency: Max in-flight match/timeline requests (default: RIOT_MAX_CONCURRENCY)
+            progress: Optional callback notified as each stage starts and finishes
+            on_item: Optional async callback that receives each match and timeline as
+                     it arrives; they are then not collected in the result
+            skip_stored: Don't fetch matches whose match item and timeline are already stored
 
         Returns:
-            Dict with all fetched data and status
+            Dict with all fetched data, status and a per-stage 'timings' breakdown
         """
-        async with httpx.AsyncClient() as client:
-            headers = {"X-Riot-Token": self.riot_api_key}
+        pipeline_start = time.perf_counter()
+        timings = {}
 
+        async def timed(stage: str, coro):
+            started = time.perf_counter()
+            self._report(progress, stage, 'running')
+            status = 'failed'
             try:
-                # 1. Get account by Riot ID
-                print(f"Fetching account for {game_name}#{tag_line}...")
-                account_url = f"{self.base_url_americas}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-                account_response = await client.get(account_url, headers=headers)
-                account_response.raise_for_status()
-                account_data = account_response.json()
-                puuid = account_data['puuid']
-
-                print(f"✓ Found account: {puuid}")
-
-                # 2. Get summoner by PUUID
-                print("Fetching summoner data...")
-                summoner_url = f"{self.base_url_na}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-                summoner_response = await client.get(summoner_url, headers=headers)
-                summoner_response.raise_for_status()
-                summoner_data = summoner_response.json()
-
-                # 3. Get match IDs
-                print(f"Fetching last {match_count} match IDs...")
-                match_ids_url = f"{self.base_url_americas}/lol/match/v5/matches/by-puuid/{puuid}/ids?start=0&count={match_count}"
-                match_ids_response = await client.get(match_ids_url, headers=headers)
-                match_ids_response.raise_for_status()
-                match_ids = match_ids_response.json()
-
-                print(f"✓ Found {len(match_ids)} matches")
-
-                # 4. Get match details
-                matches = []
-                for i, match_id in enumerate(match_ids, 1):
-                    print(f"Fetching match {i}/{len(match_ids)}: {match_id}")
-                    match_url = f"{self.base_url_americas}/lol/match/v5/matches/{match_id}"
-                    match_response = await client.get(match_url, headers=headers)
-                    if match_response.status_code == 200:
-                        matches.append(match_response.json())
-                    else:
-                        print(f"  ⚠️ Failed to fetch match {match_id}")
-
-                # 5. Get match timelines
-                timelines = []
-                for i, match_id in enumerate(match_ids, 1):
-                    print(f"Fetching timeline {i}/{len(match_ids)}: {match_id}")
-                    timeline_url = f"{self.base_url_americas}/lol/match/v5/matches/{match_id}/timeline"
-                    timeline_response = await client.get(timeline_url, headers=headers)
-                    if timeline_response.status_code == 200:
-                        timelines.append({
-                            'matchId': match_id,
-                            'data': timeline_response.json()
-                        })
-                    else:
-                        print(f"  ⚠️ Failed to fetch timeline {match_id}")
-
-                # 6. Get champion mastery
-                print("Fetching champion mastery...")
-                mastery_url = f"{self.base_url_na}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top?count=10"
-                mastery_response = await client.get(mastery_url, headers=headers)
-                champion_mastery = mastery_response.json() if mastery_response.status_code == 200 else []
-
-                # 7. Get ranked data
-                print("Fetching ranked data...")
-                ranked_url = f"{self.base_url_na}/lol/league/v4/entries/by-summoner/{summoner_data['id']}"
-                ranked_response = await client.get(ranked_url, headers=headers)
-                ranked_data = ranked_response.json() if ranked_response.status_code == 200 else []
-
-                # 8. Get challenges
-                print("Fetching challenges...")
-                challenges_url = f"{self.base_url_na}/lol/challenges/v1/player-data/{puuid}"
-                challenges_response = await client.get(challenges_url, headers=headers)
-                challenges_data = challenges_response.json() if challenges_response.status_code == 200 else {}
-
-                print(f"\n✅ Successfully fetched all data for {game_name}#{tag_line}")
-
-                return {
-                    'success': True,
-                    'puuid': puuid,
-                    'gameName': game_name,
-                    'tagLine': tag_line,
-                    'account': account_data,
-                    'summoner': summoner_data,
-                    'matches': matches,
-                    'timelines': timelines,
-                    'championMastery': champion_mastery,
-                    'ranked': ranked_data,
-                    'challenges': challenges_data
+                value = await coro
+                status = 'completed'
+                return value
+            finally:
+                timings[stage] = {
+                    'startMs': round((started - pipeline_start) * 1000, 1),
+                    'durationMs': round((time.perf_counter() - started) * 1000, 1)
                 }
+                self._report(progress, stage, status, timings[stage])
 
-            except httpx.HTTPStatusError as e:
-                error_msg = f"API Error: {e.response.status_code} - {e.response.text}"
-                print(f"❌ {error_msg}")
-                return {'success': False, 'error': error_msg}
-            except Exception as e:
-                error_msg = f"Error: {str(e)}"
-                print(f"❌ {error_msg}")
-                return {'success': False, 'error': error_msg}
+        try:
+            # 1. Get account by Riot ID (everything else depends on the PUUID)
+            print(f"Fetching account for {game_name}#{tag_line}...")
+            account_data = await timed('account', self.riot_client.get_account_by_riot_id(game_name, tag_line, self.region))
+            puuid = account_data['puuid']
+
+            print(f"✓ Found account: {puuid}")
+
+            # 2. Summoner, then ranked (ranked needs the summoner ID)
+            async def fetch_summoner_and_ranked():
+                summoner_data = await timed('summoner', self.riot_client.get_summoner_by_puuid(puuid, self.platform))
+                ranked_data = await timed('ranked', self._fetch_optional(
+                    self.riot_client.get_league_entries_by_summoner(summoner_data['id'], platform=self.platform), []
+                ))
+                return summoner_data, ranked_data
+
+            # 3. Match IDs (only games after the sync cursor when we have one), then
+            #    every match and timeline in one concurrent, pipelined batch
+            async def fetch_match_ids():
+                cursor = await asyncio.to_thread(self.get_sync_cursor, puuid) if incremental else None
+                if cursor:
+                    print(f"Fetching match IDs played since {datetime.utcfromtimestamp(cursor / 1000).isoformat()}...")
+                    match_ids = await self.riot_client.sync_match_history(
+                        puuid, since=cursor // 1000 + 1, region=self.region
+                    )
+                    return match_ids, 'incremental', cursor
+                if full_season:
+                    print("Fetching match IDs for the whole season...")
+                    match_ids = await self.riot_client.sync_match_history(puuid, region=self.region)
+                    return match_ids, 'full_season', cursor
+                print(f"Fetching last {match_count} match IDs...")
+                match_ids = await self.riot_client.get_match_history(puuid, region=self.region, count=match_count)
+                return match_ids, 'recent', cursor
+
+            async def fetch_matches():
+                match_ids, sync_mode, cursor = await timed('matchIds', fetch_match_ids())
+                dedup = {'skipped': [], 'stats': None}
+                if skip_stored and match_ids:
+                    match_ids, dedup = await timed('dedup', self._skip_stored(puuid, match_ids, compact_timelines))
+                print(f"✓ Found {len(match_ids)} new matches, fetching matches and timelines...")
+                on_result = None
+                if on_item is not None:
+                    async def on_result(resource, index, match_id, payload):
+                        await on_item(puuid, resource, index, payload)
+                report = await timed('matches', self.riot_client.fetch_matches(
+                    match_ids, self.region, include_timelines=True,
+                    compact_timelines=compact_timelines, concurrency=concurrency,
+                    on_result=on_result
+                ))
+                for failure in report['failed']:
+                    print(f"  ⚠️ Failed to fetch {failure['resource']} {failure['matchId']}: {failure['error']}")
+                report['matchIds'] = match_ids
+                report['dedup'] = dedup
+                return report, sync_mode, cursor
+
+            # 4. Mastery and challenges only need the PUUID
+            print("Fetching summoner, matches, mastery, ranked and challenges concurrently...")
+            (summoner_data, ranked_data), (report, sync_mode, cursor), champion_mastery, challenges_data = await asyncio.gather(
+                fetch_summoner_and_ranked(),
+                fetch_matches(),
+                timed('mastery', self._fetch_optional(
+                    self.riot_client.get_top_champion_masteries(puuid, count=10, platform=self.platform), []
+                )),
+                timed('challenges', self._fetch_optional(
+                    self.riot_client.get_player_challenges(puuid, platform=self.platform), {}
+                ))
+            )
+
+            timings['total'] = {'startMs': 0.0, 'durationMs': round((time.perf_counter() - pipeline_start) * 1000, 1)}
+            print(f"\n✅ Successfully fetched all data for {game_name}#{tag_line} in {timings['total']['durationMs']:.0f}ms")
+
+            return {
+                'success': True,
+                'puuid': puuid,
+                'gameName': game_name,
+                'tagLine': tag_line,
+                'account': account_data,
+                'summoner': summoner_data,
+                'matchIds': report['matchIds'],
+                'skipped': report['dedup']['skipped'],
+                'dedup': report['dedup']['stats'],
+                'matches': report['matches'],
+                'timelines': report['timelines'],
+                'championMastery': champion_mastery,
+                'ranked': ranked_data,
+                'challenges': challenges_data,
+                'failed': report['failed'],
+                'sync': {'mode': sync_mode, 'cursor': cursor},
+                'timings': timings
+            }
+
+        except httpx.HTTPStatusError as e:
+            error_msg = f"API Error: {e.response.status_code} - {e.response.text}"
+            print(f"❌ {error_msg}")
+            return {'success': False, 'error': error_msg, 'timings': timings}
+        except Exception as e:
+            error_msg = f"Error: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {'success': False, 'error': error_msg, 'timings': timings}
+
+    async def _skip_stored(self, puuid: str, match_ids: List[str], compact: bool):
+        """Drop match IDs that are already stored; on lookup errors fetch everything"""
+        try:
+            unknown, skipped, stats = await asyncio.to_thread(self.stored_matches.partition, puuid, match_ids, compact)
+        except Exception as e:
+            print(f"  ⚠️ Stored-match check failed, fetching all {len(match_ids)} matches: {e}")
+            return match_ids, {'skipped': [], 'stats': None}
+        if skipped:
+            print(f"✓ Skipping {len(skipped)} matches already stored")
+        return unknown, {'skipped': skipped, 'stats': stats}
+
+    @staticmethod
+    def _report(progress: Optional[ProgressCallback], stage: str, status: str, detail: Optional[Dict] = None):
+        """Notify a progress callback, never letting it break ingestion"""
+        if progress is None:
+            return
+        try:
+            progress(stage, status, detail)
+        except Exception as e:
+            print(f"  ⚠️ Progress callback failed: {e}")
 
-    def save_to_filesystem(self, player_data: Dict, base_dir: str = 'player_data') -> str:
-        """Save fetched data to filesystem in organized structure"""
+    async def _fetch_optional(self, request, default):
+        """Await a Riot API call, falling back to a default if it fails"""
+        try:
+            return await request
+        except httpx.HTTPError:
+            return default
+
+    def get_sync_cursor(self, puuid: str) -> Optional[int]:
+        """Get the newest synced gameCreation (epoch ms) for a player, if any"""
+        response = self.dynamodb_table.get_item(
+            Key={'puuid': puuid, 'dataType': 'sync_state'},
+            ProjectionExpression='lastGameCreation'
+        )
+        item = response.get('Item')
+        return int(item['lastGameCreation']) if item else None
+
+    @staticmethod
+    def safe_sync_cursor(match_ids: List[str], stored: Dict[str, Optional[int]], failed: Set[str]) -> Optional[int]:
+        """
+        Newest gameCreation the sync cursor can move to without skipping a failed match
 
-        puuid = player_data['puuid']
-        game_name = player_data['gameName']
-        tag_line = player_data['tagLine']
+        Args:
+            match_ids: Match IDs fetched this run, newest first
+            stored: matchId -> gameCreation of the matches fully stored
+            failed: matchIds that failed to fetch or store
+
+        Returns:
+            Only matches listed after (older than) the oldest failed one count, since the next
+            incremental refresh only lists games newer than the cursor; None keeps the cursor
+        """
+        if failed:
+            positions = [index for index, match_id in enumerate(match_ids) if match_id in failed]
+            if not positions:
+                return None
+            match_ids = match_ids[max(positions) + 1:]
+        game_creations = [stored[match_id] for match_id in match_ids if stored.get(match_id)]
+        return max(game_creations) if game_creations else None
+
+    def update_sync_cursor(self, puuid: str, newest: Optional[int]):
+        """Advance the player's sync cursor to the newest stored gameCreation (epoch ms)"""
+        if not newest:
+            return
+
+        try:
+            # Never move the cursor backwards (e.g. a concurrent older refresh)
+            self.dynamodb_table.update_item(
+                Key={'puuid': puuid, 'dataType': 'sync_state'},
+                UpdateExpression='SET lastGameCreation = :newest, syncedAt = :now',
+                ConditionExpression='attribute_not_exists(lastGameCreation) OR lastGameCreation < :newest',
+                ExpressionAttributeValues={':newest': newest, ':now': datetime.utcnow().isoformat()}
+            )
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+
+    def bump_data_version(self, puuid: str, summaries_failed: bool = False):
+        """
+        Bump the player's data version so cached match lists (in every process) are re-read
+
+        summaries_failed clears the player's summariesComplete mark in the same update, so
+        complete_match_summaries rewrites the lost summary items instead of readers missing them.
+        """
+        try:
+            get_match_repository().bump_version(puuid, summaries_complete=False if summaries_failed else None)
+        except Exception as e:
+            print(f"  ⚠️ Failed to bump data version for {puuid[:8]}: {e}")
+
+    @staticmethod
+    def lost_summaries(report: Dict) -> bool:
+        """Whether a DynamoDB writer report has a failed summary#<matchId> item"""
+        return any(failure['key']['dataType'].startswith(SUMMARY_PREFIX) for failure in report['failed'])
 
-        # Create player directory
+    def complete_match_summaries(self, puuid: str):
+        """Write summaries for stored matches that predate them, so readers can switch to summaries"""
+        try:
+            report = complete_player_summaries(puuid)
+        except Exception as e:
+            print(f"  ⚠️ Failed to complete match summaries for {puuid[:8]}: {e}")
+            return
+        if report['written']:
+            print(f"✓ Wrote {report['written']} summaries for previously stored matches")
+        for failure in report['failed']:
+            print(f"  ⚠️ Failed to write summary for {failure['key']}: {failure['error']}")
+
+    @staticmethod
+    def index_player_name(player_data: Dict, report: Dict):
+        """Add the player to this process's name index once their name item is stored"""
+        player_name = f"{player_data['gameName']}#{player_data['tagLine']}"
+        if f'{NAME_PREFIX}{normalize_name(player_name)}' not in {failure['key']['dataType'] for failure in report['failed']}:
+            get_player_index().add(player_name, player_data['puuid'])
+
+    def _player_dir(self, puuid: str, game_name: str, tag_line: str, base_dir: str = 'player_data') -> Path:
         player_dir = Path(base_dir) / f"{game_name}_{tag_line}_{puuid[:8]}"
         player_dir.mkdir(parents=True, exist_ok=True)
+        return player_dir
+
+    @staticmethod
+    def _save_layout(layout: Optional[str]) -> str:
+        """'archive' (compressed bundle, default) or 'directory' (pretty-printed file per match)"""
+        layout = layout or os.getenv('LOCAL_SAVE_LAYOUT', 'archive')
+        if layout not in ('archive', 'directory'):
+            raise ValueError(f"Unknown save layout: {layout}")
+        return layout
+
+    def save_to_filesystem(self, player_data: Dict, base_dir: str = 'player_data', layout: Optional[str] = None) -> str:
+        """
+        Save fetched data to filesystem (blocking; call it through asyncio.to_thread from async code)
 
+        Args:
+            player_data: fetch_player_data result
+            base_dir: Root directory for player folders
+            layout: 'archive' or 'directory' (default: LOCAL_SAVE_LAYOUT)
+        """
+
+        player_dir = self._player_dir(player_data['puuid'], player_data['gameName'], player_data['tagLine'], base_dir)
         print(f"\nSaving data to: {player_dir}")
 
+        if self._save_layout(layout) == 'archive':
+            archive = PlayerArchiveWriter(player_dir)
+            try:
+                for i, match in enumerate(player_data['matches'], 1):
+                    archive.add_match(i, match)
+                for timeline_obj in player_data['timelines']:
+                    archive.add_timeline(timeline_obj)
+            except Exception:
+                archive.abort()
+                raise
+            report = self.publish_archive(archive, player_data)
+            print(f"✅ Archived {report['records']} records ({report['bytes']:,} bytes, {report['codec']})")
+            return str(player_dir)
+
+        for i, match in enumerate(player_data['matches'], 1):
+            self.save_match_file(player_dir, i, match)
+        for timeline_obj in player_data['timelines']:
+            self.save_timeline_file(player_dir, timeline_obj)
+        self.save_profile_files(player_dir, player_data, len(player_data['matches']), len(player_data['timelines']))
+
+        print(f"✅ Saved all data to filesystem")
+        return str(player_dir)
+
+    @staticmethod
+    def publish_archive(archive: PlayerArchiveWriter, player_data: Dict) -> Dict:
+        """Add the account, summoner, mastery, ranked and challenges records and publish the archive"""
+        for name in ('account', 'summoner', 'championMastery', 'ranked', 'challenges'):
+            archive.add_profile(name, player_data[name])
+        return archive.close({
+            'puuid': player_data['puuid'],
+            'gameName': player_data['gameName'],
+            'tagLine': player_data['tagLine']
+        })
+
+    def export_archive(self, player_dir: Path) -> Dict:
+        """
+        Write a player's archive out in the per-file directory layout
+
+        Returns:
+            Dict with the directory and the number of matches and timelines written
+        """
+        player_dir = Path(player_dir)
+        archive = PlayerArchive(player_dir)
+        counts = {'match': 0, 'timeline': 0}
+        # Profile records are missing if no run ever got past the match fetch
+        profile = {'account': {}, 'summoner': {}, 'championMastery': [], 'ranked': [], 'challenges': {}, **archive.index['player']}
+
+        for record, data in archive.iter_records():
+            if record['type'] == 'match':
+                self.save_match_file(player_dir, record.get('index') or counts['match'] + 1, data)
+                counts['match'] += 1
+            elif record['type'] == 'timeline':
+                self.save_timeline_file(player_dir, {'matchId': record['key'], 'data': data})
+                counts['timeline'] += 1
+            elif record['type'] == 'timeline_compact':
+                self.save_timeline_file(player_dir, {'matchId': record['key'], 'compact': data})
+                counts['timeline'] += 1
+            else:
+                profile[record['key']] = data
+
+        self.save_profile_files(player_dir, profile, counts['match'], counts['timeline'])
+        return {'directory': str(player_dir), 'matches': counts['match'], 'timelines': counts['timeline']}
+
+    def save_match_file(self, player_dir: Path, index: int, match: Dict):
+        """Save one match summary (index is the 1-based position in the match history)"""
+        matches_dir = player_dir / 'match_summary'
+        matches_dir.mkdir(exist_ok=True)
+        match_id = match['metadata']['matchId']
+        with open(matches_dir / f'match_{index}_{match_id}.json', 'w', encoding='utf-8') as f:
+            json.dump(match, f, indent=2, default=json_default)
+
+    def save_timeline_file(self, player_dir: Path, timeline_obj: Dict):
+        """Save one timeline ({matchId, data} or {matchId, compact})"""
+        timelines_dir = player_dir / 'match_timeline'
+        timelines_dir.mkdir(exist_ok=True)
+        match_id = timeline_obj['matchId']
+        if 'compact' in timeline_obj:
+            with open(timelines_dir / f'timeline_{match_id}.compact.json', 'w', encoding='utf-8') as f:
+                json.dump(timeline_obj['compact'], f)
+            return
+        with open(timelines_dir / f'timeline_{match_id}.json', 'w', encoding='utf-8') as f:
+            json.dump(timeline_obj['data'], f, indent=2)
+
+    def save_profile_files(self, player_dir: Path, player_data: Dict, match_count: int, timeline_count: int):
+        """Save account, summoner, mastery, ranked, challenges and the README"""
+
         # Save account
         account_dir = player_dir / 'account'
         account_dir.mkdir(exist_ok=True)
         with open(account_dir / 'account.json', 'w', encoding='utf-8') as f:
-            json.dump(player_data['account'], f, indent=2, ensure_ascii=False)
+            json.dump(player_data['account'], f, indent=2, ensure_ascii=False, default=json_default)
 
         # Save summoner
         summoner_dir = player_dir / 'summoner'
         summoner_dir.mkdir(exist_ok=True)
         with open(summoner_dir / 'summoner.json', 'w', encoding='utf-8') as f:
-            json.dump(player_data['summoner'], f, indent=2)
-
-        # Save matches
-        matches_dir = player_dir / 'match_summary'
-        matches_dir.mkdir(exist_ok=True)
-        for i, match in enumerate(player_data['matches'], 1):
-            match_id = match['metadata']['matchId']
-            with open(matches_dir / f'match_{i}_{match_id}.json', 'w', encoding='utf-8') as f:
-                json.dump(match, f, indent=2)
-
-        # Save timelines
-        timelines_dir = player_dir / 'match_timeline'
-        timelines_dir.mkdir(exist_ok=True)
-        for timeline_obj in player_data['timelines']:
-            match_id = timeline_obj['matchId']
-            with open(timelines_dir / f'timeline_{match_id}.json', 'w', encoding='utf-8') as f:
-                json.dump(timeline_obj['data'], f, indent=2)
+            json.dump(player_data['summoner'], f, indent=2, default=json_default)
 
         # Save champion mastery
         mastery_dir = player_dir / 'champion_mastery'
         mastery_dir.mkdir(exist_ok=True)
         with open(mastery_dir / 'champion.json', 'w', encoding='utf-8') as f:
-            json.dump(player_data['championMastery'], f, indent=2)
+            json.dump(player_data['championMastery'], f, indent=2, default=json_default)
 
         # Save ranked
         ranked_dir = player_dir / 'ranked'
         ranked_dir.mkdir(exist_ok=True)
         with open(ranked_dir / 'ranked.json', 'w', encoding='utf-8') as f:
-            json.dump(player_data['ranked'], f, indent=2)
+            json.dump(player_data['ranked'], f, indent=2, default=json_default)
 
         # Save challenges
         challenges_dir = player_dir / 'challenges'
         challenges_dir.mkdir(exist_ok=True)
         with open(challenges_dir / 'challenges.json', 'w', encoding='utf-8') as f:
-            json.dump(player_data['challenges'], f, indent=2)
+            json.dump(player_data['challenges'], f, indent=2, default=json_default)
 
         # Save README
         readme = {
             'fetch_date': datetime.utcnow().isoformat(),
-            'player': f"{game_name}#{tag_line}",
-            'puuid': puuid,
-            'match_count': len(player_data['matches']),
-            'timeline_count': len(player_data['timelines'])
+            'player': f"{player_data['gameName']}#{player_data['tagLine']}",
+            'puuid': player_data['puuid'],
+            'match_count': match_count,
+            'timeline_count': timeline_count
         }
         with open(player_dir / 'README.json', 'w', encoding='utf-8') as f:
             json.dump(readme, f, indent=2)
 
-        print(f"✅ Saved all data to filesystem")
-        return str(player_dir)
+    def new_dynamo_writer(self) -> DynamoBatchWriter:
+        """Batched writer for lol-player-data (25-item batches on a thread pool)"""
+        return DynamoBatchWriter(self.dynamodb, 'lol-player-data')
 
-    def upload_to_dynamodb(self, player_data: Dict) -> int:
-        """Upload player data to DynamoDB (except timelines)"""
+    def upload_to_dynamodb(self, player_data: Dict) -> Dict:
+        """
+        Upload player data to DynamoDB (except timelines) in batches
 
-        puuid = player_data['puuid']
-        game_name = player_data['gameName']
-        tag_line = player_data['tagLine']
-        player_name = f"{game_name}#{tag_line}"
+        Returns:
+            Batch writer report (items, batches, consumedCapacity, failed, ...)
+        """
 
         print(f"\nUploading to DynamoDB...")
-        upload_count = 0
-
-        # Helper to convert floats to Decimal
-        def convert_floats(obj):
-            from decimal import Decimal
-            if isinstance(obj, float):
-                return Decimal(str(obj))
-            elif isinstance(obj, dict):
-                return {k: convert_floats(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_floats(item) for item in obj]
-            return obj
+        uploaded_at = datetime.utcnow().isoformat()
+
+        writer = self.new_dynamo_writer()
+        for match in player_data['matches']:
+            writer.put_many(self.match_items(player_data['puuid'], match, uploaded_at))
+        writer.put_many(self.profile_items(player_data, uploaded_at))
+        report = writer.close()
+        self.index_player_name(player_data, report)
+        if player_data['matches']:
+            self.bump_data_version(player_data['puuid'], self.lost_summaries(report))
+        self.complete_match_summaries(player_data['puuid'])
+
+        for failure in report['failed']:
+            print(f"  ⚠️ Failed to upload {failure['key']['dataType']}: {failure['error']}")
+        print(f"✅ Uploaded {report['items']} items to DynamoDB in {report['batches']} batches "
+              f"({report['consumedCapacity']} WCU)")
+        return report
+
+    def match_item(self, puuid: str, match: Dict, uploaded_at: str) -> Dict:
+        """Build the match#<matchId> item for one match (payload format per DYNAMO_MATCH_PAYLOAD)"""
+        match_id = match['metadata']['matchId']
+        return pack_payload({
+            'puuid': puuid,
+            'dataType': f'match#{match_id}',
+            'matchId': match_id,
+            'data': match,
+            'uploadedAt': uploaded_at
+        })
+
+    def match_items(self, puuid: str, match: Dict, uploaded_at: str) -> List[Dict]:
+        """The match#<matchId> item plus the player's slim summary#<matchId> item for analytics reads"""
+        items = [self.match_item(puuid, match, uploaded_at)]
+        summary = build_summary_item(puuid, match, uploaded_at)
+        if summary is not None:
+            items.append(summary)
+        return items
+
+    def profile_items(self, player_data: Dict, uploaded_at: str) -> List[Dict]:
+        """Build the account, summoner, mastery, ranked and challenges items"""
 
-        try:
-            # 1. Upload account
-            self.dynamodb_table.put_item(Item=convert_floats({
-                'puuid': puuid,
-                'dataType': 'account',
-                'playerName': player_name,
-                'data': player_data['account'],
-                'uploadedAt': datetime.utcnow().isoformat()
-            }))
-            upload_count += 1
-            print(f"  ✓ Uploaded account")
-
-            # 2. Upload summoner
-            self.dynamodb_table.put_item(Item=convert_floats({
+        puuid = player_data['puuid']
+        player_name = f"{player_data['gameName']}#{player_data['tagLine']}"
+
+        # 1. Account
+        items = [{
+            'puuid': puuid,
+            'dataType': 'account',
+            'playerName': player_name,
+            'data': player_data['account'],
+            'uploadedAt': uploaded_at
+        }]
+
+        # 1b. Riot ID -> puuid lookup item (player search and autocomplete)
+        items.append(name_item(puuid, player_name, uploaded_at))
+
+        # 2. Summoner
+        items.append({
+            'puuid': puuid,
+            'dataType': 'summoner',
+            'data': player_data['summoner'],
+            'uploadedAt': uploaded_at
+        })
+
+        # 3. Champion mastery
+        items.append({
+            'puuid': puuid,
+            'dataType': 'champion_mastery',
+            'data': player_data['championMastery'],
+            'uploadedAt': uploaded_at
+        })
+
+        # 4. Ranked
+        if player_data['ranked']:
+            items.append({
                 'puuid': puuid,
-                'dataType': 'summoner',
-                'data': player_data['summoner'],
-                'uploadedAt': datetime.utcnow().isoformat()
-            }))
-            upload_count += 1
-            print(f"  ✓ Uploaded summoner")
-
-            # 3. Upload matches
-            for match in player_data['matches']:
-                match_id = match['metadata']['matchId']
-                self.dynamodb_table.put_item(Item=convert_floats({
-                    'puuid': puuid,
-                    'dataType': f'match#{match_id}',
-                    'matchId': match_id,
-                    'data': match,
-                    'uploadedAt': datetime.utcnow().isoformat()
-                }))
-                upload_count += 1
-            print(f"  ✓ Uploaded {len(player_data['matches'])} matches")
-
-            # 4. Upload champion mastery
-            self.dynamodb_table.put_item(Item=convert_floats({
+                'dataType': 'ranked',
+                'data': player_data['ranked'],
+                'uploadedAt': uploaded_at
+            })
+
+        # 5. Challenges
+        if player_data['challenges']:
+            items.append({
                 'puuid': puuid,
-                'dataType': 'champion_mastery',
-                'data': player_data['championMastery'],
-                'uploadedAt': datetime.utcnow().isoformat()
-            }))
-            upload_count += 1
-            print(f"  ✓ Uploaded champion mastery")
-
-            # 5. Upload ranked
-            if player_data['ranked']:
-                self.dynamodb_table.put_item(Item=convert_floats({
-                    'puuid': puuid,
-                    'dataType': 'ranked',
-                    'data': player_data['ranked'],
-                    'uploadedAt': datetime.utcnow().isoformat()
-                }))
-                upload_count += 1
-                print(f"  ✓ Uploaded ranked data")
-
-            # 6. Upload challenges
-            if player_data['challenges']:
-                self.dynamodb_table.put_item(Item=convert_floats({
-                    'puuid': puuid,
-                    'dataType': 'challenges',
-                    'data': player_data['challenges'],
-                    'uploadedAt': datetime.utcnow().isoformat()
-                }))
-                upload_count += 1
-                print(f"  ✓ Uploaded challenges")
-
-            print(f"✅ Uploaded {upload_count} items to DynamoDB")
-            return upload_count
+                'dataType': 'challenges',
+                'data': player_data['challenges'],
+                'uploadedAt': uploaded_at
+            })
+
+        return items
+
+    def new_timeline_writers(self) -> Dict[str, TimelineBulkWriter]:
+        """Bulk upserters for raw and compact timelines"""
+        return {
+            'raw': TimelineBulkWriter(self.mongo_db.timelines),
+            'compact': TimelineBulkWriter(self.mongo_db.timelines_compact)
+        }
 
-        except Exception as e:
-            print(f"❌ DynamoDB upload error: {e}")
-            return upload_count
+    @staticmethod
+    def close_timeline_writers(writers: Dict[str, TimelineBulkWriter]) -> Dict:
+        """Flush both timeline writers and merge their reports"""
+        reports = [writer.close() for writer in writers.values()]
+        return {
+            'documents': sum(r['documents'] for r in reports),
+            'upserted': sum(r['upserted'] for r in reports),
+            'modified': sum(r['modified'] for r in reports),
+            'batches': [batch for r in reports for batch in r['batches']],
+            'errors': [error for r in reports for error in r['errors']],
+            'durationMs': max(r['durationMs'] for r in reports)
+        }
 
-    def upload_to_mongodb(self, player_data: Dict) -> int:
-        """Upload timelines to MongoDB Atlas"""
+    def upload_to_mongodb(self, player_data: Dict) -> Dict:
+        """
+        Upload timelines to MongoDB Atlas with unordered bulk upserts
+
+        Returns:
+            Merged timeline writer report (documents, batches, errors, ...)
+        """
 
-        puuid = player_data['puuid']
         print(f"\nUploading timelines to MongoDB Atlas...")
-        upload_count = 0
+        uploaded_at = datetime.utcnow()
 
-        try:
-            for timeline_obj in player_data['timelines']:
-                match_id = timeline_obj['matchId']
-                timeline_data = timeline_obj['data']
-
-                doc = {
-                    'matchId': match_id,
-                    'puuid': puuid,
-                    'data': timeline_data,
-                    'uploadedAt': datetime.utcnow()
-                }
+        writers = self.new_timeline_writers()
+        for timeline_obj in player_data['timelines']:
+            self.upsert_timeline(player_data['puuid'], timeline_obj, writers, uploaded_at)
+        report = self.close_timeline_writers(writers)
 
-                # Add metadata
-                if 'info' in timeline_data:
-                    info = timeline_data['info']
-                    doc['gameCreation'] = info.get('gameCreation')
-                    doc['gameDuration'] = info.get('gameDuration')
-                    doc['frameInterval'] = info.get('frameInterval')
-                    doc['frames'] = len(info.get('frames', []))
-
-                # Upsert (update or insert)
-                self.mongo_db.timelines.update_one(
-                    {'matchId': match_id},
-                    {'$set': doc},
-                    upsert=True
-                )
-                upload_count += 1
-
-            print(f"✅ Uploaded {upload_count} timelines to MongoDB")
-            return upload_count
+        for error in report['errors']:
+            print(f"  ⚠️ Failed to upload timeline {error['matchId']}: {error['error']}")
+        print(f"✅ Uploaded {report['documents']} timelines to MongoDB in {len(report['batches'])} batches")
+        return report
 
-        except Exception as e:
-            print(f"❌ MongoDB upload error: {e}")
-            return upload_count
+    def upsert_timeline(self, puuid: str, timeline_obj: Dict, writers: Dict[str, TimelineBulkWriter], uploaded_at: datetime):
+        """
+        Queue upserts for one timeline ({matchId, data} or {matchId, compact})
 
-    async def process_player(self, game_name: str, tag_line: str, match_count: int = 10, save_local: bool = True):
+        Raw timelines also get their derived compact document, which is what
+        the heatmap readers load; compact-only ingestion skips the raw one.
         """
-        Complete flow: Fetch → Save → Upload
+        match_id = timeline_obj['matchId']
+
+        if 'compact' in timeline_obj:
+            compact = timeline_obj['compact']
+        else:
+            writers['raw'].add(build_timeline_document(match_id, puuid, timeline_obj['data'], uploaded_at))
+            compact = compact_timeline(timeline_obj['data'], match_id)
+
+        writers['compact'].add(build_compact_timeline_document(match_id, puuid, compact, uploaded_at))
+
+    def _persist_item(
+        self,
+        puuid: str,
+        resource: str,
+        index: int,
+        payload: Dict,
+        game_name: str,
+        tag_line: str,
+        save_local: bool,
+        archive: Optional[PlayerArchiveWriter],
+        writer: DynamoBatchWriter,
+        timeline_writers: Dict[str, TimelineBulkWriter],
+        uploaded_at: datetime
+    ) -> Dict:
+        """
+        Write one streamed match or timeline to every sink (runs on a worker thread)
+
+        Matches and timelines are handed to the batched DynamoDB and MongoDB
+        writers, so 'stored' means queued there; failed batches are reported
+        when the writers close.
+
+        Returns:
+            Dict with 'saved' and 'stored' flags and an 'errors' list
+        """
+        outcome = {'saved': False, 'stored': False, 'errors': []}
+
+        if save_local:
+            try:
+                if archive is not None:
+                    if resource == 'match':
+                        archive.add_match(index + 1, payload)
+                    else:
+                        archive.add_timeline(payload)
+                else:
+                    player_dir = self._player_dir(puuid, game_name, tag_line)
+                    if resource == 'match':
+                        self.save_match_file(player_dir, index + 1, payload)
+                    else:
+                        self.save_timeline_file(player_dir, payload)
+                outcome['saved'] = True
+            except Exception as e:
+                outcome['errors'].append({'sink': 'save', 'error': str(e)})
+
+        sink = 'dynamodb' if resource == 'match' else 'mongodb'
+        try:
+            if resource == 'match':
+                writer.put_many(self.match_items(puuid, payload, uploaded_at.isoformat()))
+            else:
+                self.upsert_timeline(puuid, payload, timeline_writers, uploaded_at)
+            outcome['stored'] = True
+        except Exception as e:
+            outcome['errors'].append({'sink': sink, 'error': str(e)})
+
+        return outcome
+
+    async def process_player(
+        self,
+        game_name: str,
+        tag_line: str,
+        match_count: int = 10,
+        save_local: bool = True,
+        incremental: bool = True,
+        full_season: bool = False,
+        compact_timelines: bool = False,
+        concurrency: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        skip_stored: bool = True,
+        save_layout: Optional[str] = None,
+        on_persisted: Optional[PersistedCallback] = None
+    ):
+        """
+        Complete flow: Fetch → Save → Upload, streamed per match
+
+        Matches and timelines flow from the Riot fetchers into bounded queues
+        (INGEST_QUEUE_SIZE) drained by persist workers (INGEST_PERSIST_WORKERS
+        per queue) that write each one to disk and hand it to the batched
+        DynamoDB and MongoDB writers as soon as it arrives. A full queue pauses
+        fetching, so memory stays flat no matter how many matches are ingested,
+        and a crash mid-run keeps every batch that already landed. Profile
+        items and the sync cursor are written once the fetch finishes.
+
+        With incremental=True a refresh only fetches games played after the
+        player's sync cursor. Once DynamoDB and MongoDB are flushed it is
+        advanced to the newest stored match that is older than every match
+        whose fetch, item or timeline failed, so those are fetched again.
+        With skip_stored=True matches already in DynamoDB and MongoDB are not
+        fetched again; fully stored matches are added to the player's Bloom filter.
+
+        Local saves go to the player's compressed archive by default
+        (save_layout='archive'); the archive is published atomically once the
+        run finishes. save_layout='directory' keeps the per-file JSON layout.
 
         Returns:
             Dict with status and summary
@@ -369,41 +753,250 @@ class PlayerDataService:
             'steps': {}
         }
 
-        # Step 1: Fetch from Riot API
         print("="*60)
         print(f"Processing player: {game_name}#{tag_line}")
         print("="*60)
 
-        player_data = await self.fetch_player_data(game_name, tag_line, match_count)
+        queue_size = int(os.getenv('INGEST_QUEUE_SIZE', '8'))
+        worker_count = int(os.getenv('INGEST_PERSIST_WORKERS', '4'))
+        queues = {
+            'match': asyncio.Queue(maxsize=queue_size),
+            'timeline': asyncio.Queue(maxsize=queue_size)
+        }
+        persisted = {'saved': 0, 'match': 0, 'timeline': 0}
+        # matchId -> gameCreation of queued match items, and matchIds of upserted timelines
+        queued_matches = {}
+        stored_timelines = set()
+        errors = {'save': [], 'dynamodb': [], 'mongodb': []}
+
+        # One timestamp and one set of batched DynamoDB/MongoDB writers per run
+        uploaded_at = datetime.utcnow()
+        writer = self.new_dynamo_writer()
+        timeline_writers = self.new_timeline_writers()
+
+        # Archive writer for local saves, opened once the PUUID is known
+        use_archive = save_local and self._save_layout(save_layout) == 'archive'
+        local = {'archive': None}
+        archive_lock = asyncio.Lock()
+
+        async def open_archive(puuid: str) -> Optional[PlayerArchiveWriter]:
+            # Creating the writer makes directories and opens a file, so it runs on a worker thread
+            if use_archive and local['archive'] is None:
+                async with archive_lock:
+                    if local['archive'] is None:
+                        local['archive'] = await asyncio.to_thread(
+                            PlayerArchiveWriter, self._player_dir(puuid, game_name, tag_line)
+                        )
+            return local['archive']
+
+        async def enqueue(puuid: str, resource: str, index: int, payload: Dict):
+            await open_archive(puuid)
+            await queues[resource].put((puuid, index, payload))
+
+        async def persist_worker(resource: str):
+            queue = queues[resource]
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                puuid, index, payload = item
+                try:
+                    outcome = await asyncio.to_thread(
+                        self._persist_item, puuid, resource, index, payload,
+                        game_name, tag_line, save_local, local['archive'], writer, timeline_writers, uploaded_at
+                    )
+                except Exception as e:
+                    sink = 'dynamodb' if resource == 'match' else 'mongodb'
+                    outcome = {'saved': False, 'stored': False, 'errors': [{'sink': sink, 'error': str(e)}]}
+
+                persisted['saved'] += outcome['saved']
+                if outcome['stored']:
+                    persisted[resource] += 1
+                    if resource == 'match':
+                        match_id = payload['metadata']['matchId']
+                        queued_matches[match_id] = payload.get('info', {}).get('gameCreation')
+                    else:
+                        match_id = payload['matchId']
+                        stored_timelines.add(match_id)
+                    if on_persisted is not None:
+                        try:
+                            on_persisted(resource, match_id)
+                        except Exception as e:
+                            print(f"  ⚠️ Persist callback failed for {resource} {match_id}: {e}")
+                for error in outcome['errors']:
+                    print(f"  ⚠️ Failed to {error['sink']} {resource} (item {index + 1}): {error['error']}")
+                    errors[error['sink']].append(error['error'])
+
+        workers = [
+            asyncio.create_task(persist_worker(resource))
+            for resource in queues
+            for _ in range(worker_count)
+        ]
+
+        # Step 1: Fetch from Riot API, persisting matches/timelines as they arrive
+        self._report(progress, 'fetch', 'running')
+        try:
+            player_data = await self.fetch_player_data(
+                game_name, tag_line, match_count,
+                incremental=incremental, full_season=full_season,
+                compact_timelines=compact_timelines, concurrency=concurrency,
+                progress=progress, on_item=enqueue, skip_stored=skip_stored
+            )
+        finally:
+            # Let the workers drain what already arrived, then stop them
+            for resource, queue in queues.items():
+                for _ in range(worker_count):
+                    await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
 
         if not player_data['success']:
+            # Flush the matches and timelines that did arrive before giving up
+            await asyncio.to_thread(writer.close)
+            await asyncio.to_thread(self.close_timeline_writers, timeline_writers)
+            if local['archive'] is not None:
+                await asyncio.to_thread(local['archive'].close)
+            self._report(progress, 'fetch', 'failed', {'error': player_data.get('error')})
             result['error'] = player_data.get('error')
             return result
 
-        result['puuid'] = player_data['puuid']
-        result['steps']['fetch'] = {'success': True, 'matches': len(player_data['matches'])}
+        puuid = player_data['puuid']
+        result['puuid'] = puuid
+        result['steps']['fetch'] = {
+            'success': True,
+            'matches': len(player_data['matchIds']) - sum(1 for f in player_data['failed'] if f['resource'] == 'match'),
+            'skipped': len(player_data['skipped']),
+            'dedup': player_data['dedup'],
+            'failed': player_data['failed'],
+            'sync': player_data['sync'],
+            'timings': player_data['timings']
+        }
+        self._report(progress, 'fetch', 'completed', {
+            'puuid': puuid,
+            'matches': result['steps']['fetch']['matches'],
+            'skipped': len(player_data['skipped']),
+            'failed': len(player_data['failed'])
+        })
 
-        # Step 2: Save to filesystem (optional)
+        # Step 2: Save profile files and README (matches/timelines are already on disk),
+        # or add the profile records to the archive and publish it
         if save_local:
+            self._report(progress, 'save', 'running')
             try:
-                player_dir = self.save_to_filesystem(player_data)
-                result['steps']['save'] = {'success': True, 'directory': player_dir}
+                player_dir = self._player_dir(puuid, game_name, tag_line)
+                archive = await open_archive(puuid)
+                if archive is not None:
+                    report = await asyncio.to_thread(self.publish_archive, archive, player_data)
+                    result['steps']['save'] = {
+                        'success': not errors['save'],
+                        'directory': str(player_dir),
+                        'archive': report,
+                        'filesWritten': persisted['saved'],
+                        'errors': errors['save']
+                    }
+                    print(f"✅ Archived {report['records']} records ({report['bytes']:,} bytes, {report['codec']})")
+                else:
+                    await asyncio.to_thread(
+                        self.save_profile_files, player_dir, player_data, persisted['match'], persisted['timeline']
+                    )
+                    result['steps']['save'] = {
+                        'success': not errors['save'],
+                        'directory': str(player_dir),
+                        'filesWritten': persisted['saved'],
+                        'errors': errors['save']
+                    }
             except Exception as e:
+                if local['archive'] is not None:
+                    local['archive'].abort()
                 result['steps']['save'] = {'success': False, 'error': str(e)}
+            self._report(progress, 'save', self._step_status(result['steps']['save']))
+
+        # Matches to fetch again on the next refresh (fetch, DynamoDB or timeline failures)
+        failed_matches = {failure['matchId'] for failure in player_data['failed']}
+        flushed = {'dynamodb': False, 'mongodb': False}
 
-        # Step 3: Upload to DynamoDB
+        # Step 3: Profile items to DynamoDB, then flush the batched writer
+        self._report(progress, 'dynamodb', 'running')
         try:
-            dynamo_count = self.upload_to_dynamodb(player_data)
-            result['steps']['dynamodb'] = {'success': True, 'itemsUploaded': dynamo_count}
+            # put_many can block on the writer's in-flight slots and capacity budget
+            await asyncio.to_thread(writer.put_many, self.profile_items(player_data, uploaded_at.isoformat()))
+            report = await asyncio.to_thread(writer.close)
+            self.index_player_name(player_data, report)
+
+            if queued_matches:
+                await asyncio.to_thread(self.bump_data_version, puuid, self.lost_summaries(report))
+            await asyncio.to_thread(self.complete_match_summaries, puuid)
+
+            failed_types = {failure['key']['dataType'] for failure in report['failed']}
+            for match_id in list(queued_matches):
+                if f'match#{match_id}' in failed_types or f'{SUMMARY_PREFIX}{match_id}' in failed_types:
+                    del queued_matches[match_id]
+                    failed_matches.add(match_id)
+            for failure in report['failed']:
+                print(f"  ⚠️ Failed to upload {failure['key']['dataType']}: {failure['error']}")
+                errors['dynamodb'].append(failure['error'])
+            flushed['dynamodb'] = True
+
+            result['steps']['dynamodb'] = {
+                'success': not errors['dynamodb'],
+                'itemsUploaded': report['items'],
+                'batches': report['batches'],
+                'unprocessedRetries': report['unprocessedRetries'],
+                'consumedCapacity': report['consumedCapacity'],
+                'durationMs': report['durationMs'],
+                'errors': errors['dynamodb']
+            }
+            print(f"✅ Uploaded {report['items']} items to DynamoDB in {report['batches']} batches "
+                  f"({report['consumedCapacity']} WCU)")
         except Exception as e:
+            print(f"❌ DynamoDB upload error: {e}")
             result['steps']['dynamodb'] = {'success': False, 'error': str(e)}
+        self._report(progress, 'dynamodb', self._step_status(result['steps']['dynamodb']), {
+            key: result['steps']['dynamodb'][key]
+            for key in ('itemsUploaded', 'consumedCapacity') if key in result['steps']['dynamodb']
+        })
 
-        # Step 4: Upload to MongoDB
+        # Step 4: Flush the remaining timeline batches to MongoDB
+        self._report(progress, 'mongodb', 'running')
         try:
-            mongo_count = self.upload_to_mongodb(player_data)
-            result['steps']['mongodb'] = {'success': True, 'timelinesUploaded': mongo_count}
+            report = await asyncio.to_thread(self.close_timeline_writers, timeline_writers)
+            for error in report['errors']:
+                print(f"  ⚠️ Failed to upload timeline {error['matchId']}: {error['error']}")
+                stored_timelines.discard(error['matchId'])
+                errors['mongodb'].append(error['error'])
+
+            result['steps']['mongodb'] = {
+                'success': not errors['mongodb'],
+                'timelinesUploaded': report['documents'],
+                'batches': report['batches'],
+                'durationMs': report['durationMs'],
+                'errors': errors['mongodb']
+            }
+            flushed['mongodb'] = True
+            print(f"✅ Uploaded {report['documents']} timelines to MongoDB in {len(report['batches'])} batches")
         except Exception as e:
+            print(f"❌ MongoDB upload error: {e}")
             result['steps']['mongodb'] = {'success': False, 'error': str(e)}
+        self._report(progress, 'mongodb', self._step_status(result['steps']['mongodb']), {
+            key: result['steps']['mongodb'][key]
+            for key in ('timelinesUploaded',) if key in result['steps']['mongodb']
+        })
+
+        # Advance the sync cursor only once both sinks are flushed, and never past a failed match
+        if flushed['dynamodb'] and flushed['mongodb']:
+            failed_matches |= queued_matches.keys() - stored_timelines
+            try:
+                newest = self.safe_sync_cursor(player_data['matchIds'], queued_matches, failed_matches)
+                await asyncio.to_thread(self.update_sync_cursor, puuid, newest)
+            except Exception as e:
+                print(f"  ⚠️ Failed to update sync cursor: {e}")
+
+        # Remember fully stored matches so the next refresh can skip them
+        if skip_stored:
+            try:
+                fully_stored = (queued_matches.keys() & stored_timelines) | set(player_data['skipped'])
+                await asyncio.to_thread(self.stored_matches.remember, puuid, fully_stored)
+            except Exception as e:
+                print(f"  ⚠️ Failed to update stored-match filter: {e}")
 
         result['success'] = True
         print("\n" + "="*60)
@@ -411,3 +1004,7 @@ class PlayerDataService:
         print("="*60)
 
         return result
+
+    @staticmethod
+    def _step_status(step: Dict) -> str:
+        return 'completed' if step.get('success') else 'failed'
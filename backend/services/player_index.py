@@ -0,0 +1,279 @@
+"""
+Player Name Index
+- Ingestion writes one name#<riot id, casefolded> item per player into a single `player-names`
+  partition of lol-player-data, pointing at the player's puuid
+- Exact search is a GetItem on that item (no table Scan); loading every name is one paginated Query
+- In process, a sorted case-insensitive list answers prefix (autocomplete) lookups with bisect,
+  refreshed from DynamoDB every PLAYER_INDEX_REFRESH_SECONDS and updated directly by ingestion
+- Players ingested before name items existed get theirs from backfill_player_names, which the
+  API runs in the background at startup until its marker item exists (search never Scans)
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+from services.dynamo_codec import get_dynamodb_client, get_dynamodb_resource, get_item, serialize_values
+from services.dynamo_writer import DynamoBatchWriter
+from services.match_repository import get_match_repository
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = 'lol-player-data'
+NAMES_PARTITION = 'player-names'
+NAME_PREFIX = 'name#'
+# Written to the names partition once backfill_player_names.py has covered every account
+BACKFILL_MARKER = 'backfill'
+
+
+def normalize_name(player_name: str) -> str:
+    """Case-insensitive key for a Riot ID ("Name#TAG")"""
+    return player_name.strip().casefold()
+
+
+def name_item(puuid: str, player_name: str, uploaded_at: str) -> Dict:
+    """
+    Build the name#<riot id> item that maps a player's Riot ID to their puuid
+
+    Args:
+        puuid: Player PUUID
+        player_name: Riot ID as "gameName#tagLine" (display casing is kept in playerName)
+        uploaded_at: ISO timestamp
+    """
+    return {
+        'puuid': NAMES_PARTITION,
+        'dataType': f'{NAME_PREFIX}{normalize_name(player_name)}',
+        'playerPuuid': puuid,
+        'playerName': player_name,
+        'uploadedAt': uploaded_at
+    }
+
+
+class PlayerNameIndex:
+    """
+    In-memory, case-insensitive index of every stored player's Riot ID.
+
+    Names are kept sorted, so complete() is a bisect plus a short walk.
+    A renamed player keeps their old name item as well; both resolve to
+    the same puuid.
+    """
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else float(os.getenv('PLAYER_INDEX_REFRESH_SECONDS', '300'))
+        self._keys: List[str] = []
+        self._players: Dict[str, Dict] = {}
+        self._added_during_load: Dict[str, Dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._backfilled = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self):
+        """Reload every name item from DynamoDB (one Query over the names partition)"""
+        with self._lock:
+            self._added_during_load = {}
+
+        params = {
+            'TableName': TABLE_NAME,
+            'KeyConditionExpression': 'puuid = :partition AND begins_with(dataType, :prefix)',
+            'ExpressionAttributeValues': serialize_values({':partition': NAMES_PARTITION, ':prefix': NAME_PREFIX}),
+            'ProjectionExpression': 'dataType, playerName, playerPuuid'
+        }
+        players = {}
+        for item in get_match_repository().query(params):
+            key = item['dataType'][len(NAME_PREFIX):]
+            players[key] = {'playerName': item.get('playerName'), 'puuid': item.get('playerPuuid')}
+
+        with self._lock:
+            # Keep names ingested in this process while the Query was running
+            players.update(self._added_during_load)
+            self._players = players
+            self._keys = sorted(players)
+            self._loaded_at = time.monotonic()
+        logger.info(f"Player name index loaded: {len(players)} players")
+
+    def ensure_fresh(self):
+        """Refresh when never loaded or older than refresh_seconds; errors keep the current names"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        # Another thread is already refreshing: serve what we have
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Player name index refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def add(self, player_name: str, puuid: str):
+        """Index a player just written by ingestion"""
+        key = normalize_name(player_name)
+        player = {'playerName': player_name, 'puuid': puuid}
+        with self._lock:
+            if key not in self._players:
+                bisect.insort(self._keys, key)
+            self._players[key] = player
+            self._added_during_load[key] = player
+
+    def lookup(self, player_name: str) -> Optional[Dict]:
+        """{playerName, puuid} for an exact (case-insensitive) Riot ID, or None"""
+        return self._players.get(normalize_name(player_name))
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Players whose Riot ID starts with prefix (case-insensitive), in name order
+
+        Args:
+            prefix: Start of "gameName" or "gameName#tagLine"
+            limit: Maximum number of players returned
+        """
+        key = normalize_name(prefix)
+        if not key or limit <= 0:
+            return []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            matches = []
+            for name in self._keys[start:start + limit]:
+                if not name.startswith(key):
+                    break
+                matches.append(self._players[name])
+        return matches
+
+    def names_backfilled(self) -> bool:
+        """Whether every account has a name item (the backfill marker exists; checked until it does)"""
+        if not self._backfilled:
+            self._backfilled = get_item(TABLE_NAME, {'puuid': NAMES_PARTITION, 'dataType': BACKFILL_MARKER}) is not None
+        return self._backfilled
+
+    def stats(self) -> dict:
+        return {
+            'players': len(self._keys),
+            'backfilled': self._backfilled,
+            'ageSeconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None
+        }
+
+
+def find_player(player_name: str) -> Optional[Dict]:
+    """
+    Resolve a Riot ID to {playerName, puuid}: in-memory index first, then the name item
+
+    Args:
+        player_name: Riot ID as "gameName#tagLine" (any casing)
+
+    Returns:
+        Player dict, or None if the player was never ingested
+    """
+    index = get_player_index()
+    player = index.lookup(player_name)
+    if player is not None:
+        return player
+
+    # Written by another API worker since our last refresh
+    item = get_item(TABLE_NAME, {'puuid': NAMES_PARTITION, 'dataType': f'{NAME_PREFIX}{normalize_name(player_name)}'})
+    if item is None:
+        return None
+    index.add(item['playerName'], item['playerPuuid'])
+    return {'playerName': item['playerName'], 'puuid': item['playerPuuid']}
+
+
+def backfill_player_names(
+    page_size: int = 100,
+    stop: Optional[threading.Event] = None,
+    on_page: Optional[Callable[[Dict], None]] = None,
+    client=None
+) -> Dict:
+    """
+    Write name items for every stored account item (existing name items are overwritten),
+    then the backfill marker (only after a full scan without failures)
+
+    Args:
+        page_size: Items per Scan page
+        stop: Set to stop after the current page
+        on_page: Called with the running report after every page
+
+    Returns:
+        Dict with scanned, written, failed and stopped
+    """
+    client = client or get_dynamodb_client()
+    report = {'scanned': 0, 'written': 0, 'failed': [], 'stopped': False}
+    writer = DynamoBatchWriter(get_dynamodb_resource(), TABLE_NAME)
+
+    params = {
+        'TableName': TABLE_NAME,
+        'FilterExpression': 'dataType = :account AND attribute_exists(playerName)',
+        'ExpressionAttributeValues': serialize_values({':account': 'account'}),
+        'ProjectionExpression': 'puuid, playerName, uploadedAt',
+        'Limit': page_size
+    }
+    try:
+        while True:
+            if stop is not None and stop.is_set():
+                report['stopped'] = True
+                break
+
+            response = client.scan(**params)
+            report['scanned'] += response.get('ScannedCount', 0)
+            for item in response.get('Items', []):
+                writer.put(name_item(item['puuid']['S'], item['playerName']['S'], item.get('uploadedAt', {}).get('S')))
+                report['written'] += 1
+
+            if on_page:
+                on_page(report)
+
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                break
+            params['ExclusiveStartKey'] = last_evaluated_key
+    finally:
+        write_report = writer.close()
+        report['failed'].extend(
+            {'key': failure['key']['dataType'], 'error': failure['error']}
+            for failure in write_report['failed']
+        )
+        report['written'] -= len(write_report['failed'])
+
+    if not report['failed'] and not report['stopped']:
+        client.put_item(
+            TableName=TABLE_NAME,
+            Item=serialize_values({
+                'puuid': NAMES_PARTITION,
+                'dataType': BACKFILL_MARKER,
+                'completedAt': datetime.utcnow().isoformat()
+            })
+        )
+    logger.info(f"Player name backfill: {report['written']} written, {len(report['failed'])} failed")
+    return report
+
+
+def backfill_missing_player_names(stop: Optional[threading.Event] = None) -> Optional[Dict]:
+    """
+    Startup migration: run backfill_player_names unless its marker exists, then reload the index
+
+    Returns:
+        The backfill report, or None if the names were already backfilled
+    """
+    index = get_player_index()
+    if index.names_backfilled():
+        return None
+    report = backfill_player_names(stop=stop)
+    if not report['stopped']:
+        index.refresh()
+    return report
+
+
+# Process-wide index (loaded lazily, shared by the search and autocomplete routes)
+_player_index = None
+
+
+def get_player_index() -> PlayerNameIndex:
+    """Get or create the shared PlayerNameIndex singleton"""
+    global _player_index
+    if _player_index is None:
+        _player_index = PlayerNameIndex()
+    return _player_index
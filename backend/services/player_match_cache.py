@@ -0,0 +1,124 @@
+"""
+Player Match Cache
+- In-process LRU of decoded per-player match lists (summary or full items), bounded by total bytes
+- Entries are stamped with the player's data version (the `version` item ingestion bumps),
+  so a list is reused only while the stored version still matches
+- Entries are weighed by the DynamoDB size of the pages they were read from (measured per page
+  while fetching), not by serializing the decoded list
+- Thread-safe (repository reads run on executor threads); the cache keeps its own copies of the
+  items, so callers mutating what they were given cannot change later reads
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.dynamo_codec import PayloadItem
+
+CacheKey = Tuple[str, bool]
+
+
+class CachedMatches:
+    def __init__(self, version: Optional[int], items: List[Dict], size: int):
+        self.version = version
+        self.items = items
+        self.size = size
+
+
+def clone_item(value: Any) -> Any:
+    """Copy of a decoded item (nested dicts and lists are copied, scalars are immutable and shared)"""
+    if isinstance(value, PayloadItem):
+        # Decode the compressed payload so the copy is a plain dict with `data`
+        value.get('data')
+    if isinstance(value, dict):
+        return {key: clone_item(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [clone_item(child) for child in value]
+    return value
+
+
+class PlayerMatchCache:
+    """
+    Byte-bounded LRU of (puuid, summaries) -> match list at a data version.
+
+    get() returns the list only if it was cached at the version the caller
+    just read; put() replaces any older list for the key and evicts the
+    least recently used entries beyond max_bytes. A single list larger than
+    the budget is not cached. Lists passed to put() and returned by get()
+    belong to the cache: store and hand out clone_item() copies.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv('MATCH_LIST_CACHE_MAX_MB', '256')) * 1024 * 1024)
+        self._entries: "OrderedDict[CacheKey, CachedMatches]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, puuid: str, summaries: bool, version: Optional[int]) -> Optional[List[Dict]]:
+        """The cached list for this player at `version`, or None (miss or outdated)"""
+        key = (puuid, summaries)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.version != version:
+                self.stale += 1
+                self.misses += 1
+                self._remove_locked(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.items
+
+    def put(self, puuid: str, summaries: bool, version: Optional[int], items: List[Dict], size: int):
+        """
+        Cache a fully read match list stamped with the version read before the query
+
+        Args:
+            size: Stored size of the list's Query pages in bytes (the entry's weight)
+        """
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        key = (puuid, summaries)
+        with self._lock:
+            self._remove_locked(key)
+            self._entries[key] = CachedMatches(version, items, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self.evictions += 1
+
+    def invalidate(self, puuid: str):
+        """Drop every cached list for a player (ingestion in this process)"""
+        with self._lock:
+            for summaries in (True, False):
+                self._remove_locked((puuid, summaries))
+
+    def _remove_locked(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions
+        }
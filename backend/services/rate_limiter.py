@@ -0,0 +1,295 @@
+"""
+Riot API Rate Limiter
+- Token buckets per routing host (application limit) and per endpoint (method limit)
+- Limits are learned from X-App-Rate-Limit / X-Method-Rate-Limit response headers
+- 429 responses block the affected scope for the Retry-After duration
+- Priority scheduling: interactive requests go first, backfill uses leftover capacity
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Development keys allow 20 requests/second and 100 requests/2 minutes.
+# Used until the first response tells us the real application limits.
+DEFAULT_APP_RATE_LIMIT = "20:1,100:120"
+
+# Fallback penalty when a 429 comes back without a Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+# How often a yielding backfill request re-checks for pending interactive requests
+BACKFILL_POLL_INTERVAL = 0.05
+
+
+class RequestPriority:
+    """Traffic classes for the scheduler"""
+    INTERACTIVE = 'interactive'  # user-facing lookups (player lookup, mastery, ...)
+    BACKFILL = 'backfill'        # bulk ingestion (match history backfills)
+
+    ALL = (INTERACTIVE, BACKFILL)
+
+
+def parse_rate_limit_header(value: Optional[str]) -> List[Tuple[int, int]]:
+    """Parse a Riot rate limit header ("20:1,100:120") into (count, seconds) pairs"""
+    pairs = []
+    if not value:
+        return pairs
+    for part in value.split(','):
+        try:
+            count, seconds = part.strip().split(':')
+            pairs.append((int(count), int(seconds)))
+        except ValueError:
+            continue
+    return pairs
+
+
+class TokenBucket:
+    """Token bucket holding `limit` tokens refilled evenly over `window` seconds"""
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+        self.rate = limit / window
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.limit, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+    def reserve_wait_time(self, now: float, reserve: float) -> float:
+        """Seconds until a token is available while keeping `reserve` of the bucket untouched"""
+        self._refill(now)
+        needed = 1 + reserve * self.limit - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed / self.rate
+
+    def sync_count(self, used: int, now: float):
+        """Align with the server-side count reported in X-*-Rate-Limit-Count"""
+        self._refill(now)
+        self.tokens = min(self.tokens, float(self.limit - used))
+
+
+class RateLimitScope:
+    """A set of buckets that must all have a token before a request is sent"""
+
+    def __init__(self, limits: List[Tuple[int, int]]):
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.blocked_until = 0.0
+        self.set_limits(limits)
+
+    def set_limits(self, limits: List[Tuple[int, int]]):
+        """Replace limits, keeping the current fill level of unchanged windows"""
+        buckets = {}
+        for count, window in limits:
+            existing = self.buckets.get(window)
+            if existing and existing.limit == count:
+                buckets[window] = existing
+            else:
+                buckets[window] = TokenBucket(count, window)
+        self.buckets = buckets
+
+    def limits(self) -> List[Tuple[int, int]]:
+        return [(b.limit, b.window) for b in self.buckets.values()]
+
+    def wait_time(self, now: float) -> float:
+        wait = max(0.0, self.blocked_until - now)
+        for bucket in self.buckets.values():
+            wait = max(wait, bucket.wait_time(now))
+        return wait
+
+    def reserve_wait_time(self, now: float, reserve: float) -> float:
+        wait = max(0.0, self.blocked_until - now)
+        for bucket in self.buckets.values():
+            wait = max(wait, bucket.reserve_wait_time(now, reserve))
+        return wait
+
+    def consume(self):
+        for bucket in self.buckets.values():
+            bucket.consume()
+
+    def sync_counts(self, counts: List[Tuple[int, int]], now: float):
+        for used, window in counts:
+            bucket = self.buckets.get(window)
+            if bucket:
+                bucket.sync_count(used, now)
+
+
+class RiotRateLimiter:
+    """
+    Rate limiter shared by every Riot API caller in the process.
+
+    Riot enforces an application limit per routing host (americas, na1, ...)
+    and a method limit per endpoint on that host. Both are tracked as token
+    buckets and kept in sync with the headers Riot returns on every response.
+    """
+
+    def __init__(self, default_app_limit: Optional[str] = None, backfill_reserve: Optional[float] = None):
+        self.default_app_limits = parse_rate_limit_header(
+            default_app_limit or os.getenv('RIOT_APP_RATE_LIMIT', DEFAULT_APP_RATE_LIMIT)
+        )
+        self._app_scopes: Dict[str, RateLimitScope] = {}
+        self._method_scopes: Dict[Tuple[str, str], RateLimitScope] = {}
+
+        # Share of each app bucket that backfill traffic must leave for interactive traffic
+        if backfill_reserve is None:
+            backfill_reserve = float(os.getenv('RIOT_BACKFILL_RESERVE', '0.2'))
+        self.backfill_reserve = backfill_reserve
+
+        # Per-class scheduler metrics
+        self._waiting: Dict[str, Dict[str, int]] = {p: {} for p in RequestPriority.ALL}
+        self._metrics = {
+            p: {'acquired': 0, 'maxQueueDepth': 0, 'totalWaitSeconds': 0.0}
+            for p in RequestPriority.ALL
+        }
+
+    def _app_scope(self, host: str) -> RateLimitScope:
+        scope = self._app_scopes.get(host)
+        if scope is None:
+            scope = RateLimitScope(self.default_app_limits)
+            self._app_scopes[host] = scope
+        return scope
+
+    def _method_scope(self, host: str, method: str) -> RateLimitScope:
+        # Method limits are unknown until Riot reports them, so start unlimited
+        key = (host, method)
+        scope = self._method_scopes.get(key)
+        if scope is None:
+            scope = RateLimitScope([])
+            self._method_scopes[key] = scope
+        return scope
+
+    def wait_time(self, host: str, method: str) -> float:
+        """Seconds until a request to host/method may be sent"""
+        now = time.monotonic()
+        return max(
+            self._app_scope(host).wait_time(now),
+            self._method_scope(host, method).wait_time(now)
+        )
+
+    def consume(self, host: str, method: str):
+        self._app_scope(host).consume()
+        self._method_scope(host, method).consume()
+
+    def _backfill_wait_time(self, host: str, method: str) -> float:
+        """Extra wait for backfill: yield to queued interactive requests and keep the reserve"""
+        if self._waiting[RequestPriority.INTERACTIVE].get(host):
+            return BACKFILL_POLL_INTERVAL
+        now = time.monotonic()
+        return self._app_scope(host).reserve_wait_time(now, self.backfill_reserve)
+
+    async def acquire(self, host: str, method: str, priority: str = RequestPriority.INTERACTIVE):
+        """
+        Wait until both the application and method buckets have a token
+
+        Interactive requests take any available token. Backfill requests wait
+        while interactive requests are queued for the same host and only use
+        capacity above the backfill reserve.
+        """
+        waiting = self._waiting[priority]
+        metrics = self._metrics[priority]
+        waiting[host] = waiting.get(host, 0) + 1
+        metrics['maxQueueDepth'] = max(metrics['maxQueueDepth'], sum(waiting.values()))
+        started = time.monotonic()
+
+        try:
+            while True:
+                wait = self.wait_time(host, method)
+                if priority == RequestPriority.BACKFILL:
+                    wait = max(wait, self._backfill_wait_time(host, method))
+                if wait <= 0:
+                    self.consume(host, method)
+                    metrics['acquired'] += 1
+                    metrics['totalWaitSeconds'] += time.monotonic() - started
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            waiting[host] -= 1
+            if not waiting[host]:
+                del waiting[host]
+
+    def stats(self) -> Dict:
+        """Queue depth and wait metrics per traffic class"""
+        return {
+            priority: {
+                'queueDepth': sum(self._waiting[priority].values()),
+                'queueDepthByHost': dict(self._waiting[priority]),
+                **self._metrics[priority],
+                'avgWaitSeconds': (
+                    self._metrics[priority]['totalWaitSeconds'] / self._metrics[priority]['acquired']
+                    if self._metrics[priority]['acquired'] else 0.0
+                )
+            }
+            for priority in RequestPriority.ALL
+        }
+
+    def update_from_headers(self, host: str, method: str, headers):
+        """Learn limits and current usage from a Riot API response"""
+        now = time.monotonic()
+
+        app_limits = parse_rate_limit_header(headers.get('X-App-Rate-Limit'))
+        if app_limits:
+            scope = self._app_scope(host)
+            if app_limits != scope.limits():
+                logger.info(f"Riot app rate limit for {host}: {headers.get('X-App-Rate-Limit')}")
+                scope.set_limits(app_limits)
+            scope.sync_counts(parse_rate_limit_header(headers.get('X-App-Rate-Limit-Count')), now)
+
+        method_limits = parse_rate_limit_header(headers.get('X-Method-Rate-Limit'))
+        if method_limits:
+            scope = self._method_scope(host, method)
+            if method_limits != scope.limits():
+                scope.set_limits(method_limits)
+            scope.sync_counts(parse_rate_limit_header(headers.get('X-Method-Rate-Limit-Count')), now)
+
+    def penalize(self, host: str, method: str, headers) -> float:
+        """
+        Block the scope named by a 429 response for its Retry-After duration
+
+        Returns:
+            Seconds the caller should wait before retrying
+        """
+        try:
+            retry_after = float(headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+        except (TypeError, ValueError):
+            retry_after = DEFAULT_RETRY_AFTER
+
+        limit_type = (headers.get('X-Rate-Limit-Type') or '').lower()
+        if limit_type == 'application':
+            scope = self._app_scope(host)
+        else:
+            # 'method' and 'service' limits only affect this endpoint
+            scope = self._method_scope(host, method)
+
+        scope.blocked_until = max(scope.blocked_until, time.monotonic() + retry_after)
+        logger.warning(f"Riot 429 ({limit_type or 'unknown'}) on {host} {method}, retrying in {retry_after}s")
+        return retry_after
+
+
+# Process-wide limiter (rate limits are per API key, not per client instance)
+_rate_limiter = None
+
+
+def get_rate_limiter() -> RiotRateLimiter:
+    """Get or create the shared rate limiter singleton"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RiotRateLimiter()
+    return _rate_limiter
@@ -0,0 +1,164 @@
+"""
+Outbound Call Resilience
+- Retry policy with exponential backoff and full jitter
+- Classification of retryable status codes and transport errors
+- Per-host circuit breaker that fails fast while a host is unhealthy
+"""
+
+import logging
+import os
+import random
+import time
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Transient server-side failures worth retrying (429 is handled by the rate limiter)
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while a host's circuit is open"""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('RIOT_MAX_RETRIES', '3'))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv('RIOT_RETRY_BASE_DELAY', '0.5'))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv('RIOT_RETRY_MAX_DELAY', '8'))
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @staticmethod
+    def is_retryable_status(status_code: int) -> bool:
+        return status_code in RETRYABLE_STATUS_CODES
+
+    @staticmethod
+    def is_retryable_error(error: Exception) -> bool:
+        """Timeouts and connection-level failures are retryable"""
+        return isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single host.
+
+    closed    -> requests flow; consecutive failures are counted
+    open      -> requests fail fast with CircuitOpenError until reset_timeout passes
+    half_open -> one trial request is let through; success closes, failure re-opens
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, host: str, failure_threshold: int, reset_timeout: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+        self.total_failures = 0
+        self.total_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_request(self):
+        """Raise CircuitOpenError if the request must not be sent"""
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(self.host, self.reset_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self.trial_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self.trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(self.host, self.reset_timeout)
+            self.trial_in_flight = True
+
+    def record_success(self):
+        self.total_successes += 1
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit closed for {self.host}")
+        self.state = self.CLOSED
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit opened for {self.host} after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """Release a half-open trial slot without recording an outcome"""
+        self.trial_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {
+            'state': self.state,
+            'consecutiveFailures': self.consecutive_failures,
+            'totalFailures': self.total_failures,
+            'totalSuccesses': self.total_successes,
+            'timesOpened': self.times_opened,
+            'rejected': self.rejected
+        }
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per host, created on first use"""
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.failure_threshold = failure_threshold or int(os.getenv('RIOT_CIRCUIT_FAILURE_THRESHOLD', '5'))
+        self.reset_timeout = reset_timeout or float(os.getenv('RIOT_CIRCUIT_RESET_TIMEOUT', '30'))
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, self.failure_threshold, self.reset_timeout)
+            self._breakers[host] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {host: breaker.snapshot() for host, breaker in self._breakers.items()}
+
+
+# Process-wide registry (host health is shared by every client)
+_circuit_breakers = None
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Get or create the shared circuit breaker registry singleton"""
+    global _circuit_breakers
+    if _circuit_breakers is None:
+        _circuit_breakers = CircuitBreakerRegistry()
+    return _circuit_breakers
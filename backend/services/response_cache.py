@@ -0,0 +1,172 @@
+"""
+Riot Response Cache
+- In-memory TTL cache for mutable Riot endpoints (mastery, league, challenges, ...)
+- Stale-while-revalidate: stale entries are served while a refresh runs in the background
+- ETag / If-None-Match revalidation where Riot supports it
+- Identical in-flight requests are collapsed into one upstream call (per event loop)
+- Callers get their own copy of a cached value
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds an entry is fresh, per endpoint family.
+# Override with RIOT_TTL_<FAMILY> (e.g. RIOT_TTL_CHALLENGE_CONFIG=86400).
+DEFAULT_TTLS = {
+    'account': 3600,
+    'summoner': 3600,
+    'mastery': 600,
+    'league': 300,
+    'challenges': 600,
+    'challenge_config': 86400,
+    'challenge_percentiles': 3600,
+}
+
+# Returned by a fetcher when the server answered 304 Not Modified
+NOT_MODIFIED = object()
+
+# fetch(etag) -> (value or NOT_MODIFIED, etag)
+Fetcher = Callable[[Optional[str]], Awaitable[Tuple[Any, Optional[str]]]]
+
+# (event loop, cache key): a task can only be awaited on the loop that runs it
+InflightKey = Tuple[asyncio.AbstractEventLoop, str]
+
+
+class CacheEntry:
+    def __init__(self, value: Any, etag: Optional[str]):
+        self.value = value
+        self.etag = etag
+        self.fetched_at = time.monotonic()
+
+
+class ResponseCache:
+    """
+    TTL cache with stale-while-revalidate and request coalescing.
+
+    An entry is fresh for ttl seconds and may then be served stale for
+    another stale_ttl seconds while one background refresh revalidates it.
+    Every caller gets a deep copy, so mutating a result never changes the
+    cache. In-flight fetches are tracked per event loop: a CLI or backfill
+    that calls asyncio.run() repeatedly never awaits a task of a dead loop.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv('RIOT_RESPONSE_CACHE_MAX_ENTRIES', '2048'))
+        self.ttls = {
+            family: float(os.getenv(f'RIOT_TTL_{family.upper()}', ttl))
+            for family, ttl in DEFAULT_TTLS.items()
+        }
+        # Stale window defaults to one extra TTL; RIOT_STALE_<FAMILY> overrides it
+        self.stale_ttls = {
+            family: float(os.getenv(f'RIOT_STALE_{family.upper()}', ttl))
+            for family, ttl in self.ttls.items()
+        }
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[InflightKey, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    async def get(self, family: str, key: str, fetch: Fetcher) -> Any:
+        """
+        Get a value from the cache, fetching or revalidating as needed
+
+        Args:
+            family: Endpoint family (selects the TTL)
+            key: Cache key (unique per URL + params)
+            fetch: Coroutine function taking the cached ETag (or None)
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        ttl = self.ttls.get(family, 0)
+        entry = self._entries.get(key)
+        inflight_key = (asyncio.get_running_loop(), key)
+
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry.value)
+            if age < ttl + self.stale_ttls.get(family, 0):
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if inflight_key not in self._inflight:
+                    self._start_fetch(inflight_key, fetch).add_done_callback(self._log_background_error)
+                return copy.deepcopy(entry.value)
+
+        self.misses += 1
+        task = self._inflight.get(inflight_key) or self._start_fetch(inflight_key, fetch)
+        # Coalesced waiters share the task's result; each gets its own copy
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _start_fetch(self, inflight_key: InflightKey, fetch: Fetcher) -> asyncio.Task:
+        # Drop fetches left behind by loops that were closed while they were pending
+        for stale_key in [k for k in self._inflight if k[0].is_closed()]:
+            del self._inflight[stale_key]
+        task = asyncio.create_task(self._fetch(inflight_key[1], fetch))
+        self._inflight[inflight_key] = task
+        task.add_done_callback(lambda done: self._finish_fetch(inflight_key, done))
+        return task
+
+    def _finish_fetch(self, inflight_key: InflightKey, task: asyncio.Task):
+        self._inflight.pop(inflight_key, None)
+        # Mark the exception as retrieved; waiters re-raise it through shield()
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, key: str, fetch: Fetcher) -> Any:
+        entry = self._entries.get(key)
+        value, etag = await fetch(entry.etag if entry else None)
+
+        if value is NOT_MODIFIED:
+            current = self._entries.get(key)
+            if current is not None:
+                self.revalidated += 1
+                current.fetched_at = time.monotonic()
+                return current.value
+            # Entry was evicted while revalidating; fetch the full body again
+            value, etag = await fetch(None)
+
+        self._entries[key] = CacheEntry(value, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _log_background_error(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Background revalidation failed: {task.exception()}")
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'hits': self.hits,
+            'staleHits': self.stale_hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated
+        }
+
+
+# Process-wide cache (shared by every RiotAPIClient)
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the shared response cache singleton"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
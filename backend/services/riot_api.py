@@ -1,6 +1,25 @@
 import httpx
-from typing import List, Dict, Optional
+from typing import Awaitable, Callable, List, Dict, Optional
 import asyncio
+import importlib.util
+import json
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timezone
+
+from services.dynamo_codec import loads_for_dynamo
+from services.match_cache import MatchPayloadCache, get_match_cache
+from services.rate_limiter import RequestPriority, RiotRateLimiter, get_rate_limiter
+from services.resilience import CircuitBreakerRegistry, RetryPolicy, get_circuit_breakers
+from services.response_cache import NOT_MODIFIED, ResponseCache, get_response_cache
+from services.timeline_parser import StreamingTimelineParser, parse_timeline_chunks
+
+logger = logging.getLogger(__name__)
+
+# match-v5 returns at most 100 IDs per request
+MATCH_IDS_PAGE_SIZE = 100
 
 
 class RiotAPIClient:
@@ -20,12 +39,248 @@ class RiotAPIClient:
         "br1": "https://br1.api.riotgames.com"
     }
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        rate_limiter: Optional[RiotRateLimiter] = None,
+        max_rate_limit_retries: int = 3,
+        max_concurrency: Optional[int] = None,
+        match_cache: Optional[MatchPayloadCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        base_urls: Optional[Dict[str, str]] = None,
+        platform_urls: Optional[Dict[str, str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        priority: str = RequestPriority.INTERACTIVE,
+        decode_decimals: bool = False
+    ):
         self.api_key = api_key
         self.headers = {
             "X-Riot-Token": api_key
         }
 
+        # Host overrides (e.g. pointing a region at a local fake server)
+        self.BASE_URLS = {**self.BASE_URLS, **(base_urls or {})}
+        self.PLATFORM_URLS = {**self.PLATFORM_URLS, **(platform_urls or {})}
+        # Transport override for every host client (e.g. httpx.MockTransport in tests)
+        self.transport = transport
+
+        # Connection pool settings (shared by every routing host client)
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("RIOT_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=max_keepalive_connections or int(os.getenv("RIOT_HTTP_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=keepalive_expiry or float(os.getenv("RIOT_HTTP_KEEPALIVE_EXPIRY", "30"))
+        )
+        self.timeout = httpx.Timeout(timeout or float(os.getenv("RIOT_HTTP_TIMEOUT", "10")))
+
+        # HTTP/2 needs the optional 'h2' package (httpx[http2])
+        self.http2 = importlib.util.find_spec("h2") is not None
+
+        # One long-lived pooled client per routing host, keyed by base URL
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+        # Rate limits are per API key, so all clients share one limiter by default
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        # Traffic class for the limiter's scheduler (bulk ingestion clients use BACKFILL)
+        self.priority = priority
+
+        # Ingestion clients decode floats as Decimal so payloads can go to DynamoDB as-is.
+        # Interactive clients keep floats (MatchAnalyzer and friends do float math).
+        self.decode_decimals = decode_decimals
+
+        # Upper bound on in-flight requests for batch fetches
+        self.max_concurrency = max_concurrency or int(os.getenv("RIOT_MAX_CONCURRENCY", "10"))
+
+        # Finished matches/timelines are immutable, so they are served from disk when cached
+        self.match_cache = match_cache or get_match_cache()
+
+        # Mutable endpoints (mastery, league, challenges, ...) go through a TTL cache
+        self.response_cache = response_cache or get_response_cache()
+
+        # 5xx/timeouts are retried with backoff; a per-host breaker fails fast on sick hosts
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or get_circuit_breakers()
+
+    def _get_client(self, base_url: str) -> httpx.AsyncClient:
+        """Get or create the pooled client for a routing host"""
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                headers=self.headers,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport
+            )
+            self._clients[base_url] = client
+        return client
+
+    async def open(self):
+        """Create pooled clients for all known hosts (call from the app lifespan)"""
+        for base_url in list(self.BASE_URLS.values()) + list(self.PLATFORM_URLS.values()):
+            self._get_client(base_url)
+
+    async def aclose(self):
+        """Close every pooled client (call on app shutdown)"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    async def _send(
+        self,
+        base_url: str,
+        path: str,
+        method: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        stream: bool = False
+    ) -> httpx.Response:
+        """
+        Send a GET on the pooled client for its routing host
+
+        Every request waits for the shared rate limiter; the limiter learns the
+        real limits from the response headers and 429s are retried after
+        Retry-After. 5xx responses and timeouts are retried with exponential
+        backoff, and the host's circuit breaker fails fast (CircuitOpenError)
+        while the host keeps failing.
+
+        Args:
+            base_url: Routing host base URL
+            path: Request path
+            method: Riot endpoint name (e.g. "match-v5.getMatch") for method limits
+            params: Query parameters
+            headers: Extra request headers
+            stream: Leave a successful body unread; the caller must aclose() the response
+        """
+        client = self._get_client(base_url)
+        breaker = self.circuit_breakers.get(base_url)
+        rate_limit_retries = 0
+        error_retries = 0
+
+        while True:
+            breaker.before_request()
+            try:
+                await self.rate_limiter.acquire(base_url, method, self.priority)
+                request = client.build_request("GET", path, params=params, headers=headers)
+                response = await client.send(request, stream=stream)
+                if stream and not response.is_success:
+                    # Error bodies are small; read them so callers can inspect/raise
+                    await response.aread()
+            except Exception as e:
+                if not self.retry_policy.is_retryable_error(e):
+                    breaker.abandon()
+                    raise
+                breaker.record_failure()
+                if error_retries >= self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.backoff(error_retries)
+                error_retries += 1
+                logger.warning(f"{type(e).__name__} on {base_url} {method}, retry {error_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled while waiting; don't leave a half-open trial slot taken
+                breaker.abandon()
+                raise
+
+            self.rate_limiter.update_from_headers(base_url, method, response.headers)
+
+            if self.retry_policy.is_retryable_status(response.status_code):
+                breaker.record_failure()
+                if error_retries >= self.retry_policy.max_retries:
+                    return response
+                delay = self.retry_policy.backoff(error_retries)
+                error_retries += 1
+                logger.warning(f"{response.status_code} from {base_url} {method}, retry {error_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+
+            if response.status_code == 429 and rate_limit_retries < self.max_rate_limit_retries:
+                # acquire() waits out the penalty on the next attempt
+                self.rate_limiter.penalize(base_url, method, response.headers)
+                rate_limit_retries += 1
+                continue
+
+            return response
+
+    def get_health(self) -> Dict:
+        """Circuit breaker, scheduler queue and cache state for monitoring"""
+        return {
+            'circuits': self.circuit_breakers.snapshot(),
+            'scheduler': self.rate_limiter.stats(),
+            'matchCache': self.match_cache.stats(),
+            'responseCache': self.response_cache.stats()
+        }
+
+    async def _get(
+        self,
+        base_url: str,
+        path: str,
+        method: str,
+        params: Optional[Dict] = None,
+        raw: bool = False,
+        cache_family: Optional[str] = None
+    ):
+        """
+        GET a Riot API path and decode the JSON body
+
+        Args:
+            raw: Return the undecoded response body (bytes) instead of parsed JSON
+            cache_family: Serve through the TTL response cache using this family's TTL
+        """
+        if cache_family:
+            return await self._get_cached(cache_family, base_url, path, method, params)
+
+        response = await self._send(base_url, path, method, params)
+        response.raise_for_status()
+        return response.content if raw else self._decode(response.content)
+
+    def _decode(self, content: bytes):
+        """Parse a JSON body (floats as Decimal for ingestion clients)"""
+        return loads_for_dynamo(content) if self.decode_decimals else json.loads(content)
+
+    async def _get_cached(
+        self,
+        family: str,
+        base_url: str,
+        path: str,
+        method: str,
+        params: Optional[Dict] = None
+    ):
+        """GET through the TTL cache, revalidating with If-None-Match when an ETag is known"""
+        # Decimal- and float-decoded values are cached separately
+        key = f"{'decimal:' if self.decode_decimals else ''}{base_url}{path}?{sorted((params or {}).items())}"
+
+        async def fetch(etag: Optional[str]):
+            headers = {"If-None-Match": etag} if etag else None
+            response = await self._send(base_url, path, method, params, headers=headers)
+            if response.status_code == 304:
+                return NOT_MODIFIED, etag
+            response.raise_for_status()
+            return self._decode(response.content), response.headers.get("ETag")
+
+        return await self.response_cache.get(family, key, fetch)
+
+    async def _get_immutable(self, kind: str, match_id: str, base_url: str, path: str, method: str):
+        """GET a match-v5 payload through the on-disk match cache"""
+        content = await self.match_cache.aget(kind, match_id)
+        if content is None:
+            content = await self._get(base_url, path, method, raw=True)
+            await self.match_cache.aput(kind, match_id, content)
+        # Timelines go to MongoDB, which cannot store Decimal
+        return json.loads(content) if kind == "timeline" else self._decode(content)
+
     async def get_account_by_riot_id(
         self,
         game_name: str,
@@ -34,83 +289,250 @@ class RiotAPIClient:
     ) -> Dict:
         """Get account information by Riot ID (game name + tag line)"""
         base_url = self.BASE_URLS.get(region, self.BASE_URLS["americas"])
-        url = f"{base_url}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+        return await self._get(base_url, f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}", "account-v1.getByRiotId", cache_family="account")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+    async def get_account_by_puuid(self, puuid: str, region: str = "americas") -> Dict:
+        """Get account information (game name + tag line) by PUUID"""
+        base_url = self.BASE_URLS.get(region, self.BASE_URLS["americas"])
+        return await self._get(base_url, f"/riot/account/v1/accounts/by-puuid/{puuid}", "account-v1.getByPuuid", cache_family="account")
 
     async def get_summoner_by_puuid(self, puuid: str, platform: str = "na1") -> Dict:
         """Get summoner information by PUUID"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/summoner/v4/summoners/by-puuid/{puuid}", "summoner-v4.getByPUUID", cache_family="summoner")
 
     async def get_match_history(
         self,
         puuid: str,
         region: str = "americas",
         count: int = 20,
-        start: int = 0
+        start: int = 0,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None
     ) -> List[str]:
-        """Get list of match IDs for a player"""
+        """
+        Get list of match IDs for a player (newest first)
+
+        Args:
+            count: Page size (Riot caps this at 100)
+            start: Offset into the filtered match list
+            start_time: Only matches after this epoch timestamp (seconds)
+            end_time: Only matches before this epoch timestamp (seconds)
+        """
         base_url = self.BASE_URLS.get(region, self.BASE_URLS["americas"])
-        url = f"{base_url}/lol/match/v5/matches/by-puuid/{puuid}/ids"
 
         params = {
             "start": start,
             "count": count
         }
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(base_url, f"/lol/match/v5/matches/by-puuid/{puuid}/ids", "match-v5.getMatchIdsByPUUID", params=params)
+
+    async def get_match_ids_in_range(
+        self,
+        puuid: str,
+        start_time: int,
+        end_time: Optional[int] = None,
+        region: str = "americas"
+    ) -> List[str]:
+        """Get every match ID in a time range, paging past the 100-per-request cap"""
+        match_ids = []
+        start = 0
+        while True:
+            page = await self.get_match_history(
+                puuid, region=region, count=MATCH_IDS_PAGE_SIZE, start=start,
+                start_time=start_time, end_time=end_time
+            )
+            match_ids.extend(page)
+            if len(page) < MATCH_IDS_PAGE_SIZE:
+                return match_ids
+            start += MATCH_IDS_PAGE_SIZE
+
+    async def sync_match_history(
+        self,
+        puuid: str,
+        since: Optional[int] = None,
+        region: str = "americas",
+        window_days: int = 14,
+        concurrency: Optional[int] = None
+    ) -> List[str]:
+        """
+        List every match played after a cursor, walking time windows concurrently
+
+        The range from `since` to now is split into windows of window_days and
+        each window is paged independently, so a whole season is listed in
+        parallel instead of 100 IDs at a time.
+
+        Args:
+            since: Epoch seconds of the newest match already synced
+                   (defaults to the season start, RIOT_SEASON_START)
+
+        Returns:
+            Match IDs newest first, without duplicates
+        """
+        if since is None:
+            # Jan 1 00:00 UTC, whatever the server's local timezone
+            season_start = datetime(datetime.now(timezone.utc).year, 1, 1, tzinfo=timezone.utc)
+            since = int(os.getenv("RIOT_SEASON_START", str(int(season_start.timestamp()))))
+        now = int(time.time())
+
+        window = window_days * 86400
+        windows = [(t, min(t + window, now)) for t in range(since, now, window)]
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+
+        async def list_window(start_time: int, end_time: int) -> List[str]:
+            async with semaphore:
+                return await self.get_match_ids_in_range(puuid, start_time, end_time, region)
+
+        pages = await asyncio.gather(*[list_window(s, e) for s, e in windows])
+
+        # Windows are oldest first and each page is newest first
+        match_ids = []
+        seen = set()
+        for page in reversed(pages):
+            for match_id in page:
+                if match_id not in seen:
+                    seen.add(match_id)
+                    match_ids.append(match_id)
+        return match_ids
 
     async def get_match_details(self, match_id: str, region: str = "americas") -> Dict:
         """Get detailed information about a specific match"""
         base_url = self.BASE_URLS.get(region, self.BASE_URLS["americas"])
-        url = f"{base_url}/lol/match/v5/matches/{match_id}"
+        return await self._get_immutable("match", match_id, base_url, f"/lol/match/v5/matches/{match_id}", "match-v5.getMatch")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+    async def get_match_timeline(self, match_id: str, region: str = "americas", compact: bool = False) -> Dict:
+        """
+        Get timeline data for a specific match (minute-by-minute events)
 
-    async def get_match_timeline(self, match_id: str, region: str = "americas") -> Dict:
-        """Get timeline data for a specific match (minute-by-minute events)"""
+        Args:
+            compact: Stream-parse the (~1 MB) body into the compact form from
+                     services.timeline_parser instead of materializing it
+        """
         base_url = self.BASE_URLS.get(region, self.BASE_URLS["americas"])
-        url = f"{base_url}/lol/match/v5/matches/{match_id}/timeline"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
+        path = f"/lol/match/v5/matches/{match_id}/timeline"
+        if compact:
+            return await self._get_compact_timeline(match_id, base_url, path)
+        return await self._get_immutable("timeline", match_id, base_url, path, "match-v5.getTimeline")
+
+    async def _get_compact_timeline(self, match_id: str, base_url: str, path: str) -> Dict:
+        """Stream a timeline into its compact form, filling the match cache on the way"""
+        cached = await self.match_cache.aget("timeline", match_id)
+        if cached is not None:
+            return parse_timeline_chunks([cached], match_id)
+
+        response = await self._send(base_url, path, "match-v5.getTimeline", stream=True)
+        try:
             response.raise_for_status()
-            return response.json()
+            parser = StreamingTimelineParser(match_id)
+            # Compress for the disk cache as the body streams by (gzip container)
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if self.match_cache.enabled else None
+            compressed = []
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+                if compressor:
+                    compressed.append(compressor.compress(chunk))
+        finally:
+            await response.aclose()
+
+        if compressor:
+            compressed.append(compressor.flush())
+            await self.match_cache.aput_compressed("timeline", match_id, b''.join(compressed))
+        return parser.close()
+
+    async def fetch_matches(
+        self,
+        match_ids: List[str],
+        region: str = "americas",
+        include_timelines: bool = False,
+        concurrency: Optional[int] = None,
+        compact_timelines: bool = False,
+        on_result: Optional[Callable[[str, int, str, Dict], Awaitable]] = None
+    ) -> Dict:
+        """
+        Fetch match details (and optionally timelines) concurrently
+
+        Requests run under a bounded semaphore on top of the shared rate
+        limiter. When timelines are included each match and its timeline are
+        separate requests in the same batch, so they are pipelined together.
+
+        With on_result, each payload is handed to on_result(resource, index,
+        match_id, payload) as soon as it arrives instead of being collected.
+        The callback runs while the request still holds its concurrency slot,
+        so a slow consumer (e.g. a bounded queue) throttles fetching.
+
+        Returns:
+            Dict with 'matches' and 'timelines' (both in input order, failures
+            omitted; empty when on_result is set) and 'failed', a list of
+            {matchId, resource, status, error}. Timelines are {matchId, data},
+            or {matchId, compact} when compact_timelines is set.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+        resources = [("match", self.get_match_details)]
+        if include_timelines:
+            if compact_timelines:
+                async def fetch_timeline(match_id: str, region: str):
+                    return await self.get_match_timeline(match_id, region, compact=True)
+            else:
+                fetch_timeline = self.get_match_timeline
+            resources.append(("timeline", fetch_timeline))
+
+        async def fetch_one(index: int, match_id: str, resource: str, fetch):
+            async with semaphore:
+                try:
+                    data = await fetch(match_id, region)
+                except Exception as e:
+                    status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                    return None, {
+                        'matchId': match_id,
+                        'resource': resource,
+                        'status': status,
+                        'error': str(e)
+                    }
+                if resource == "timeline":
+                    data = {'matchId': match_id, 'compact' if compact_timelines else 'data': data}
+                if on_result is not None:
+                    await on_result(resource, index, match_id, data)
+                    return None, None
+                return data, None
+
+        results = await asyncio.gather(*[
+            fetch_one(index, match_id, resource, fetch)
+            for index, match_id in enumerate(match_ids)
+            for resource, fetch in resources
+        ])
+
+        report = {'matches': [], 'timelines': [], 'failed': []}
+        for i, (data, failure) in enumerate(results):
+            resource = resources[i % len(resources)][0]
+            if failure:
+                report['failed'].append(failure)
+            elif data is None:
+                continue
+            elif resource == "match":
+                report['matches'].append(data)
+            else:
+                report['timelines'].append(data)
+
+        return report
 
     async def get_multiple_matches(
         self,
         match_ids: List[str],
-        region: str = "americas"
+        region: str = "americas",
+        concurrency: Optional[int] = None
     ) -> List[Dict]:
-        """Get details for multiple matches (with rate limiting)"""
-        matches = []
+        """Get details for multiple matches concurrently, in input order"""
+        report = await self.fetch_matches(match_ids, region, concurrency=concurrency)
 
-        for match_id in match_ids:
-            try:
-                match_data = await self.get_match_details(match_id, region)
-                matches.append(match_data)
-                # Rate limiting - be respectful to Riot API
-                await asyncio.sleep(0.1)
-            except Exception as e:
-                print(f"Error fetching match {match_id}: {e}")
-                continue
+        for failure in report['failed']:
+            logger.warning(f"Error fetching match {failure['matchId']}: {failure['error']}")
 
-        return matches
+        return report['matches']
 
     # ============= CHAMPION MASTERY API =============
 
@@ -121,12 +543,7 @@ class RiotAPIClient:
     ) -> List[Dict]:
         """Get all champion mastery entries for a player sorted by mastery points"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}", "champion-mastery-v4.getAllChampionMasteriesByPUUID", cache_family="mastery")
 
     async def get_champion_mastery_by_champion(
         self,
@@ -136,12 +553,7 @@ class RiotAPIClient:
     ) -> Dict:
         """Get champion mastery for a specific champion"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/by-champion/{champion_id}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/by-champion/{champion_id}", "champion-mastery-v4.getChampionMasteryByPUUID", cache_family="mastery")
 
     async def get_top_champion_masteries(
         self,
@@ -151,14 +563,10 @@ class RiotAPIClient:
     ) -> List[Dict]:
         """Get top N champion masteries by mastery points"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top"
 
         params = {"count": count}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}/top", "champion-mastery-v4.getTopChampionMasteriesByPUUID", params=params, cache_family="mastery")
 
     async def get_champion_mastery_score(
         self,
@@ -167,12 +575,7 @@ class RiotAPIClient:
     ) -> int:
         """Get total mastery score (sum of all champion mastery levels)"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/champion-mastery/v4/scores/by-puuid/{puuid}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/champion-mastery/v4/scores/by-puuid/{puuid}", "champion-mastery-v4.getChampionMasteryScoreByPUUID", cache_family="mastery")
 
     # ============= LEAGUE/RANKED API =============
 
@@ -183,12 +586,7 @@ class RiotAPIClient:
     ) -> List[Dict]:
         """Get ranked league entries for a summoner (Solo/Duo, Flex, etc.)"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/league/v4/entries/by-summoner/{summoner_id}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/league/v4/entries/by-summoner/{summoner_id}", "league-v4.getLeagueEntriesForSummoner", cache_family="league")
 
     async def get_league_entries_by_puuid(
         self,
@@ -197,12 +595,7 @@ class RiotAPIClient:
     ) -> List[Dict]:
         """Get ranked league entries by PUUID"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/league/v4/entries/by-puuid/{puuid}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/league/v4/entries/by-puuid/{puuid}", "league-v4.getLeagueEntriesByPUUID", cache_family="league")
 
     async def get_challenger_league(
         self,
@@ -211,12 +604,7 @@ class RiotAPIClient:
     ) -> Dict:
         """Get Challenger league for a specific queue"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/league/v4/challengerleagues/by-queue/{queue}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/league/v4/challengerleagues/by-queue/{queue}", "league-v4.getChallengerLeague", cache_family="league")
 
     async def get_grandmaster_league(
         self,
@@ -225,12 +613,7 @@ class RiotAPIClient:
     ) -> Dict:
         """Get Grandmaster league for a specific queue"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/league/v4/grandmasterleagues/by-queue/{queue}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/league/v4/grandmasterleagues/by-queue/{queue}", "league-v4.getGrandmasterLeague", cache_family="league")
 
     async def get_master_league(
         self,
@@ -239,12 +622,7 @@ class RiotAPIClient:
     ) -> Dict:
         """Get Master league for a specific queue"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/league/v4/masterleagues/by-queue/{queue}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/league/v4/masterleagues/by-queue/{queue}", "league-v4.getMasterLeague", cache_family="league")
 
     # ============= CHALLENGES API =============
 
@@ -255,12 +633,7 @@ class RiotAPIClient:
     ) -> Dict:
         """Get all challenge data for a player"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/challenges/v1/player-data/{puuid}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/challenges/v1/player-data/{puuid}", "lol-challenges-v1.getPlayerData", cache_family="challenges")
 
     async def get_challenge_config(
         self,
@@ -268,12 +641,7 @@ class RiotAPIClient:
     ) -> List[Dict]:
         """Get configuration for all challenges"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/challenges/v1/challenges/config"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/challenges/v1/challenges/config", "lol-challenges-v1.getAllChallengeConfigs", cache_family="challenge_config")
 
     async def get_challenge_percentiles(
         self,
@@ -281,12 +649,7 @@ class RiotAPIClient:
     ) -> Dict:
         """Get percentile distribution for all challenges"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/challenges/v1/challenges/percentiles"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/challenges/v1/challenges/percentiles", "lol-challenges-v1.getAllChallengePercentiles", cache_family="challenge_percentiles")
 
     async def get_challenge_leaderboard(
         self,
@@ -297,12 +660,8 @@ class RiotAPIClient:
     ) -> List[Dict]:
         """Get leaderboard for a specific challenge"""
         platform_url = self.PLATFORM_URLS.get(platform, self.PLATFORM_URLS["na1"])
-        url = f"{platform_url}/lol/challenges/v1/challenges/{challenge_id}/leaderboards/by-level/{level}"
 
         params = {"limit": limit}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
+        return await self._get(platform_url, f"/lol/challenges/v1/challenges/{challenge_id}/leaderboards/by-level/{level}", "lol-challenges-v1.getChallengeLeaderboards", params=params, cache_family="challenges")
 
@@ -0,0 +1,181 @@
+"""
+Stored Match Index
+- Pre-flight existence check so ingestion only asks Riot for matches we don't have
+- Per-player Bloom filter (persisted in DynamoDB) answers "definitely new" without a lookup
+- Possible hits are verified with a keys-only DynamoDB BatchGetItem plus one MongoDB $in query
+"""
+
+import hashlib
+import logging
+import math
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# DynamoDB BatchGetItem accepts at most 100 keys per request
+BATCH_GET_LIMIT = 100
+
+BLOOM_DATA_TYPE = 'match_bloom'
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over match IDs.
+
+    A negative answer is exact ("never added"); a positive answer is only
+    "probably added" and must be verified before skipping work.
+    """
+
+    def __init__(self, capacity: int = 5000, error_rate: float = 0.01, bits: bytes = None, hashes: int = None, count: int = 0):
+        if bits is None:
+            size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            bits = bytes((size + 7) // 8)
+            hashes = max(1, round(size / capacity * math.log(2)))
+        self.bits = bytearray(bits)
+        self.size = len(self.bits) * 8
+        self.hashes = hashes
+        self.count = count
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> bool:
+        """Add a key; returns True if it was not (probably) present before"""
+        added = False
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(key))
+
+
+class StoredMatchIndex:
+    """
+    Answers "which of these match IDs are already fully stored for a player?"
+
+    A match counts as stored when its match#<id> item exists in DynamoDB and
+    its timeline exists in MongoDB. IDs the player's Bloom filter has never
+    seen are new without any lookup; the rest are verified against both
+    stores, so a false positive only costs a lookup, never a skipped match.
+    """
+
+    def __init__(self, dynamodb, table_name: str, mongo_db, capacity: int = None, max_retries: Optional[int] = None):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.table = dynamodb.Table(table_name)
+        self.mongo_db = mongo_db
+        self.capacity = capacity or int(os.getenv('INGEST_BLOOM_CAPACITY', '5000'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('DYNAMO_READ_MAX_RETRIES', '8'))
+
+    def load_filter(self, puuid: str) -> Optional[BloomFilter]:
+        """Load the player's Bloom filter, or None if none is stored yet"""
+        response = self.table.get_item(
+            Key={'puuid': puuid, 'dataType': BLOOM_DATA_TYPE},
+            ProjectionExpression='#bits, hashes, #count',
+            ExpressionAttributeNames={'#bits': 'bits', '#count': 'count'}
+        )
+        item = response.get('Item')
+        if not item:
+            return None
+        return BloomFilter(bits=bytes(item['bits']), hashes=int(item['hashes']), count=int(item['count']))
+
+    def save_filter(self, puuid: str, bloom: BloomFilter):
+        self.table.put_item(Item={
+            'puuid': puuid,
+            'dataType': BLOOM_DATA_TYPE,
+            'bits': bytes(bloom.bits),
+            'hashes': bloom.hashes,
+            'count': bloom.count,
+            'updatedAt': datetime.utcnow().isoformat()
+        })
+
+    def stored_in_dynamodb(self, puuid: str, match_ids: List[str]) -> Set[str]:
+        """
+        Keys-only BatchGetItem for match#<id> items
+
+        UnprocessedKeys are retried up to max_retries times; keys still unprocessed
+        after that count as not stored, so those matches are simply fetched again.
+        """
+        stored = set()
+        for i in range(0, len(match_ids), BATCH_GET_LIMIT):
+            request = {
+                self.table_name: {
+                    'Keys': [{'puuid': puuid, 'dataType': f'match#{match_id}'} for match_id in match_ids[i:i + BATCH_GET_LIMIT]],
+                    'ProjectionExpression': 'dataType'
+                }
+            }
+            attempt = 0
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(self.table_name, []):
+                    stored.add(item['dataType'][len('match#'):])
+                request = response.get('UnprocessedKeys') or None
+                if not request:
+                    break
+                if attempt >= self.max_retries:
+                    unprocessed = len(request.get(self.table_name, {}).get('Keys', []))
+                    logger.warning(f"{unprocessed} keys still unprocessed after {attempt} retries, treating them as not stored")
+                    break
+                attempt += 1
+                time.sleep(min(2.0, 0.05 * (2 ** attempt)))
+        return stored
+
+    def stored_in_mongodb(self, match_ids: List[str], compact: bool) -> Set[str]:
+        """One $in query on the timeline collection the ingest mode writes to"""
+        collection = self.mongo_db.timelines_compact if compact else self.mongo_db.timelines
+        cursor = collection.find({'matchId': {'$in': match_ids}}, {'matchId': 1, '_id': 0})
+        return {doc['matchId'] for doc in cursor}
+
+    def partition(self, puuid: str, match_ids: List[str], compact: bool = False) -> Tuple[List[str], List[str], Dict]:
+        """
+        Split candidate match IDs into (unknown, stored), preserving order
+
+        Returns:
+            (unknown IDs to fetch from Riot, already stored IDs, stats dict)
+        """
+        bloom = self.load_filter(puuid)
+        if bloom is None:
+            # No filter yet (e.g. data ingested before filters existed): verify everything
+            candidates = list(match_ids)
+        else:
+            candidates = [match_id for match_id in match_ids if match_id in bloom]
+
+        stored = set()
+        if candidates:
+            in_dynamo = self.stored_in_dynamodb(puuid, candidates)
+            if in_dynamo:
+                stored = in_dynamo & self.stored_in_mongodb(sorted(in_dynamo), compact)
+
+        unknown = [match_id for match_id in match_ids if match_id not in stored]
+        skipped = [match_id for match_id in match_ids if match_id in stored]
+        stats = {
+            'candidates': len(match_ids),
+            'bloomNegatives': len(match_ids) - len(candidates),
+            'verified': len(candidates),
+            'stored': len(skipped)
+        }
+        return unknown, skipped, stats
+
+    def remember(self, puuid: str, match_ids: Iterable[str]):
+        """Record fully stored match IDs in the player's Bloom filter"""
+        match_ids = list(match_ids)
+        if not match_ids:
+            return
+        bloom = self.load_filter(puuid) or BloomFilter(self.capacity)
+        changed = False
+        for match_id in match_ids:
+            changed = bloom.add(match_id) or changed
+        if changed:
+            self.save_filter(puuid, bloom)
@@ -3,9 +3,10 @@ Strength and Weakness Analyzer
 AI-powered performance analysis with contextual insights
 """
 import logging
+from itertools import islice
 from typing import Dict, List, Optional
 import boto3
-from boto3.dynamodb.conditions import Key
+from services.match_repository import get_match_repository
 from services.benchmarks import (
     get_rank_benchmarks,
     get_role_adjusted_benchmarks,
@@ -110,19 +111,11 @@ class StrengthAnalyzer:
     def _fetch_player_stats(self, puuid: str, time_range: Optional[int] = None) -> Dict:
         """Fetch and aggregate player statistics from DynamoDB"""
         try:
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            table = dynamodb.Table('lol-player-data')
-
             # Query matches
-            response = table.query(
-                KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-            )
-
-            matches = response['Items']
+            items = get_match_repository().matches(puuid)
 
             # Limit to time_range if specified
-            if time_range:
-                matches = matches[:time_range]
+            matches = list(islice(items, time_range) if time_range else items)
 
             if not matches:
                 return {}
@@ -207,9 +200,8 @@ class StrengthAnalyzer:
 
         for player_metric, bench_metric in metric_mapping.items():
             if player_metric in player_stats and bench_metric in benchmarks:
-                # Convert to float to handle Decimal types from DynamoDB
-                player_value = float(player_stats[player_metric])
-                benchmark_value = float(benchmarks[bench_metric])
+                player_value = player_stats[player_metric]
+                benchmark_value = benchmarks[bench_metric]
 
                 percentile = calculate_percentile(player_value, benchmark_value)
                 label = get_percentile_label(percentile)
@@ -4,7 +4,9 @@ from typing import Dict, List
 from collections import defaultdict
 import logging
 from pymongo import MongoClient
-import boto3
+
+from services.match_repository import get_match_repository
+from services.timeline_store import classify_event, load_player_timelines, participant_id_for
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +23,8 @@ class TimelineAggregator:
         self.mongo_client = MongoClient(self.mongo_connection)
         self.mongo_db = self.mongo_client['lol_timelines']
 
-        # DynamoDB connection
-        self.aws_region = os.getenv('AWS_REGION', 'us-east-1')
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.aws_region)
-        self.dynamodb_table = self.dynamodb.Table('lol-player-data')
+        # DynamoDB reads go through the shared match repository
+        self.matches = get_match_repository()
 
     def _get_participant_id_for_puuid(self, match_data: Dict, target_puuid: str) -> int:
         """Get the participant ID for a given PUUID in a match"""
@@ -41,14 +41,9 @@ class TimelineAggregator:
     def _get_match_data_from_dynamodb(self, puuid: str, match_id: str) -> Dict:
         """Fetch match data from DynamoDB"""
         try:
-            from boto3.dynamodb.conditions import Key
-
-            response = self.dynamodb_table.query(
-                KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').eq(f'match#{match_id}')
-            )
-
-            if response['Items']:
-                return response['Items'][0].get('data', {})
+            match_item = self.matches.get_match(puuid, match_id)
+            if match_item:
+                return match_item.get('data', {})
         except Exception as e:
             logger.error(f"Error fetching match from DynamoDB: {e}")
 
@@ -64,10 +59,9 @@ class TimelineAggregator:
         """
         logger.info(f"Generating heatmap data for {player_name}")
 
-        # Get all timelines for this player from MongoDB
+        # Get all timelines for this player from MongoDB (compact form, a few KB each)
         try:
-            timelines_cursor = self.mongo_db.timelines.find({'puuid': target_puuid})
-            timelines = list(timelines_cursor)
+            timelines = load_player_timelines(self.mongo_db, target_puuid)
         except Exception as e:
             logger.error(f"Error fetching timelines from MongoDB: {e}")
             return self._empty_response(target_puuid, player_name)
@@ -78,23 +72,25 @@ class TimelineAggregator:
 
         logger.info(f"Found {len(timelines)} timelines in MongoDB")
 
-        # Build match_id -> participant_id mapping
+        # Build match_id -> participant_id mapping (from the timeline's participant list,
+        # falling back to the match data in DynamoDB)
         puuid_to_participant_map = {}
 
-        for timeline_doc in timelines:
+        for timeline in timelines:
             try:
-                match_id = timeline_doc['matchId']
+                match_id = timeline['matchId']
+                participant_id = participant_id_for(timeline, target_puuid)
 
-                # Get match data from DynamoDB to find participant ID
-                match_data = self._get_match_data_from_dynamodb(target_puuid, match_id)
+                if participant_id is None:
+                    match_data = self._get_match_data_from_dynamodb(target_puuid, match_id)
+                    if match_data:
+                        participant_id = self._get_participant_id_for_puuid(match_data, target_puuid)
 
-                if match_data:
-                    participant_id = self._get_participant_id_for_puuid(match_data, target_puuid)
-                    if participant_id:
-                        puuid_to_participant_map[match_id] = participant_id
+                if participant_id:
+                    puuid_to_participant_map[match_id] = participant_id
 
             except Exception as e:
-                logger.error(f"Error processing timeline for match {timeline_doc.get('matchId')}: {e}")
+                logger.error(f"Error processing timeline for match {timeline.get('matchId')}: {e}")
                 continue
 
         logger.info(f"Found player in {len(puuid_to_participant_map)} matches")
@@ -124,91 +120,34 @@ class TimelineAggregator:
             "objectives": defaultdict(int)
         }
 
-        # Process each timeline from MongoDB
-        for timeline_doc in timelines:
+        # Process each timeline's positional event table
+        for timeline in timelines:
+            match_id = timeline['matchId']
             try:
-                match_id = timeline_doc['matchId']
-
                 if match_id not in puuid_to_participant_map:
                     continue
 
                 player_participant_id = puuid_to_participant_map[match_id]
-                timeline_data = timeline_doc['data']
-
-                # Process each frame
-                for frame in timeline_data['info']['frames']:
-                    # Process events
-                    for event in frame.get('events', []):
-                        if not event.get('position'):
-                            continue
-
-                        pos = event['position']
-                        timestamp = event['timestamp']
-
-                        # Calculate minute bucket for timeline
-                        minute_bucket = timestamp // 60000  # Convert ms to minutes
-
-                        # DEATHS: Player was killed
-                        if event['type'] == 'CHAMPION_KILL' and event.get('victimId') == player_participant_id:
-                            heatmap_data['deaths'].append({
-                                'x': pos['x'],
-                                'y': pos['y'],
-                                'timestamp': timestamp,
-                                'match_id': match_id,
-                                'killer_id': event.get('killerId')
-                            })
-                            stats['deaths_count'] += 1
-                            timeline_stats['deaths'][minute_bucket] += 1
-
-                        # KILLS: Player got the kill
-                        elif event['type'] == 'CHAMPION_KILL' and event.get('killerId') == player_participant_id:
-                            heatmap_data['kills'].append({
-                                'x': pos['x'],
-                                'y': pos['y'],
-                                'timestamp': timestamp,
-                                'match_id': match_id,
-                                'victim_id': event.get('victimId')
-                            })
-                            stats['kills_count'] += 1
-                            timeline_stats['kills'][minute_bucket] += 1
-
-                        # ASSISTS: Player got an assist
-                        elif event['type'] == 'CHAMPION_KILL' and player_participant_id in event.get('assistingParticipantIds', []):
-                            heatmap_data['assists'].append({
-                                'x': pos['x'],
-                                'y': pos['y'],
-                                'timestamp': timestamp,
-                                'match_id': match_id,
-                                'victim_id': event.get('victimId')
-                            })
-                            stats['assists_count'] += 1
-                            timeline_stats['assists'][minute_bucket] += 1
-
-                        # OBJECTIVES: Player participated in objective kills
-                        elif event['type'] == 'ELITE_MONSTER_KILL' and event.get('killerId') == player_participant_id:
-                            heatmap_data['objectives'].append({
-                                'x': pos['x'],
-                                'y': pos['y'],
-                                'timestamp': timestamp,
-                                'match_id': match_id,
-                                'monster_type': event.get('monsterType')
-                            })
-                            stats['objectives_count'] += 1
-                            timeline_stats['objectives'][minute_bucket] += 1
-
-                        elif event['type'] == 'BUILDING_KILL':
-                            # Check if player was involved
-                            assisting = event.get('assistingParticipantIds', [])
-                            if player_participant_id in assisting or event.get('killerId') == player_participant_id:
-                                heatmap_data['objectives'].append({
-                                    'x': pos['x'],
-                                    'y': pos['y'],
-                                    'timestamp': timestamp,
-                                    'match_id': match_id,
-                                    'building_type': event.get('buildingType')
-                                })
-                                stats['objectives_count'] += 1
-                                timeline_stats['objectives'][minute_bucket] += 1
+
+                for event in timeline.get('events', []):
+                    classified = classify_event(event, player_participant_id)
+                    if classified is None:
+                        continue
+
+                    category, extra = classified
+                    timestamp = event['timestamp']
+
+                    heatmap_data[category].append({
+                        'x': event['x'],
+                        'y': event['y'],
+                        'timestamp': timestamp,
+                        'match_id': match_id,
+                        **extra
+                    })
+                    stats[f'{category}_count'] += 1
+
+                    # Calculate minute bucket for timeline
+                    timeline_stats[category][timestamp // 60000] += 1
 
             except Exception as e:
                 logger.error(f"Error processing timeline for match {match_id}: {e}")
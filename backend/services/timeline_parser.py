@@ -0,0 +1,203 @@
+"""
+Compact Timeline Parser
+- Streams Riot match-v5 timeline JSON and keeps only what the app reads
+- Positional events become a flat event table (type, timestamp, x, y, killer, victim, ...)
+- Per-minute participant frames become per-participant arrays
+- Uses ijson for incremental parsing when installed, otherwise parses the full body
+"""
+
+import json
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+try:
+    import ijson
+except ImportError:  # optional dependency
+    ijson = None
+
+# Event fields kept in the compact event table (position is flattened to x/y)
+EVENT_FIELDS = (
+    'killerId',
+    'victimId',
+    'assistingParticipantIds',
+    'monsterType',
+    'monsterSubType',
+    'buildingType',
+    'towerType',
+    'laneType',
+    'teamId',
+)
+
+# Participant frame stats kept per minute
+FRAME_FIELDS = (
+    'totalGold',
+    'xp',
+    'level',
+    'minionsKilled',
+    'jungleMinionsKilled',
+)
+
+COMPACT_VERSION = 1
+
+
+class CompactTimelineBuilder:
+    """Accumulates a compact timeline one frame at a time"""
+
+    def __init__(self, match_id: Optional[str] = None):
+        self.match_id = match_id
+        self.frame_interval = None
+        self.game_id = None
+        self.participants: List[Dict] = []
+        self.events: List[Dict] = []
+        self.frame_timestamps: List[int] = []
+        self.participant_frames: Dict[str, Dict[str, List]] = {}
+
+    def add_participant(self, participant: Dict):
+        self.participants.append({
+            'participantId': participant.get('participantId'),
+            'puuid': participant.get('puuid')
+        })
+
+    def add_frame(self, frame: Dict):
+        """Keep positional events and per-participant position/stats for one frame"""
+        for event in frame.get('events', []):
+            position = event.get('position')
+            if not position:
+                continue
+            row = {
+                'type': event.get('type'),
+                'timestamp': event.get('timestamp'),
+                'x': position.get('x'),
+                'y': position.get('y')
+            }
+            for field in EVENT_FIELDS:
+                if field in event:
+                    row[field] = event[field]
+            self.events.append(row)
+
+        index = len(self.frame_timestamps)
+        self.frame_timestamps.append(frame.get('timestamp'))
+
+        for participant_id, pframe in (frame.get('participantFrames') or {}).items():
+            columns = self.participant_frames.get(str(participant_id))
+            if columns is None:
+                columns = {field: [None] * index for field in ('x', 'y') + FRAME_FIELDS}
+                self.participant_frames[str(participant_id)] = columns
+            position = pframe.get('position') or {}
+            columns['x'].append(position.get('x'))
+            columns['y'].append(position.get('y'))
+            for field in FRAME_FIELDS:
+                columns[field].append(pframe.get(field))
+
+        # Participants missing from this frame keep aligned columns
+        for columns in self.participant_frames.values():
+            for values in columns.values():
+                if len(values) <= index:
+                    values.append(None)
+
+    def build(self) -> Dict:
+        return {
+            'version': COMPACT_VERSION,
+            'matchId': self.match_id,
+            'gameId': self.game_id,
+            'frameInterval': self.frame_interval,
+            'participants': self.participants,
+            'events': self.events,
+            'frames': {
+                'timestamps': self.frame_timestamps,
+                'participants': self.participant_frames
+            }
+        }
+
+
+def compact_timeline(timeline: Dict, match_id: Optional[str] = None) -> Dict:
+    """Build the compact representation from an already parsed timeline"""
+    info = timeline.get('info', {})
+    builder = CompactTimelineBuilder(match_id or timeline.get('metadata', {}).get('matchId'))
+    builder.frame_interval = info.get('frameInterval')
+    builder.game_id = info.get('gameId')
+    for participant in info.get('participants', []):
+        builder.add_participant(participant)
+    for frame in info.get('frames', []):
+        builder.add_frame(frame)
+    return builder.build()
+
+
+class StreamingTimelineParser:
+    """
+    Incremental parser: feed raw body chunks, get the compact timeline at the end.
+
+    With ijson only one frame (a few KB) is materialized at a time; without it
+    the body is buffered and parsed once, and only the compact result is kept.
+    """
+
+    def __init__(self, match_id: Optional[str] = None):
+        self.builder = CompactTimelineBuilder(match_id)
+        if ijson is not None:
+            self._events = ijson.sendable_list()
+            self._coro = ijson.parse_coro(self._events, use_float=True)
+            self._prefix = None
+            self._object = None
+        else:
+            self._chunks: List[bytes] = []
+
+    def feed(self, chunk: bytes):
+        if ijson is None:
+            self._chunks.append(chunk)
+            return
+        self._coro.send(chunk)
+        self._drain()
+
+    def _drain(self):
+        for prefix, event, value in self._events:
+            if self._object is not None:
+                self._object.event(event, value)
+                if prefix == self._prefix and event == 'end_map':
+                    self._finish_object()
+                continue
+
+            if event == 'start_map' and prefix in ('info.frames.item', 'info.participants.item'):
+                self._prefix = prefix
+                self._object = ijson.ObjectBuilder()
+                self._object.event(event, value)
+            elif prefix == 'metadata.matchId' and event == 'string' and not self.builder.match_id:
+                self.builder.match_id = value
+            elif prefix == 'info.frameInterval' and event == 'number':
+                self.builder.frame_interval = int(value)
+            elif prefix == 'info.gameId' and event == 'number':
+                self.builder.game_id = int(value)
+        del self._events[:]
+
+    def _finish_object(self):
+        value = self._object.value
+        if self._prefix == 'info.frames.item':
+            self.builder.add_frame(value)
+        else:
+            self.builder.add_participant(value)
+        self._prefix = None
+        self._object = None
+
+    def close(self) -> Dict:
+        """Finish parsing and return the compact timeline"""
+        if ijson is None:
+            timeline = json.loads(b''.join(self._chunks))
+            self._chunks = []
+            return compact_timeline(timeline, self.builder.match_id)
+        self._coro.close()
+        self._drain()
+        return self.builder.build()
+
+
+def parse_timeline_chunks(chunks: Iterable[bytes], match_id: Optional[str] = None) -> Dict:
+    """Parse an iterable of body chunks into a compact timeline"""
+    parser = StreamingTimelineParser(match_id)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+async def parse_timeline_stream(chunks: AsyncIterator[bytes], match_id: Optional[str] = None) -> Dict:
+    """Parse an async stream of body chunks (e.g. httpx aiter_bytes) into a compact timeline"""
+    parser = StreamingTimelineParser(match_id)
+    async for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
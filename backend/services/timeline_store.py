@@ -0,0 +1,124 @@
+"""
+Timeline Store
+- Loads a player's timelines for the heatmap readers in the compact form, projected to the
+  participants and event table; sort and limit run in MongoDB
+- Compact documents are written at ingest to lol_timelines.timelines_compact next to the raw ones
+- Matches that only have a raw timeline fall back to it, fetched without participantFrames and compacted in memory
+- Shared classification of positional events into deaths/kills/assists/objectives
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import DESCENDING
+
+from services.timeline_parser import compact_timeline
+
+logger = logging.getLogger(__name__)
+
+# Compact timeline fields the heatmap readers use (skips the per-minute frame arrays)
+COMPACT_PROJECTION = {
+    '_id': 0,
+    'matchId': 1,
+    'data.gameId': 1,
+    'data.participants': 1,
+    'data.events': 1
+}
+
+# Raw timeline fields the compact transform reads (skips the bulky participantFrames)
+RAW_FALLBACK_PROJECTION = {
+    '_id': 0,
+    'matchId': 1,
+    'data.metadata.matchId': 1,
+    'data.info.frameInterval': 1,
+    'data.info.gameId': 1,
+    'data.info.participants': 1,
+    'data.info.frames.timestamp': 1,
+    'data.info.frames.events': 1
+}
+
+
+def _match_sort_key(match_id: str) -> int:
+    """Match IDs are <platform>_<increasing game id>, so the numeric part orders by recency"""
+    suffix = match_id.rsplit('_', 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+def load_player_timelines(mongo_db, puuid: str, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Compact timelines for a player, newest match first
+
+    Only the participants and events of each timeline are loaded; with a limit,
+    MongoDB sorts by game ID and returns just the newest `limit` documents.
+
+    Args:
+        mongo_db: lol_timelines database
+        puuid: Player PUUID
+        limit: Only the most recent `limit` matches
+
+    Returns:
+        List of compact timelines (participants, events and gameId), each with matchId set
+    """
+    compact_cursor = mongo_db.timelines_compact.find({'puuid': puuid}, COMPACT_PROJECTION).sort('data.gameId', DESCENDING)
+    if limit:
+        compact_cursor = compact_cursor.limit(limit)
+    timelines = {doc['matchId']: doc['data'] for doc in compact_cursor}
+
+    # Timelines ingested before compact documents existed (every compact matchId is excluded,
+    # not just the newest `limit`)
+    compact_ids = mongo_db.timelines_compact.distinct('matchId', {'puuid': puuid}) if limit else list(timelines)
+    raw_cursor = mongo_db.timelines.find(
+        {'puuid': puuid, 'matchId': {'$nin': compact_ids}},
+        RAW_FALLBACK_PROJECTION
+    ).sort('gameCreation', DESCENDING)
+    if limit:
+        raw_cursor = raw_cursor.limit(limit)
+    fallback = 0
+    for doc in raw_cursor:
+        compact = compact_timeline(doc.get('data', {}), doc['matchId'])
+        timelines[doc['matchId']] = {field: compact.get(field) for field in ('gameId', 'participants', 'events')}
+        fallback += 1
+    if fallback:
+        logger.info(f"Compacted {fallback} raw timelines in memory for {puuid[:8]} (no compact document yet)")
+
+    # Each source returned its newest `limit`, so the newest `limit` overall are among them
+    match_ids = sorted(timelines, key=_match_sort_key, reverse=True)
+    if limit:
+        match_ids = match_ids[:limit]
+    return [{**timelines[match_id], 'matchId': match_id} for match_id in match_ids]
+
+
+def participant_id_for(timeline: Dict, puuid: str) -> Optional[int]:
+    """The player's participant ID from the compact timeline's participant list"""
+    for participant in timeline.get('participants', []):
+        if participant.get('puuid') == puuid:
+            return participant.get('participantId')
+    return None
+
+
+def classify_event(event: Dict, participant_id: int) -> Optional[Tuple[str, Dict]]:
+    """
+    Which heatmap category a compact event row counts as for a participant
+
+    Returns:
+        (category, extra fields) with category in deaths/kills/assists/objectives, or None
+    """
+    event_type = event.get('type')
+
+    if event_type == 'CHAMPION_KILL':
+        if event.get('victimId') == participant_id:
+            return 'deaths', {'killer_id': event.get('killerId')}
+        if event.get('killerId') == participant_id:
+            return 'kills', {'victim_id': event.get('victimId')}
+        if participant_id in (event.get('assistingParticipantIds') or []):
+            return 'assists', {'victim_id': event.get('victimId')}
+
+    elif event_type == 'ELITE_MONSTER_KILL':
+        if event.get('killerId') == participant_id:
+            return 'objectives', {'monster_type': event.get('monsterType')}
+
+    elif event_type == 'BUILDING_KILL':
+        if participant_id in (event.get('assistingParticipantIds') or []) or event.get('killerId') == participant_id:
+            return 'objectives', {'building_type': event.get('buildingType')}
+
+    return None
@@ -0,0 +1,153 @@
+"""
+Bulk Timeline Writer
+- Buffers timeline documents and upserts them with unordered bulk_write batches
+- Batches are capped by document count and encoded size (timelines are ~0.5-1 MB each)
+- Reports per-batch latency, upsert/modify counts and per-document write errors
+- Shared by PlayerDataService and upload_timelines_to_mongodb.py
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import bson
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+def build_timeline_document(match_id: str, puuid: str, timeline_data: Dict, uploaded_at: Optional[datetime] = None) -> Dict:
+    """Raw timeline document with the metadata fields used for sorting and stats"""
+    doc = {
+        'matchId': match_id,
+        'puuid': puuid,
+        'data': timeline_data,
+        'uploadedAt': uploaded_at or datetime.utcnow()
+    }
+
+    if 'info' in timeline_data:
+        info = timeline_data['info']
+        doc['gameCreation'] = info.get('gameCreation')
+        doc['gameDuration'] = info.get('gameDuration')
+        doc['frameInterval'] = info.get('frameInterval')
+        doc['frames'] = len(info.get('frames', []))
+
+    return doc
+
+
+def build_compact_timeline_document(match_id: str, puuid: str, compact: Dict, uploaded_at: Optional[datetime] = None) -> Dict:
+    """Compact timeline document (event table + per-minute arrays, see timeline_parser)"""
+    return {
+        'matchId': match_id,
+        'puuid': puuid,
+        'data': compact,
+        'uploadedAt': uploaded_at or datetime.utcnow()
+    }
+
+
+class TimelineBulkWriter:
+    """
+    Buffered bulk upserter for one timeline collection (keyed by matchId).
+
+    add() buffers an UpdateOne upsert and flushes once the batch reaches
+    max_batch_docs documents or max_batch_bytes of encoded BSON. Batches are
+    unordered, so one bad document does not stop the rest. Thread-safe.
+    """
+
+    def __init__(self, collection, max_batch_docs: Optional[int] = None, max_batch_bytes: Optional[int] = None):
+        self.collection = collection
+        self.max_batch_docs = max_batch_docs or int(os.getenv('MONGO_BULK_MAX_DOCS', '100'))
+        self.max_batch_bytes = max_batch_bytes or int(float(os.getenv('MONGO_BULK_MAX_MB', '8')) * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._ops: List[UpdateOne] = []
+        self._match_ids: List[str] = []
+        self._bytes = 0
+        self._started = time.perf_counter()
+
+        self._report = {
+            'documents': 0,
+            'upserted': 0,
+            'modified': 0,
+            'matched': 0,
+            'batches': [],
+            'errors': []
+        }
+
+    def add(self, doc: Dict, size: Optional[int] = None):
+        """Buffer an upsert for doc (must contain matchId); size is its encoded size if already known"""
+        if size is None:
+            size = len(bson.encode(doc))
+
+        with self._lock:
+            self._ops.append(UpdateOne({'matchId': doc['matchId']}, {'$set': doc}, upsert=True))
+            self._match_ids.append(doc['matchId'])
+            self._bytes += size
+            if len(self._ops) < self.max_batch_docs and self._bytes < self.max_batch_bytes:
+                return
+            batch = self._take_batch()
+        self._write(*batch)
+
+    def _take_batch(self):
+        batch = (self._ops, self._match_ids, self._bytes)
+        self._ops, self._match_ids, self._bytes = [], [], 0
+        return batch
+
+    def _write(self, ops: List[UpdateOne], match_ids: List[str], size: int):
+        if not ops:
+            return
+
+        started = time.perf_counter()
+        errors = []
+        try:
+            result = self.collection.bulk_write(ops, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            errors = [
+                {'matchId': match_ids[error['index']], 'error': error.get('errmsg', str(error))}
+                for error in details.get('writeErrors', [])
+            ]
+        except Exception as e:
+            details = {}
+            errors = [{'matchId': match_id, 'error': str(e)} for match_id in match_ids]
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if errors:
+            logger.warning(f"Bulk write to {self.collection.name}: {len(errors)}/{len(ops)} documents failed")
+
+        with self._lock:
+            self._report['documents'] += len(ops) - len(errors)
+            self._report['upserted'] += details.get('nUpserted', 0)
+            self._report['modified'] += details.get('nModified', 0)
+            self._report['matched'] += details.get('nMatched', 0)
+            self._report['errors'].extend(errors)
+            self._report['batches'].append({
+                'documents': len(ops),
+                'bytes': size,
+                'latencyMs': latency_ms,
+                'errors': len(errors)
+            })
+
+    def flush(self):
+        with self._lock:
+            batch = self._take_batch()
+        self._write(*batch)
+
+    def close(self) -> Dict:
+        """
+        Flush the remaining batch
+
+        Returns:
+            Dict with documents written, upserted/modified/matched counts,
+            per-batch {documents, bytes, latencyMs, errors}, errors
+            ({matchId, error}) and durationMs
+        """
+        self.flush()
+        report = dict(self._report)
+        report['durationMs'] = round((time.perf_counter() - self._started) * 1000, 1)
+        return report
@@ -9,22 +9,11 @@ import json
 from typing import List, Dict, Optional, Any
 import logging
 import os
-from decimal import Decimal
+from services.match_repository import get_match_repository
 
 logger = logging.getLogger(__name__)
 
 
-def convert_decimals(obj):
-    """Recursively convert Decimal objects to float for JSON serialization"""
-    if isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_decimals(item) for item in obj]
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    return obj
-
-
 class YearRecapChatAgent:
     def __init__(self):
         self.bedrock = boto3.client(
@@ -300,13 +289,10 @@ Available context about the player's year:
                         # Execute the tool
                         tool_result = self._execute_tool(tool_name, tool_input, puuid)
 
-                        # Convert Decimals to float for JSON serialization
-                        tool_result_converted = convert_decimals(tool_result)
-
                         tools_used.append({
                             "name": tool_name,
                             "input": tool_input,
-                            "result": tool_result_converted
+                            "result": tool_result
                         })
 
                         # Check if this is a UI action tool
@@ -326,7 +312,7 @@ Available context about the player's year:
                             "content": [{
                                 "type": "tool_result",
                                 "tool_use_id": tool_use_id,
-                                "content": json.dumps(tool_result_converted)
+                                "content": json.dumps(tool_result)
                             }]
                         })
                         break
@@ -465,33 +451,11 @@ Available context about the player's year:
 
     def _get_champion_performance(self, puuid: str, champion_name: str) -> Dict:
         """Fetch performance stats for a specific champion"""
-        import boto3
-        from boto3.dynamodb.conditions import Key
         from collections import defaultdict
 
         try:
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            table = dynamodb.Table('lol-player-data')
-
             # Fetch all matches
-            matches = []
-            last_evaluated_key = None
-
-            while True:
-                if last_evaluated_key:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#'),
-                        ExclusiveStartKey=last_evaluated_key
-                    )
-                else:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-                    )
-
-                matches.extend(response['Items'])
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
+            matches = list(get_match_repository().matches(puuid))
 
             # Filter matches for the champion
             champion_matches = []
@@ -545,13 +509,8 @@ Available context about the player's year:
 
     def _get_role_performance(self, puuid: str, role: str) -> Dict:
         """Fetch performance stats for a specific role"""
-        import boto3
-        from boto3.dynamodb.conditions import Key
 
         try:
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            table = dynamodb.Table('lol-player-data')
-
             # Role mapping
             role_map = {
                 'Top': 'TOP',
@@ -563,24 +522,7 @@ Available context about the player's year:
             riot_role = role_map.get(role, role)
 
             # Fetch matches
-            matches = []
-            last_evaluated_key = None
-
-            while True:
-                if last_evaluated_key:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#'),
-                        ExclusiveStartKey=last_evaluated_key
-                    )
-                else:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-                    )
-
-                matches.extend(response['Items'])
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
+            matches = list(get_match_repository().matches(puuid))
 
             # Filter by role
             role_stats = {
@@ -600,7 +542,7 @@ Available context about the player's year:
                         role_stats['matches'] += 1
                         role_stats['wins'] += 1 if participant.get('win', False) else 0
                         challenges = participant.get('challenges', {})
-                        role_stats['total_kda'] += float(challenges.get('kda', 0))
+                        role_stats['total_kda'] += challenges.get('kda', 0)
                         role_stats['total_vision'] += participant.get('visionScore', 0)
                         role_stats['total_damage'] += participant.get('totalDamageDealtToChampions', 0)
                         break
@@ -623,32 +565,10 @@ Available context about the player's year:
 
     def _get_time_filtered_stats(self, puuid: str, time_range: int) -> Dict:
         """Get stats for recent matches"""
-        import boto3
-        from boto3.dynamodb.conditions import Key
 
         try:
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            table = dynamodb.Table('lol-player-data')
-
             # Fetch matches
-            matches = []
-            last_evaluated_key = None
-
-            while True:
-                if last_evaluated_key:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#'),
-                        ExclusiveStartKey=last_evaluated_key
-                    )
-                else:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-                    )
-
-                matches.extend(response['Items'])
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
+            matches = list(get_match_repository().matches(puuid))
 
             # Limit to time_range
             recent_matches = matches[:time_range]
@@ -671,7 +591,7 @@ Available context about the player's year:
                         stats['matches'] += 1
                         stats['wins'] += 1 if participant.get('win', False) else 0
                         challenges = participant.get('challenges', {})
-                        stats['total_kda'] += float(challenges.get('kda', 0))
+                        stats['total_kda'] += challenges.get('kda', 0)
                         stats['total_vision'] += participant.get('visionScore', 0)
                         stats['total_damage'] += participant.get('totalDamageDealtToChampions', 0)
                         break
@@ -701,31 +621,9 @@ Available context about the player's year:
 
     def _get_vision_details(self, puuid: str) -> Dict:
         """Get detailed vision statistics"""
-        import boto3
-        from boto3.dynamodb.conditions import Key
 
         try:
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            table = dynamodb.Table('lol-player-data')
-
-            matches = []
-            last_evaluated_key = None
-
-            while True:
-                if last_evaluated_key:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#'),
-                        ExclusiveStartKey=last_evaluated_key
-                    )
-                else:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-                    )
-
-                matches.extend(response['Items'])
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
+            matches = list(get_match_repository().matches(puuid))
 
             vision_totals = {
                 'wards_placed': 0,
@@ -765,31 +663,9 @@ Available context about the player's year:
 
     def _get_objective_details(self, puuid: str) -> Dict:
         """Get detailed objective statistics"""
-        import boto3
-        from boto3.dynamodb.conditions import Key
 
         try:
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            table = dynamodb.Table('lol-player-data')
-
-            matches = []
-            last_evaluated_key = None
-
-            while True:
-                if last_evaluated_key:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#'),
-                        ExclusiveStartKey=last_evaluated_key
-                    )
-                else:
-                    response = table.query(
-                        KeyConditionExpression=Key('puuid').eq(puuid) & Key('dataType').begins_with('match#')
-                    )
-
-                matches.extend(response['Items'])
-                last_evaluated_key = response.get('LastEvaluatedKey')
-                if not last_evaluated_key:
-                    break
+            matches = list(get_match_repository().matches(puuid))
 
             objective_totals = {
                 'dragons': 0,
@@ -807,8 +683,8 @@ Available context about the player's year:
                     if participant.get('puuid') == puuid:
                         objective_totals['matches'] += 1
                         challenges = participant.get('challenges', {})
-                        objective_totals['dragons'] += int(challenges.get('dragonTakedowns', 0) or 0)
-                        objective_totals['barons'] += int(challenges.get('teamBaronKills', 0) or 0)
+                        objective_totals['dragons'] += (challenges.get('dragonTakedowns', 0) or 0)
+                        objective_totals['barons'] += (challenges.get('teamBaronKills', 0) or 0)
                         objective_totals['towers'] += participant.get('turretKills', 0)
                         objective_totals['first_blood'] += 1 if participant.get('firstBloodKill') else 0
                         break
@@ -892,7 +768,6 @@ Available context about the player's year:
                 return {"error": result.get('error', 'Analysis failed')}
 
             # Format the result for the agent to present
-            # Note: Decimal conversion happens at tool execution level
             return {
                 "status": "success",
                 "analysis_type": analysis_type,
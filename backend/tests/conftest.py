@@ -0,0 +1,9 @@
+"""
+Shared pytest setup for the backend tests
+- Puts the backend directory on sys.path, as the API modules do for `services.*` imports
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,210 @@
+"""
+In-memory stand-in for the parts of DynamoDB the services call
+- FakeDynamoDB is a low-level client (attribute-value items): get_item, put_item, update_item,
+  query and scan, for code that uses the shared client from dynamo_codec
+- FakeDynamoDB.resource() is resource-shaped (native items): Table(), batch_get_item and
+  meta.client.batch_write_item, for StoredMatchIndex and DynamoBatchWriter
+- Only the key conditions, AND-ed filters and update expressions this backend writes are understood
+- Failure knobs: reject_write(item) leaves matching puts unprocessed on every attempt;
+  unprocessed_gets leaves every BatchGetItem key unprocessed for that many calls
+"""
+
+import re
+from types import SimpleNamespace
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+KEY_CONDITION = re.compile(r'puuid = (:\w+)(?: AND begins_with\(dataType, (:\w+)\))?$')
+FILTER_CLAUSE = re.compile(r'(?:(attribute_exists|begins_with)\((#?\w+)(?:, (:\w+))?\)|(#?\w+) = (:\w+))$')
+UPDATE_CLAUSE = re.compile(r'(ADD|SET|REMOVE) (.*?)(?= (?:ADD|SET|REMOVE) |$)')
+
+
+def to_low_level(item):
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+def to_native(item):
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def item_key(item):
+    """(puuid, dataType) of a low-level item or key"""
+    return item['puuid']['S'], item['dataType']['S']
+
+
+class FakeDynamoDB:
+    def __init__(self, page_size=None):
+        self.items = {}
+        self.page_size = page_size
+        self.reject_write = None
+        self.unprocessed_gets = 0
+        self.calls = {}
+
+    def _count(self, operation):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    # Seeding and inspection with native items
+
+    def put(self, item):
+        self.items[(item['puuid'], item['dataType'])] = to_low_level(item)
+
+    def get(self, puuid, data_type):
+        item = self.items.get((puuid, data_type))
+        return to_native(item) if item is not None else None
+
+    def data_types(self, puuid):
+        return sorted(data_type for key_puuid, data_type in self.items if key_puuid == puuid)
+
+    # Low-level client
+
+    def get_item(self, TableName, Key, **_):
+        self._count('get_item')
+        item = self.items.get(item_key(Key))
+        return {'Item': dict(item)} if item is not None else {}
+
+    def put_item(self, TableName, Item, **_):
+        self._count('put_item')
+        self.items[item_key(Item)] = dict(Item)
+        return {}
+
+    def update_item(self, TableName, Key, UpdateExpression, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, **_):
+        self._count('update_item')
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        item = self.items.setdefault(item_key(Key), dict(Key))
+        for action, body in UPDATE_CLAUSE.findall(UpdateExpression):
+            for part in (part.strip() for part in body.split(',')):
+                if action == 'REMOVE':
+                    item.pop(names.get(part, part), None)
+                elif action == 'SET':
+                    attribute, placeholder = (side.strip() for side in part.split('='))
+                    item[names.get(attribute, attribute)] = values[placeholder]
+                else:
+                    attribute, placeholder = part.split()
+                    attribute = names.get(attribute, attribute)
+                    current = int(item[attribute]['N']) if attribute in item else 0
+                    item[attribute] = {'N': str(current + int(values[placeholder]['N']))}
+        return {'Attributes': {key: value for key, value in item.items() if key not in ('puuid', 'dataType')}}
+
+    def _page(self, matches, params):
+        start = 0
+        if 'ExclusiveStartKey' in params:
+            last = item_key(params['ExclusiveStartKey'])
+            start = next(i for i, item in enumerate(matches) if item_key(item) == last) + 1
+        size = params.get('Limit') or self.page_size or len(matches) or 1
+        page = matches[start:start + size]
+        response = {'Items': [dict(item) for item in page], 'Count': len(page), 'ScannedCount': len(page)}
+        if start + size < len(matches):
+            response['LastEvaluatedKey'] = {'puuid': page[-1]['puuid'], 'dataType': page[-1]['dataType']}
+        return response
+
+    def query(self, **params):
+        self._count('query')
+        puuid_value, prefix_value = KEY_CONDITION.match(params['KeyConditionExpression']).groups()
+        values = params['ExpressionAttributeValues']
+        puuid = values[puuid_value]['S']
+        prefix = values[prefix_value]['S'] if prefix_value else ''
+        matches = [
+            self.items[key] for key in sorted(self.items)
+            if key[0] == puuid and key[1].startswith(prefix)
+        ]
+        return self._page(matches, params)
+
+    def scan(self, **params):
+        """Pages over every item; Limit applies before the FilterExpression, as in DynamoDB"""
+        self._count('scan')
+        response = self._page([self.items[key] for key in sorted(self.items)], params)
+        if 'FilterExpression' in params:
+            response['Items'] = [item for item in response['Items'] if self._matches(item, params)]
+            response['Count'] = len(response['Items'])
+        return response
+
+    @staticmethod
+    def _matches(item, params):
+        """Evaluate a FilterExpression of AND-ed `a = :v`, begins_with(a, :v) and attribute_exists(a)"""
+        names = params.get('ExpressionAttributeNames', {})
+        values = params.get('ExpressionAttributeValues', {})
+        for clause in params['FilterExpression'].split(' AND '):
+            clause = clause.strip()
+            match = FILTER_CLAUSE.match(clause)
+            if match is None:
+                raise NotImplementedError(clause)
+            function, attribute, placeholder = match.group(1), match.group(2) or match.group(4), match.group(3) or match.group(5)
+            attribute = names.get(attribute, attribute)
+            if function == 'attribute_exists':
+                if attribute not in item:
+                    return False
+            elif function == 'begins_with':
+                if not item.get(attribute, {}).get('S', '').startswith(values[placeholder]['S']):
+                    return False
+            elif item.get(attribute) != values[placeholder]:
+                return False
+        return True
+
+    # Resource-shaped view
+
+    def resource(self):
+        return FakeResource(self)
+
+
+class FakeTable:
+    def __init__(self, store):
+        self.store = store
+
+    def get_item(self, Key, **_):
+        response = self.store.get_item(None, to_low_level(Key))
+        return {'Item': to_native(response['Item'])} if 'Item' in response else {}
+
+    def put_item(self, Item, **_):
+        self.store.put_item(None, to_low_level(Item))
+
+
+class FakeResourceClient:
+    """The resource's client: takes and returns native items"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def batch_write_item(self, RequestItems, **_):
+        self.store._count('batch_write_item')
+        unprocessed = {}
+        consumed = 0
+        for table_name, requests in RequestItems.items():
+            for request in requests:
+                item = request['PutRequest']['Item']
+                if self.store.reject_write is not None and self.store.reject_write(item):
+                    unprocessed.setdefault(table_name, []).append(request)
+                    continue
+                self.store.put(item)
+                consumed += 1
+        return {
+            'UnprocessedItems': unprocessed,
+            'ConsumedCapacity': [{'TableName': name, 'CapacityUnits': consumed} for name in RequestItems]
+        }
+
+
+class FakeResource:
+    def __init__(self, store):
+        self.store = store
+        self.meta = SimpleNamespace(client=FakeResourceClient(store))
+
+    def Table(self, name):
+        return FakeTable(self.store)
+
+    def batch_get_item(self, RequestItems):
+        self.store._count('batch_get_item')
+        if self.store.unprocessed_gets:
+            self.store.unprocessed_gets -= 1
+            return {'Responses': {}, 'UnprocessedKeys': RequestItems}
+        responses = {}
+        for table_name, request in RequestItems.items():
+            found = responses.setdefault(table_name, [])
+            for key in request['Keys']:
+                item = self.store.get(key['puuid'], key['dataType'])
+                if item is not None:
+                    found.append({'dataType': item['dataType']})
+        return {'Responses': responses, 'UnprocessedKeys': {}}
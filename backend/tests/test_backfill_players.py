@@ -0,0 +1,56 @@
+"""
+Backfill checkpoint status for a processed player
+- Only a run whose every step succeeded is recorded as done; a failed save/DynamoDB/MongoDB
+  step leaves the player failed, so the next run retries it
+"""
+
+import pytest
+
+from backfill_players import DONE, FAILED, Backfill, BackfillState
+
+
+class FakeService:
+    """process_player stand-in returning a fixed result"""
+
+    def __init__(self, steps):
+        self.steps = steps
+
+    async def process_player(self, game_name, tag_line, on_persisted=None, **options):
+        return {
+            'success': True,
+            'puuid': 'PUUID-1',
+            'steps': {'fetch': {'success': True, 'matches': 3, 'skipped': 0, 'failed': []}, **self.steps}
+        }
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+async def run_backfill(tmp_path, steps):
+    state = BackfillState(tmp_path / 'state.json')
+    state.add('Sneaky#NA1')
+    backfill = Backfill(FakeService(steps), state, options={}, concurrency=1, max_attempts=3)
+    await backfill.run(interval=60)
+    return backfill, state.players['sneaky#na1']
+
+
+@pytest.mark.anyio
+async def test_player_is_done_when_every_step_succeeded(tmp_path):
+    backfill, entry = await run_backfill(tmp_path, {'dynamodb': {'success': True}, 'mongodb': {'success': True}})
+
+    assert entry['status'] == DONE
+    assert entry['error'] is None
+    assert backfill.runnable() == []
+
+
+@pytest.mark.anyio
+async def test_failed_sink_step_is_retried(tmp_path):
+    backfill, entry = await run_backfill(tmp_path, {'dynamodb': {'success': False}, 'mongodb': {'success': True}})
+
+    assert entry['status'] == FAILED
+    assert entry['steps'] == {'fetch': True, 'dynamodb': False, 'mongodb': True}
+    assert 'dynamodb' in entry['error']
+    # Still under --max-attempts: the next run picks the player up again
+    assert backfill.runnable() == ['sneaky#na1']
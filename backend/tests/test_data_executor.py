@@ -0,0 +1,96 @@
+"""
+Async routes must not hold the event loop while blocking I/O runs
+- The DynamoDB/MongoDB work behind /api/analytics/habits and /api/player/match is replaced
+  by time.sleep(DELAY), the way a slow boto3 page or pymongo call blocks a thread
+- N concurrent requests must finish in about one DELAY (overlapping on the data executor),
+  not N * DELAY (serialized on the event loop)
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import api.analytics_api as analytics_api
+import api.player_api as player_api
+
+DELAY = 0.3
+CONCURRENT_REQUESTS = 5
+
+
+class SlowRepository:
+    """Stands in for MatchRepository: a blocking GetItem that takes DELAY seconds"""
+
+    def get_match(self, puuid, match_id):
+        time.sleep(DELAY)
+        return {'puuid': puuid, 'dataType': f'match#{match_id}', 'data': {'metadata': {'matchId': match_id}}}
+
+
+def slow_detect_habits(self, puuid, time_range=None, rank="GOLD"):
+    time.sleep(DELAY)
+    return {'success': True, 'puuid': puuid, 'good_habits': [], 'bad_habits': []}
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(analytics_api.HabitsDetector, 'detect_habits', slow_detect_habits)
+    monkeypatch.setattr(player_api, 'get_match_repository', lambda: SlowRepository())
+
+    app = FastAPI()
+    app.include_router(player_api.router)
+    app.include_router(analytics_api.router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+
+async def timed_gather(requests):
+    started = time.perf_counter()
+    responses = await asyncio.gather(*requests)
+    return responses, time.perf_counter() - started
+
+
+@pytest.mark.anyio
+async def test_habits_requests_overlap(client):
+    async with client:
+        responses, elapsed = await timed_gather([
+            client.post('/api/analytics/habits', json={'puuid': f'player-{i}'})
+            for i in range(CONCURRENT_REQUESTS)
+        ])
+
+    assert [r.status_code for r in responses] == [200] * CONCURRENT_REQUESTS
+    assert [r.json()['puuid'] for r in responses] == [f'player-{i}' for i in range(CONCURRENT_REQUESTS)]
+    # Serialized on the event loop this would take CONCURRENT_REQUESTS * DELAY (1.5s)
+    assert elapsed < DELAY * 2
+
+
+@pytest.mark.anyio
+async def test_match_requests_overlap(client):
+    async with client:
+        responses, elapsed = await timed_gather([
+            client.get(f'/api/player/match/player-{i}/NA1_{i}')
+            for i in range(CONCURRENT_REQUESTS)
+        ])
+
+    assert [r.status_code for r in responses] == [200] * CONCURRENT_REQUESTS
+    assert [r.json()['matchId'] for r in responses] == [f'NA1_{i}' for i in range(CONCURRENT_REQUESTS)]
+    assert elapsed < DELAY * 2
+
+
+@pytest.mark.anyio
+async def test_mixed_routes_overlap(client):
+    async with client:
+        responses, elapsed = await timed_gather([
+            client.post('/api/analytics/habits', json={'puuid': 'player-habits'}),
+            client.get('/api/player/match/player-match/NA1_1'),
+            client.post('/api/analytics/habits', json={'puuid': 'player-habits-2'}),
+            client.get('/api/player/match/player-match/NA1_2')
+        ])
+
+    assert all(r.status_code == 200 for r in responses)
+    assert elapsed < DELAY * 2
@@ -0,0 +1,58 @@
+"""
+Shared DynamoDB codecs
+- Riot JSON decodes straight to Decimal, and Decimal encodes back to int/float
+- Low-level items deserialize to native int/float; compressed payloads round-trip through PayloadItem
+"""
+
+import json
+from decimal import Decimal
+
+import pytest
+
+from services.dynamo_codec import (
+    FORMAT_ATTRIBUTE, PAYLOAD_ATTRIBUTE, PayloadItem, deserialize_item, json_default, loads_for_dynamo, pack_payload
+)
+
+from fake_dynamodb import to_low_level
+
+RIOT_JSON = '{"info": {"gameDuration": 1800, "challenges": {"kda": 3.25, "damagePerMinute": 812.5}, "win": true}}'
+
+
+def test_riot_json_decodes_to_decimal_and_back():
+    data = loads_for_dynamo(RIOT_JSON)
+
+    assert data['info']['challenges']['kda'] == Decimal('3.25')
+    assert data['info']['gameDuration'] == 1800
+    assert json.loads(json.dumps(data, default=json_default)) == json.loads(RIOT_JSON)
+    assert json_default(Decimal('4')) == 4 and isinstance(json_default(Decimal('4')), int)
+    with pytest.raises(TypeError):
+        json_default(object())
+
+
+def test_items_deserialize_to_native_numbers():
+    item = deserialize_item(to_low_level({'puuid': 'P1', 'data': loads_for_dynamo(RIOT_JSON), 'tags': ['a', None]}))
+
+    info = item['data']['info']
+    assert info['gameDuration'] == 1800 and isinstance(info['gameDuration'], int)
+    assert info['challenges']['kda'] == 3.25 and isinstance(info['challenges']['kda'], float)
+    assert info['win'] is True
+    assert item['tags'] == ['a', None]
+    assert type(item) is dict
+
+
+@pytest.mark.parametrize('codec', ['gzip', 'zstd'])
+def test_compressed_payload_is_decoded_on_first_access(codec):
+    if codec == 'zstd':
+        pytest.importorskip('zstandard')
+    item = {'puuid': 'P1', 'dataType': 'match#NA1_1', 'data': loads_for_dynamo(RIOT_JSON)}
+
+    packed = pack_payload(item, codec)
+    assert 'data' not in packed and packed[FORMAT_ATTRIBUTE] == f'json+{codec}'
+
+    loaded = deserialize_item(to_low_level(packed))
+    assert isinstance(loaded, PayloadItem)
+    assert 'data' in loaded and loaded.get('dataType') == 'match#NA1_1'
+    assert loaded['data']['info']['challenges']['kda'] == 3.25
+    # Decoded once: the blob is replaced by the parsed payload
+    assert PAYLOAD_ATTRIBUTE not in dict(loaded) and FORMAT_ATTRIBUTE not in dict(loaded)
+    assert pack_payload(item, 'map') is item
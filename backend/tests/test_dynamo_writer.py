@@ -0,0 +1,115 @@
+"""
+DynamoBatchWriter against the FakeDynamoDB resource
+- Items are packed into 25-item batches, duplicate keys collapse (last wins)
+- UnprocessedItems are retried; items still unprocessed after max_retries, or in a batch whose
+  request raised, are reported under failed with their keys
+"""
+
+import pytest
+
+from services.dynamo_writer import DynamoBatchWriter, WriteCapacityBudget, estimate_write_units
+
+from fake_dynamodb import FakeDynamoDB
+
+TABLE = 'lol-player-data'
+
+
+def item(number: int, **extra) -> dict:
+    return {'puuid': 'PUUID-1', 'dataType': f'match#NA1_{number}', **extra}
+
+
+def make_writer(store: FakeDynamoDB, max_retries: int = 3) -> DynamoBatchWriter:
+    return DynamoBatchWriter(store.resource(), TABLE, max_workers=2, max_retries=max_retries, budget=WriteCapacityBudget(0))
+
+
+def test_items_are_written_in_batches_of_25():
+    store = FakeDynamoDB()
+    writer = make_writer(store)
+    writer.put_many([item(number) for number in range(60)])
+    writer.put(item(0, note='rewritten'))
+
+    report = writer.close()
+
+    assert report['batches'] == 3 and report['failed'] == []
+    assert len(store.data_types('PUUID-1')) == 60
+    assert store.calls['batch_write_item'] == 3
+
+
+def test_duplicate_keys_in_one_batch_collapse_to_the_last_put():
+    store = FakeDynamoDB()
+    writer = make_writer(store)
+    writer.put(item(1, note='first'))
+    writer.put(item(1, note='second'))
+
+    report = writer.close()
+
+    assert report['items'] == 1 and report['batches'] == 1
+    assert store.get('PUUID-1', 'match#NA1_1')['note'] == 'second'
+
+
+def test_unprocessed_items_are_retried():
+    store = FakeDynamoDB()
+    rejected = set()
+
+    def reject_once(put):
+        # Throttle every other item on its first attempt
+        number = int(put['dataType'].split('_')[-1])
+        if number % 2 or put['dataType'] in rejected:
+            return False
+        rejected.add(put['dataType'])
+        return True
+
+    store.reject_write = reject_once
+    writer = make_writer(store)
+    writer.put_many([item(number) for number in range(10)])
+
+    report = writer.close()
+
+    assert report['failed'] == [] and report['items'] == 10
+    assert report['unprocessedRetries'] == 1
+    assert store.calls['batch_write_item'] == 2
+    assert len(store.data_types('PUUID-1')) == 10
+
+
+def test_items_still_unprocessed_after_max_retries_are_reported():
+    store = FakeDynamoDB()
+    store.reject_write = lambda put: put['dataType'] in ('match#NA1_3', 'match#NA1_7')
+    writer = make_writer(store, max_retries=2)
+    writer.put_many([item(number) for number in range(10)])
+
+    report = writer.close()
+
+    assert sorted(failure['key']['dataType'] for failure in report['failed']) == ['match#NA1_3', 'match#NA1_7']
+    assert all(failure['key']['puuid'] == 'PUUID-1' and 'unprocessed' in failure['error'] for failure in report['failed'])
+    assert report['items'] == 8 and report['unprocessedRetries'] == 2
+    assert store.calls['batch_write_item'] == 3
+
+
+def test_a_failing_request_reports_the_whole_batch():
+    store = FakeDynamoDB()
+    resource = store.resource()
+
+    def broken(**_):
+        raise RuntimeError('ValidationException')
+
+    resource.meta.client.batch_write_item = broken
+    writer = DynamoBatchWriter(resource, TABLE, max_workers=1, max_retries=0, budget=WriteCapacityBudget(0))
+    writer.put_many([item(number) for number in range(3)])
+
+    report = writer.close()
+
+    assert report['items'] == 0 and report['batches'] == 1
+    assert [failure['key']['dataType'] for failure in report['failed']] == [f'match#NA1_{n}' for n in range(3)]
+    assert report['failed'][0]['error'] == 'ValidationException'
+
+
+def test_budget_settles_reserved_units_against_consumed_capacity():
+    budget = WriteCapacityBudget(10)
+    budget.acquire(8)
+    assert budget.tokens == pytest.approx(2, abs=0.1)
+    # The batch consumed 3 of the 8 units it reserved
+    budget.settle(8, 3)
+    assert budget.tokens == pytest.approx(7, abs=0.1)
+
+    assert estimate_write_units(item(1)) == 1
+    assert estimate_write_units(item(1, blob=b'x' * 3000)) == 3
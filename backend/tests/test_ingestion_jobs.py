@@ -0,0 +1,91 @@
+"""
+Coalescing of ingestion jobs in IngestionJobManager
+- A second request for the same Riot ID and options joins the queued/running job
+- Different options (matchCount, fullSeason, ...) start their own job and get their own result
+"""
+
+import asyncio
+
+import pytest
+
+from services.ingestion_jobs import IngestionJobManager, JobStatus
+
+
+class BlockingRunner:
+    """process_player stand-in that waits for `release` and echoes its options"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = []
+
+    async def __call__(self, game_name, tag_line, progress=None, **options):
+        self.calls.append(options)
+        await self.release.wait()
+        return {'success': True, 'puuid': 'PUUID-1', 'options': options}
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_identical_requests_share_one_job():
+    runner = BlockingRunner()
+    manager = IngestionJobManager(runner, max_concurrent=2)
+
+    first, created = manager.submit('Sneaky', 'NA1', match_count=10, full_season=False)
+    second, joined_created = manager.submit('sneaky ', 'na1', match_count=10, full_season=False)
+
+    assert created and not joined_created
+    assert second is first and first.coalesced == 1
+
+    runner.release.set()
+    await first.task
+    assert len(runner.calls) == 1
+    assert first.status == JobStatus.SUCCEEDED
+
+
+@pytest.mark.anyio
+async def test_different_options_get_their_own_job():
+    runner = BlockingRunner()
+    manager = IngestionJobManager(runner, max_concurrent=2)
+
+    recent, _ = manager.submit('Sneaky', 'NA1', match_count=10, full_season=False)
+    season, created = manager.submit('Sneaky', 'NA1', match_count=10, full_season=True)
+
+    assert created and season is not recent
+    assert recent.coalesced == 0
+
+    runner.release.set()
+    await asyncio.gather(recent.task, season.task)
+    assert recent.result['options']['full_season'] is False
+    assert season.result['options']['full_season'] is True
+    assert season.snapshot()['options'] == {'match_count': 10, 'full_season': True}
+
+
+@pytest.mark.anyio
+async def test_unset_options_match_omitted_ones():
+    runner = BlockingRunner()
+    manager = IngestionJobManager(runner, max_concurrent=2)
+
+    first, _ = manager.submit('Sneaky', 'NA1', match_count=10, concurrency=None)
+    second, created = manager.submit('Sneaky', 'NA1', match_count=10)
+
+    assert not created and second is first
+    runner.release.set()
+    await first.task
+
+
+@pytest.mark.anyio
+async def test_finished_job_is_not_joined():
+    runner = BlockingRunner()
+    runner.release.set()
+    manager = IngestionJobManager(runner, max_concurrent=2)
+
+    first, _ = manager.submit('Sneaky', 'NA1', match_count=10)
+    await first.task
+    second, created = manager.submit('Sneaky', 'NA1', match_count=10)
+
+    assert created and second is not first
+    await second.task
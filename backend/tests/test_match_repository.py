@@ -0,0 +1,122 @@
+"""
+MatchRepository's per-player match list cache
+- A list is reused while the player's version item is unchanged; a version bump (here or by
+  another process) makes the next read go back to DynamoDB
+- Callers get copies: mutating yielded items never changes what later reads see
+- Entries are weighed by the stored size of their Query pages
+"""
+
+import pytest
+
+from services.dynamo_codec import item_size
+from services.match_repository import MatchRepository
+from services.player_match_cache import PlayerMatchCache
+
+from fake_dynamodb import FakeDynamoDB, to_low_level
+
+PUUID = 'PUUID-1'
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def store():
+    fake = FakeDynamoDB(page_size=2)
+    for number in range(1, 4):
+        fake.put({
+            'puuid': PUUID,
+            'dataType': f'match#NA1_{number}',
+            'matchId': f'NA1_{number}',
+            'data': {'info': {'gameCreation': number * 1000, 'participants': [{'puuid': PUUID, 'kills': number}]}}
+        })
+    return fake
+
+
+def make_repository(store, max_bytes=1024 * 1024):
+    return MatchRepository(client=store, max_workers=2, cache=PlayerMatchCache(max_bytes))
+
+
+def read(repository, **kwargs):
+    return [item['matchId'] for item in repository.matches(PUUID, summaries=False, **kwargs)]
+
+
+def test_cached_list_is_reused_until_the_version_changes(store):
+    repository = make_repository(store)
+    repository.bump_version(PUUID)
+
+    assert read(repository) == ['NA1_1', 'NA1_2', 'NA1_3']
+    queries = store.calls['query']
+    assert read(repository) == ['NA1_1', 'NA1_2', 'NA1_3']
+    assert store.calls['query'] == queries
+    assert repository.cache.hits == 1
+
+    # Another process ingests a match and bumps the version behind this cache's back
+    store.put({'puuid': PUUID, 'dataType': 'match#NA1_4', 'matchId': 'NA1_4', 'data': {'info': {}}})
+    MatchRepository(client=store, max_workers=1).bump_version(PUUID)
+
+    assert read(repository) == ['NA1_1', 'NA1_2', 'NA1_3', 'NA1_4']
+    assert store.calls['query'] > queries
+    assert repository.cache.stale == 1
+
+
+def test_players_without_a_version_are_never_cached(store):
+    repository = make_repository(store)
+
+    read(repository)
+    read(repository)
+
+    assert repository.cache.stats()['entries'] == 0
+
+
+def test_mutating_yielded_items_does_not_change_the_cache(store):
+    repository = make_repository(store)
+    repository.bump_version(PUUID)
+
+    for item in repository.matches(PUUID, summaries=False):
+        item['data']['info']['participants'][0]['kills'] = -1
+        item['matchId'] = 'poisoned'
+    for item in repository.matches(PUUID, summaries=False):
+        item['data']['info']['participants'].clear()
+
+    items = list(repository.matches(PUUID, summaries=False))
+    assert repository.cache.hits == 2
+    assert [item['matchId'] for item in items] == ['NA1_1', 'NA1_2', 'NA1_3']
+    assert [item['data']['info']['participants'][0]['kills'] for item in items] == [1, 2, 3]
+
+
+@pytest.mark.anyio
+async def test_async_reads_hand_out_copies_too(store):
+    repository = make_repository(store)
+    repository.bump_version(PUUID)
+
+    async for item in repository.amatches(PUUID, summaries=False):
+        item['data']['info']['gameCreation'] = 0
+    async for item in repository.amatches(PUUID, summaries=False):
+        item['data']['info']['gameCreation'] = 0
+
+    items = [item async for item in repository.amatches(PUUID, summaries=False)]
+    assert repository.cache.hits == 2
+    assert [item['data']['info']['gameCreation'] for item in items] == [1000, 2000, 3000]
+
+
+def test_entries_are_weighed_by_their_query_pages(store):
+    repository = make_repository(store)
+    repository.bump_version(PUUID)
+    read(repository)
+
+    expected = sum(item_size(store.items[(PUUID, f'match#NA1_{number}')]) for number in range(1, 4))
+    assert repository.cache.stats()['bytes'] == expected
+
+    # A budget below one list's size: the list is read normally but not cached
+    small = make_repository(store, max_bytes=expected - 1)
+    assert read(small) == ['NA1_1', 'NA1_2', 'NA1_3']
+    assert small.cache.stats()['entries'] == 0
+
+
+def test_item_size_follows_dynamodb_rules():
+    item = to_low_level({'puuid': 'abc', 'n': 12345, 'm': {'k': 'vv'}, 'l': [True]})
+    # Name + value: 'abc' / 5 digits (one byte per two, plus one) / 3 + 'k' + 'vv' / 3 + (true + 1)
+    assert item_size(item) == (5 + 3) + (1 + 3) + (1 + 3 + 1 + 2) + (1 + 3 + 1 + 1)
@@ -0,0 +1,120 @@
+"""
+A summary#<id> item lost during ingestion must not be lost for summary readers
+- Ingestion writes match#<id> and summary#<id> through DynamoBatchWriter into a FakeDynamoDB
+- A rejected summary put clears the player's summariesComplete mark in the version bump, so
+  readers fall back to the full match items and complete_match_summaries rewrites the summary
+"""
+
+import pytest
+
+import services.match_repository as match_repository
+import services.match_summaries as match_summaries
+from services.dynamo_writer import DynamoBatchWriter, WriteCapacityBudget
+from services.match_repository import MatchRepository
+from services.match_summaries import build_summary_item
+from services.player_data_service import PlayerDataService
+
+from fake_dynamodb import FakeDynamoDB
+
+PUUID = 'PUUID-1'
+UPLOADED_AT = '2026-01-01T00:00:00'
+
+
+def riot_match(match_id: str, game_creation: int) -> dict:
+    return {
+        'metadata': {'matchId': match_id},
+        'info': {
+            'gameCreation': game_creation,
+            'queueId': 420,
+            'participants': [
+                {'puuid': PUUID, 'championName': 'Ahri', 'teamPosition': 'MIDDLE', 'win': True},
+                {'puuid': 'OTHER', 'championName': 'Zed', 'teamPosition': 'MIDDLE', 'win': False}
+            ]
+        }
+    }
+
+
+def ingest(store: FakeDynamoDB, *matches) -> dict:
+    """Write match and summary items the way PlayerDataService.match_items does"""
+    writer = DynamoBatchWriter(store.resource(), 'lol-player-data', max_retries=1, budget=WriteCapacityBudget(0))
+    for match in matches:
+        match_id = match['metadata']['matchId']
+        writer.put({'puuid': PUUID, 'dataType': f'match#{match_id}', 'matchId': match_id, 'data': match, 'uploadedAt': UPLOADED_AT})
+        writer.put(build_summary_item(PUUID, match, UPLOADED_AT))
+    return writer.close()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A FakeDynamoDB behind the shared client, resource and repository"""
+    fake = FakeDynamoDB()
+    # Rejected puts give up after one quick retry
+    monkeypatch.setenv('DYNAMO_WRITE_MAX_RETRIES', '1')
+    repository = MatchRepository(client=fake, max_workers=2)
+    monkeypatch.setattr(match_summaries, 'get_dynamodb_client', lambda: fake)
+    monkeypatch.setattr(match_summaries, 'get_dynamodb_resource', fake.resource)
+    monkeypatch.setattr(match_repository, 'get_match_repository', lambda: repository)
+    monkeypatch.setattr('services.player_data_service.get_match_repository', lambda: repository)
+    fake.repository = repository
+    return fake
+
+
+@pytest.fixture
+def service():
+    # Only the DynamoDB bookkeeping methods are used; skip the Riot/Mongo setup
+    return PlayerDataService.__new__(PlayerDataService)
+
+
+def read_match_ids(repository: MatchRepository):
+    return [item['data']['metadata']['matchId'] for item in repository.matches(PUUID)]
+
+
+def test_complete_player_summaries_marks_the_player_complete(store, service):
+    ingest(store, riot_match('NA1_1', 1000))
+    service.bump_data_version(PUUID, False)
+    service.complete_match_summaries(PUUID)
+
+    assert store.repository.player_state(PUUID) == {'version': 2, 'summariesComplete': True}
+    # Already complete: a single GetItem of the version item
+    calls = dict(store.calls)
+    service.complete_match_summaries(PUUID)
+    assert store.calls['get_item'] == calls['get_item'] + 1
+    assert store.calls.get('query') == calls.get('query')
+
+
+def test_failed_summary_write_clears_the_mark_and_is_rewritten(store, service):
+    ingest(store, riot_match('NA1_1', 1000))
+    service.bump_data_version(PUUID, False)
+    service.complete_match_summaries(PUUID)
+    assert store.repository.player_state(PUUID)['summariesComplete']
+
+    # The next refresh stores match#NA1_2 but loses summary#NA1_2
+    store.reject_write = lambda item: item['dataType'] == 'summary#NA1_2'
+    report = ingest(store, riot_match('NA1_2', 2000))
+    assert [failure['key']['dataType'] for failure in report['failed']] == ['summary#NA1_2']
+    assert PlayerDataService.lost_summaries(report)
+
+    service.bump_data_version(PUUID, PlayerDataService.lost_summaries(report))
+    assert store.repository.player_state(PUUID)['summariesComplete'] is False
+    # Readers get the full match items meanwhile, so NA1_2 is not missing
+    assert read_match_ids(store.repository) == ['NA1_1', 'NA1_2']
+
+    store.reject_write = None
+    service.complete_match_summaries(PUUID)
+
+    assert 'summary#NA1_2' in store.data_types(PUUID)
+    assert store.repository.player_state(PUUID)['summariesComplete']
+    summaries = list(store.repository.matches(PUUID))
+    assert [item['matchId'] for item in summaries] == ['NA1_1', 'NA1_2']
+
+
+def test_mark_stays_cleared_while_the_summary_keeps_failing(store, service):
+    store.reject_write = lambda item: item['dataType'].startswith('summary#')
+    service.bump_data_version(PUUID, PlayerDataService.lost_summaries(ingest(store, riot_match('NA1_1', 1000))))
+
+    report = match_summaries.complete_player_summaries(PUUID)
+
+    assert report['complete'] is False
+    assert [failure['key'] for failure in report['failed']] == ['summary#NA1_1']
+    assert store.repository.player_state(PUUID)['summariesComplete'] is False
+    assert read_match_ids(store.repository) == ['NA1_1']
@@ -0,0 +1,71 @@
+"""
+PlayerArchiveWriter generations
+- Records a run did not rewrite are carried over from the previous bundle
+- abort() leaves the published generation untouched
+- The previous bundle survives one swap, so a reader holding the old index can still read it
+"""
+
+import pytest
+
+from services.player_archive import PlayerArchive, PlayerArchiveWriter
+
+
+def match(match_id: str, game_creation: int) -> dict:
+    return {'metadata': {'matchId': match_id}, 'info': {'gameCreation': game_creation, 'queueId': 420}}
+
+
+def publish(player_dir, *matches, profile=None):
+    writer = PlayerArchiveWriter(player_dir, codec='gzip')
+    for index, item in enumerate(matches, start=1):
+        writer.add_match(index, item)
+    if profile is not None:
+        writer.add_profile('account', profile)
+    return writer.close({'puuid': 'PUUID-1'})
+
+
+def bundles(player_dir):
+    return sorted(path.name for path in player_dir.glob('bundle-*'))
+
+
+def test_untouched_records_are_carried_over(tmp_path):
+    publish(tmp_path, match('NA1_1', 1000), match('NA1_2', 2000), profile={'gameName': 'Old'})
+
+    report = publish(tmp_path, match('NA1_3', 3000), profile={'gameName': 'New'})
+
+    assert report['carried'] == 2
+    archive = PlayerArchive(tmp_path)
+    assert archive.match_ids() == ['NA1_3', 'NA1_2', 'NA1_1']
+    assert archive.get('match', 'NA1_1') == match('NA1_1', 1000)
+    # The rewritten record wins over the carried one
+    assert archive.get('profile', 'account') == {'gameName': 'New'}
+    assert archive.index['player'] == {'puuid': 'PUUID-1'}
+
+
+def test_abort_keeps_the_published_generation(tmp_path):
+    publish(tmp_path, match('NA1_1', 1000))
+    published = bundles(tmp_path)
+
+    writer = PlayerArchiveWriter(tmp_path, codec='gzip')
+    writer.add_match(1, match('NA1_2', 2000))
+    writer.abort()
+
+    assert bundles(tmp_path) == published
+    assert PlayerArchive(tmp_path).match_ids() == ['NA1_1']
+    with pytest.raises(RuntimeError):
+        writer.add_match(2, match('NA1_3', 3000))
+
+
+def test_previous_bundle_outlives_one_swap(tmp_path):
+    publish(tmp_path, match('NA1_1', 1000))
+    reader = PlayerArchive(tmp_path)
+
+    publish(tmp_path, match('NA1_2', 2000))
+    # The reader still has the first index and its bundle
+    assert reader.get('match', 'NA1_1') == match('NA1_1', 1000)
+    assert len(bundles(tmp_path)) == 2
+
+    publish(tmp_path, match('NA1_3', 3000))
+    current = PlayerArchive(tmp_path)
+    assert len(bundles(tmp_path)) == 2
+    assert reader.bundle_path.name not in bundles(tmp_path)
+    assert current.match_ids() == ['NA1_3', 'NA1_2', 'NA1_1']
@@ -0,0 +1,103 @@
+"""
+Player name lookups without table Scans on the request path
+- find_player answers from the in-memory index, then one GetItem of the name item; a miss is a miss
+- backfill_missing_player_names writes name items for stored accounts once, then leaves a marker
+"""
+
+import threading
+
+import pytest
+
+import services.dynamo_codec as dynamo_codec
+import services.player_index as player_index
+from services.match_repository import MatchRepository
+from services.player_index import BACKFILL_MARKER, NAMES_PARTITION, backfill_missing_player_names, find_player, name_item
+
+from fake_dynamodb import FakeDynamoDB
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A FakeDynamoDB behind the shared client, resource and repository, and a fresh index"""
+    fake = FakeDynamoDB(page_size=2)
+    monkeypatch.setattr(dynamo_codec, 'get_dynamodb_client', lambda: fake)
+    monkeypatch.setattr(player_index, 'get_dynamodb_client', lambda: fake)
+    monkeypatch.setattr(player_index, 'get_dynamodb_resource', fake.resource)
+    monkeypatch.setattr(player_index, 'get_match_repository', lambda: MatchRepository(client=fake, max_workers=2))
+    monkeypatch.setattr(player_index, '_player_index', None)
+    return fake
+
+
+def add_account(store: FakeDynamoDB, puuid: str, player_name: str):
+    store.put({'puuid': puuid, 'dataType': 'account', 'playerName': player_name, 'uploadedAt': '2026-01-01T00:00:00'})
+    store.put({'puuid': puuid, 'dataType': 'match#NA1_1', 'matchId': 'NA1_1'})
+
+
+def test_find_player_reads_the_name_item_and_never_scans(store):
+    store.put(name_item('P1', 'Sneaky#NA1', '2026-01-01T00:00:00'))
+    add_account(store, 'P2', 'Legacy#NA1')
+
+    assert find_player('sneaky#na1') == {'playerName': 'Sneaky#NA1', 'puuid': 'P1'}
+    # Indexed by the first hit: the second lookup is served from memory
+    calls = store.calls.get('get_item')
+    assert find_player('SNEAKY#NA1')['puuid'] == 'P1'
+    assert store.calls.get('get_item') == calls
+
+    # Stored before name items existed and not backfilled yet: not found, and no Scan
+    assert find_player('Legacy#NA1') is None
+    assert 'scan' not in store.calls
+
+
+def test_startup_backfill_writes_names_then_the_marker(store):
+    add_account(store, 'P1', 'Sneaky#NA1')
+    add_account(store, 'P2', 'Doublelift#NA1')
+    add_account(store, 'P3', 'Bjergsen#NA1')
+
+    report = backfill_missing_player_names()
+
+    assert report['written'] == 3
+    assert report['failed'] == [] and report['stopped'] is False
+    assert store.get(NAMES_PARTITION, BACKFILL_MARKER) is not None
+    assert store.get(NAMES_PARTITION, 'name#doublelift#na1')['playerPuuid'] == 'P2'
+    # The index was reloaded from the new name items
+    assert [player['puuid'] for player in player_index.get_player_index().complete('s')] == ['P1']
+    assert find_player('bjergsen#na1')['puuid'] == 'P3'
+
+    # The marker makes later startups a single GetItem
+    scans = store.calls['scan']
+    assert backfill_missing_player_names() is None
+    assert store.calls['scan'] == scans
+
+
+def test_stopped_backfill_leaves_no_marker(store):
+    add_account(store, 'P1', 'Sneaky#NA1')
+
+    stop = threading.Event()
+    stop.set()
+
+    report = backfill_missing_player_names(stop=stop)
+
+    assert report['stopped'] is True
+    assert store.get(NAMES_PARTITION, BACKFILL_MARKER) is None
+
+
+def test_prefix_lookup_is_case_insensitive_ordered_and_limited(store):
+    for puuid, player_name in [('P1', 'Faker#KR1'), ('P2', 'faker fan#NA1'), ('P3', 'Fakest#EUW'), ('P4', 'Caps#EUW')]:
+        store.put(name_item(puuid, player_name, '2026-01-01T00:00:00'))
+    index = player_index.PlayerNameIndex(refresh_seconds=300)
+    index.ensure_fresh()
+
+    # Loaded over several Query pages (page_size=2)
+    assert index.stats()['players'] == 4
+    assert [player['playerName'] for player in index.complete('FAKE')] == ['faker fan#NA1', 'Faker#KR1', 'Fakest#EUW']
+    assert [player['puuid'] for player in index.complete('faker#')] == ['P1']
+    assert [player['puuid'] for player in index.complete('fake', limit=2)] == ['P2', 'P1']
+    assert index.complete('zed') == [] and index.complete('  ') == []
+
+    # Ingestion adds names without a reload; a fresh index is not reloaded
+    index.add('Fakeout#NA1', 'P5')
+    queries = store.calls['query']
+    index.ensure_fresh()
+    assert store.calls['query'] == queries
+    assert [player['puuid'] for player in index.complete('fakeo')] == ['P5']
+    assert index.lookup('FAKEOUT#na1') == {'playerName': 'Fakeout#NA1', 'puuid': 'P5'}
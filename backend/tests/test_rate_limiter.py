@@ -0,0 +1,124 @@
+"""
+Token-bucket scheduling in RiotRateLimiter
+- TokenBucket and RateLimitScope arithmetic with explicit clock values
+- acquire(): interactive requests take any token, backfill leaves the reserve and yields to queued interactive requests
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.rate_limiter import RateLimitScope, RequestPriority, RiotRateLimiter, TokenBucket, parse_rate_limit_header
+
+HOST = 'americas'
+METHOD = 'match-v5.getMatch'
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def test_parse_rate_limit_header_skips_malformed_parts():
+    assert parse_rate_limit_header('20:1,100:120') == [(20, 1), (100, 120)]
+    assert parse_rate_limit_header('20:1,bogus,5') == [(20, 1)]
+    assert parse_rate_limit_header(None) == []
+
+
+def test_token_bucket_refills_evenly_and_caps_at_the_limit():
+    bucket = TokenBucket(limit=10, window=10)
+    now = bucket.updated
+    for _ in range(10):
+        assert bucket.wait_time(now) == 0
+        bucket.consume()
+    assert bucket.wait_time(now) == pytest.approx(1.0)
+    assert bucket.wait_time(now + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(now + 1) == 0
+    # A long idle period never fills past the limit
+    bucket.wait_time(now + 1000)
+    assert bucket.tokens == 10
+
+
+def test_reserve_wait_keeps_part_of_the_bucket():
+    bucket = TokenBucket(limit=10, window=10)
+    now = bucket.updated
+    # With 3 of 10 tokens reserved, 7 may be taken immediately
+    for _ in range(7):
+        assert bucket.reserve_wait_time(now, 0.3) == 0
+        bucket.consume()
+    assert bucket.reserve_wait_time(now, 0.3) == pytest.approx(1.0)
+    # Interactive traffic can still use the reserve
+    assert bucket.wait_time(now) == 0
+
+
+def test_scope_waits_for_its_slowest_bucket_and_keeps_unchanged_windows():
+    scope = RateLimitScope([(2, 1), (3, 10)])
+    now = time.monotonic()
+    for _ in range(2):
+        scope.consume()
+    assert scope.wait_time(now) == pytest.approx(0.5, abs=0.01)
+    scope.consume()
+    # The 10s window is empty now: 1 token every 10/3 seconds
+    assert scope.wait_time(now) == pytest.approx(10 / 3, abs=0.01)
+
+    fast = scope.buckets[1]
+    scope.set_limits([(2, 1), (50, 10)])
+    assert scope.buckets[1] is fast
+    assert scope.buckets[10].limit == 50
+
+    scope.sync_counts([(48, 10)], now)
+    assert scope.buckets[10].tokens <= 2
+    scope.blocked_until = now + 5
+    assert scope.wait_time(now) >= 5
+
+
+@pytest.mark.anyio
+async def test_backfill_leaves_the_reserve_for_interactive_requests():
+    limiter = RiotRateLimiter(default_app_limit='4:60', backfill_reserve=0.5)
+
+    # Backfill may take 2 of 4 tokens, the rest of the window is reserved
+    for _ in range(2):
+        await asyncio.wait_for(limiter.acquire(HOST, METHOD, RequestPriority.BACKFILL), timeout=0.5)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.acquire(HOST, METHOD, RequestPriority.BACKFILL), timeout=0.2)
+
+    for _ in range(2):
+        await asyncio.wait_for(limiter.acquire(HOST, METHOD), timeout=0.5)
+
+    stats = limiter.stats()
+    assert stats['backfill']['acquired'] == 2 and stats['interactive']['acquired'] == 2
+    # The cancelled backfill request left the queue
+    assert stats['backfill']['queueDepth'] == 0
+
+
+@pytest.mark.anyio
+async def test_backfill_yields_to_queued_interactive_requests():
+    limiter = RiotRateLimiter(default_app_limit='10:1', backfill_reserve=0)
+    limiter.penalize(HOST, METHOD, {'Retry-After': '0.2', 'X-Rate-Limit-Type': 'application'})
+    order = []
+
+    async def request(priority):
+        await limiter.acquire(HOST, METHOD, priority)
+        order.append(priority)
+
+    # Both wait out the 429; the backfill request was queued first but goes second
+    backfill = asyncio.create_task(request(RequestPriority.BACKFILL))
+    await asyncio.sleep(0.01)
+    interactive = asyncio.create_task(request(RequestPriority.INTERACTIVE))
+    await asyncio.wait_for(asyncio.gather(backfill, interactive), timeout=2)
+
+    assert order == [RequestPriority.INTERACTIVE, RequestPriority.BACKFILL]
+
+
+def test_method_limits_are_learned_from_headers():
+    limiter = RiotRateLimiter(default_app_limit='100:1')
+    assert limiter.wait_time(HOST, METHOD) == 0
+
+    limiter.update_from_headers(HOST, METHOD, {
+        'X-Method-Rate-Limit': '5:10',
+        'X-Method-Rate-Limit-Count': '5:10'
+    })
+
+    assert limiter.wait_time(HOST, METHOD) == pytest.approx(2.0, abs=0.05)
+    assert limiter.wait_time(HOST, 'other-method') == 0
@@ -0,0 +1,164 @@
+"""
+ResponseCache freshness, stale-while-revalidate and ETag revalidation
+- The module clock is replaced, so entries age without sleeping
+- Fetchers are scripted: they record the ETag they were called with and return (value, etag)
+"""
+
+import asyncio
+
+import pytest
+
+import services.response_cache as response_cache
+from services.response_cache import NOT_MODIFIED, ResponseCache
+
+TTL = 60
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'t': 1000.0}
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now['t'])
+    return now
+
+
+def make_cache(max_entries=16):
+    cache = ResponseCache(max_entries=max_entries)
+    cache.ttls['mastery'] = TTL
+    cache.stale_ttls['mastery'] = TTL
+    return cache
+
+
+class Fetcher:
+    """Answers with the queued responses in order; a response may be an Event to wait on first"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.etags = []
+
+    async def __call__(self, etag):
+        self.etags.append(etag)
+        response = self.responses.pop(0)
+        if isinstance(response, tuple) and isinstance(response[0], asyncio.Event):
+            gate, response = response
+            await gate.wait()
+        return response
+
+
+async def settle():
+    """Let background revalidation tasks run to completion"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_fresh_entries_are_served_as_copies_without_fetching(clock):
+    cache = make_cache()
+    fetch = Fetcher(({'points': [1]}, 'v1'))
+
+    first = await cache.get('mastery', 'k', fetch)
+    first['points'].append(2)
+    clock['t'] += TTL - 1
+    second = await cache.get('mastery', 'k', fetch)
+
+    assert second == {'points': [1]}
+    assert fetch.etags == [None]
+    assert cache.stats()['hits'] == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_share_one_fetch(clock):
+    cache = make_cache()
+    gate = asyncio.Event()
+    fetch = Fetcher((gate, ('value', 'v1')))
+
+    waiters = [asyncio.create_task(cache.get('mastery', 'k', fetch)) for _ in range(3)]
+    await settle()
+    gate.set()
+
+    assert await asyncio.gather(*waiters) == ['value'] * 3
+    assert fetch.etags == [None]
+
+
+@pytest.mark.anyio
+async def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    cache = make_cache()
+    gate = asyncio.Event()
+    fetch = Fetcher(('old', 'v1'), (gate, ('new', 'v2')))
+    await cache.get('mastery', 'k', fetch)
+
+    clock['t'] += TTL + 1
+    # Both stale reads return immediately and start a single revalidation
+    assert await cache.get('mastery', 'k', fetch) == 'old'
+    assert await cache.get('mastery', 'k', fetch) == 'old'
+    assert cache.stats()['inflight'] == 1
+
+    gate.set()
+    await settle()
+    assert await cache.get('mastery', 'k', fetch) == 'new'
+    assert fetch.etags == [None, 'v1']
+    assert cache.stats()['staleHits'] == 2
+
+    # Past the stale window the caller waits for a fetch
+    clock['t'] += 2 * TTL + 1
+    fetch.responses.append(('newest', 'v3'))
+    assert await cache.get('mastery', 'k', fetch) == 'newest'
+
+
+@pytest.mark.anyio
+async def test_not_modified_keeps_the_value_and_restarts_the_ttl(clock):
+    cache = make_cache()
+    fetch = Fetcher(({'rank': 'GOLD'}, 'v1'), (NOT_MODIFIED, 'v1'))
+    await cache.get('mastery', 'k', fetch)
+
+    clock['t'] += TTL + 1
+    assert await cache.get('mastery', 'k', fetch) == {'rank': 'GOLD'}
+    await settle()
+
+    clock['t'] += TTL - 1
+    assert await cache.get('mastery', 'k', fetch) == {'rank': 'GOLD'}
+    assert fetch.etags == [None, 'v1']
+    assert cache.stats()['revalidated'] == 1
+    assert cache.stats()['hits'] == 1
+
+
+@pytest.mark.anyio
+async def test_entry_evicted_during_revalidation_is_fetched_in_full(clock):
+    cache = make_cache(max_entries=1)
+    gate = asyncio.Event()
+    fetch_a = Fetcher(('a1', 'va1'), (gate, (NOT_MODIFIED, 'va1')), ('a2', 'va2'))
+    await cache.get('mastery', 'a', fetch_a)
+
+    clock['t'] += TTL + 1
+    assert await cache.get('mastery', 'a', fetch_a) == 'a1'
+    # Another key pushes 'a' out while its 304 is still on the way
+    await cache.get('mastery', 'b', Fetcher(('b1', 'vb1')))
+    gate.set()
+    await settle()
+
+    # The 304 had nothing to refresh, so the body was fetched again without an ETag
+    assert fetch_a.etags == [None, 'va1', None]
+    assert await cache.get('mastery', 'a', fetch_a) == 'a2'
+    assert cache.stats()['entries'] == 1
+
+
+@pytest.mark.anyio
+async def test_failed_revalidation_keeps_serving_the_stale_value(clock):
+    cache = make_cache()
+
+    async def failing(etag):
+        raise RuntimeError('upstream down')
+
+    await cache.get('mastery', 'k', Fetcher(('old', 'v1')))
+    clock['t'] += TTL + 1
+
+    assert await cache.get('mastery', 'k', failing) == 'old'
+    await settle()
+    assert cache.stats()['inflight'] == 0
+    # The next stale read tries again
+    assert await cache.get('mastery', 'k', failing) == 'old'
+    await settle()
@@ -0,0 +1,171 @@
+"""
+Retry and circuit-breaker behavior of RiotAPIClient._send against a fake Riot host
+- The client is pointed at http://riot.test (base_urls override) served by an httpx.MockTransport
+- Each test gets its own rate limiter, breaker registry and a jitter-free retry policy
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from services.rate_limiter import RiotRateLimiter
+from services.resilience import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, RetryPolicy
+from services.riot_api import RiotAPIClient
+
+FAKE_HOST = 'http://riot.test'
+MATCH_IDS_PATH = '/lol/match/v5/matches/by-puuid/PUUID/ids'
+
+
+class RecordingRetryPolicy(RetryPolicy):
+    """Deterministic backoff (no jitter) that remembers every delay it handed out"""
+
+    def __init__(self, max_retries: int):
+        super().__init__(max_retries=max_retries, base_delay=0.01, max_delay=0.05)
+        self.delays = []
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        self.delays.append(delay)
+        return delay
+
+
+class FakeRiot:
+    """Serves the queued status codes in order, then 200s; counts requests that reached it"""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 429:
+            return httpx.Response(429, headers={'Retry-After': '0', 'X-Rate-Limit-Type': 'method'})
+        if status != 200:
+            return httpx.Response(status, json={'status': {'status_code': status}})
+        return httpx.Response(200, json=['NA1_1', 'NA1_2'])
+
+
+def make_client(fake: FakeRiot, max_retries: int = 0, failure_threshold: int = 3, reset_timeout: float = 0.2):
+    return RiotAPIClient(
+        'test-key',
+        rate_limiter=RiotRateLimiter(),
+        retry_policy=RecordingRetryPolicy(max_retries),
+        circuit_breakers=CircuitBreakerRegistry(failure_threshold=failure_threshold, reset_timeout=reset_timeout),
+        base_urls={'americas': FAKE_HOST},
+        transport=httpx.MockTransport(fake.handler),
+        max_rate_limit_retries=5
+    )
+
+
+async def send(client: RiotAPIClient) -> httpx.Response:
+    return await client._send(FAKE_HOST, MATCH_IDS_PATH, 'match-v5.getMatchIdsByPUUID')
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_503s_are_retried_with_backoff():
+    fake = FakeRiot([503, 503, 503])
+    # Every retried 503 counts toward the breaker, so keep the threshold above the retries
+    client = make_client(fake, max_retries=3, failure_threshold=5)
+
+    match_ids = await client.get_match_history('PUUID', region='americas', count=2)
+
+    assert match_ids == ['NA1_1', 'NA1_2']
+    assert fake.requests == 4
+    assert client.retry_policy.delays == [0.01, 0.02, 0.04]
+    # The final success resets the failure streak
+    breaker = client.circuit_breakers.get(FAKE_HOST)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_retries_give_up_after_max_retries():
+    fake = FakeRiot([503] * 10)
+    client = make_client(fake, max_retries=2, failure_threshold=10)
+
+    response = await send(client)
+
+    assert response.status_code == 503
+    assert fake.requests == 3
+    assert client.retry_policy.delays == [0.01, 0.02]
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_after_threshold_and_fails_fast():
+    fake = FakeRiot([503] * 10)
+    client = make_client(fake, failure_threshold=3)
+
+    for _ in range(3):
+        assert (await send(client)).status_code == 503
+    breaker = client.circuit_breakers.get(FAKE_HOST)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await send(client)
+    # Rejected without reaching the host
+    assert fake.requests == 3
+    assert breaker.rejected == 1
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_successful_half_open_probe_closes_the_breaker():
+    fake = FakeRiot([503] * 3)
+    client = make_client(fake, failure_threshold=3, reset_timeout=0.2)
+    for _ in range(3):
+        await send(client)
+    breaker = client.circuit_breakers.get(FAKE_HOST)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    await asyncio.sleep(0.25)
+    response = await send(client)
+
+    assert response.status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert fake.requests == 4
+    assert (await send(client)).status_code == 200
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_failed_half_open_probe_reopens_the_breaker():
+    fake = FakeRiot([503] * 4)
+    client = make_client(fake, failure_threshold=3, reset_timeout=0.2)
+    for _ in range(3):
+        await send(client)
+
+    await asyncio.sleep(0.25)
+    assert (await send(client)).status_code == 503
+
+    breaker = client.circuit_breakers.get(FAKE_HOST)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await send(client)
+    assert fake.requests == 4
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_429_does_not_count_as_a_failure():
+    fake = FakeRiot([429] * 4)
+    client = make_client(fake, failure_threshold=2)
+
+    response = await send(client)
+
+    assert response.status_code == 200
+    assert fake.requests == 5
+    breaker = client.circuit_breakers.get(FAKE_HOST)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.total_failures == 0
+    # 429s are the rate limiter's job, not backoff retries
+    assert client.retry_policy.delays == []
+    await client.aclose()
@@ -0,0 +1,133 @@
+"""
+Pre-flight "already stored?" check of StoredMatchIndex against FakeDynamoDB and a fake MongoDB
+- BloomFilter: no false negatives, persisted and reloaded through the match_bloom item
+- partition() skips only matches with both the match#<id> item and a timeline
+- Sustained UnprocessedKeys give up after max_retries and the keys count as not stored
+"""
+
+import pytest
+
+from services.stored_matches import BloomFilter, StoredMatchIndex
+
+from fake_dynamodb import FakeDynamoDB
+
+PUUID = 'PUUID-1'
+
+
+class FakeCollection:
+    def __init__(self, match_ids=()):
+        self.match_ids = set(match_ids)
+        self.finds = 0
+
+    def find(self, query, projection):
+        self.finds += 1
+        return [{'matchId': match_id} for match_id in query['matchId']['$in'] if match_id in self.match_ids]
+
+
+class FakeMongo:
+    def __init__(self, timelines=(), compact=()):
+        self.timelines = FakeCollection(timelines)
+        self.timelines_compact = FakeCollection(compact)
+
+
+@pytest.fixture
+def store():
+    return FakeDynamoDB()
+
+
+def store_matches(store: FakeDynamoDB, *match_ids):
+    for match_id in match_ids:
+        store.put({'puuid': PUUID, 'dataType': f'match#{match_id}', 'matchId': match_id})
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=100)
+    added = [f'NA1_{i}' for i in range(100)]
+    for match_id in added:
+        bloom.add(match_id)
+
+    assert all(match_id in bloom for match_id in added)
+    assert bloom.count == 100
+    # Sized for 1% false positives at capacity
+    false_positives = sum(f'EUW1_{i}' in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_bloom_filter_add_reports_new_keys():
+    bloom = BloomFilter(capacity=10)
+
+    assert bloom.add('NA1_1') is True
+    assert bloom.add('NA1_1') is False
+    assert bloom.count == 1
+
+
+def test_partition_without_filter_verifies_every_match(store):
+    store_matches(store, 'NA1_1', 'NA1_2', 'NA1_3')
+    mongo = FakeMongo(timelines=['NA1_1', 'NA1_3', 'NA1_4'])
+    index = StoredMatchIndex(store.resource(), 'lol-player-data', mongo)
+
+    unknown, skipped, stats = index.partition(PUUID, ['NA1_4', 'NA1_3', 'NA1_2', 'NA1_1'])
+
+    # NA1_2 has no timeline and NA1_4 no match item: both are fetched again
+    assert unknown == ['NA1_4', 'NA1_2']
+    assert skipped == ['NA1_3', 'NA1_1']
+    assert stats == {'candidates': 4, 'bloomNegatives': 0, 'verified': 4, 'stored': 2}
+
+
+def test_partition_uses_the_compact_timeline_collection(store):
+    store_matches(store, 'NA1_1')
+    mongo = FakeMongo(timelines=['NA1_1'])
+    index = StoredMatchIndex(store.resource(), 'lol-player-data', mongo)
+
+    unknown, skipped, _ = index.partition(PUUID, ['NA1_1'], compact=True)
+
+    assert (unknown, skipped) == (['NA1_1'], [])
+    assert mongo.timelines_compact.finds == 1 and mongo.timelines.finds == 0
+
+
+def test_remembered_matches_skip_lookups_for_new_ones(store):
+    store_matches(store, 'NA1_1', 'NA1_2')
+    mongo = FakeMongo(timelines=['NA1_1', 'NA1_2'])
+    index = StoredMatchIndex(store.resource(), 'lol-player-data', mongo, capacity=100)
+    index.remember(PUUID, ['NA1_1', 'NA1_2'])
+
+    # The filter round-trips through the match_bloom item
+    assert 'NA1_1' in index.load_filter(PUUID)
+
+    unknown, skipped, stats = index.partition(PUUID, ['NA1_9', 'NA1_2', 'NA1_1'])
+
+    assert unknown == ['NA1_9'] and skipped == ['NA1_2', 'NA1_1']
+    assert stats['bloomNegatives'] == 1 and stats['verified'] == 2
+
+
+def test_no_batch_get_when_the_filter_rules_everything_out(store):
+    mongo = FakeMongo()
+    index = StoredMatchIndex(store.resource(), 'lol-player-data', mongo, capacity=100)
+    index.remember(PUUID, ['NA1_1'])
+
+    unknown, skipped, _ = index.partition(PUUID, ['NA1_7', 'NA1_8'])
+
+    assert unknown == ['NA1_7', 'NA1_8'] and skipped == []
+    assert 'batch_get_item' not in store.calls
+    assert mongo.timelines.finds == 0
+
+
+def test_unprocessed_keys_are_retried(store):
+    store_matches(store, 'NA1_1')
+    store.unprocessed_gets = 2
+    index = StoredMatchIndex(store.resource(), 'lol-player-data', FakeMongo(), max_retries=3)
+
+    assert index.stored_in_dynamodb(PUUID, ['NA1_1']) == {'NA1_1'}
+    assert store.calls['batch_get_item'] == 3
+
+
+def test_sustained_throttling_gives_up_and_refetches(store):
+    store_matches(store, 'NA1_1')
+    store.unprocessed_gets = 1000
+    mongo = FakeMongo(timelines=['NA1_1'])
+    index = StoredMatchIndex(store.resource(), 'lol-player-data', mongo, max_retries=2)
+
+    unknown, skipped, _ = index.partition(PUUID, ['NA1_1'])
+
+    assert store.calls['batch_get_item'] == 3
+    assert (unknown, skipped) == (['NA1_1'], [])
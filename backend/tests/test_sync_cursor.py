@@ -0,0 +1,69 @@
+"""
+Incremental sync bounds
+- safe_sync_cursor never moves the cursor past a match that failed to fetch or store
+- sync_match_history's default start is Jan 1 00:00 UTC, independent of the server's timezone
+"""
+
+import calendar
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from services.player_data_service import PlayerDataService
+from services.riot_api import RiotAPIClient
+
+# Newest first, as Riot lists them
+MATCH_IDS = ['NA1_5', 'NA1_4', 'NA1_3', 'NA1_2', 'NA1_1']
+STORED = {'NA1_5': 5000, 'NA1_4': 4000, 'NA1_3': 3000, 'NA1_2': 2000, 'NA1_1': 1000}
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def test_cursor_moves_to_the_newest_stored_match_without_failures():
+    assert PlayerDataService.safe_sync_cursor(MATCH_IDS, STORED, set()) == 5000
+
+
+def test_cursor_stops_below_the_oldest_failed_match():
+    # NA1_4 and NA1_2 failed: only NA1_1 is older than every failure
+    assert PlayerDataService.safe_sync_cursor(MATCH_IDS, STORED, {'NA1_4', 'NA1_2'}) == 1000
+    # The oldest match failed: nothing older was stored, the cursor stays
+    assert PlayerDataService.safe_sync_cursor(MATCH_IDS, STORED, {'NA1_1'}) is None
+
+
+def test_matches_not_stored_this_run_are_ignored():
+    stored = {match_id: game_creation for match_id, game_creation in STORED.items() if match_id != 'NA1_5'}
+    assert PlayerDataService.safe_sync_cursor(MATCH_IDS, stored, set()) == 4000
+    # A failure outside this run's list (e.g. listed by an earlier page) keeps the cursor
+    assert PlayerDataService.safe_sync_cursor(MATCH_IDS, STORED, {'NA1_0'}) is None
+    assert PlayerDataService.safe_sync_cursor([], {}, set()) is None
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    """Run the test with the process in a timezone far from UTC"""
+    monkeypatch.setenv('TZ', 'America/Los_Angeles')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.anyio
+async def test_default_season_start_is_utc(monkeypatch, local_timezone):
+    monkeypatch.delenv('RIOT_SEASON_START', raising=False)
+    client = RiotAPIClient('test-key')
+    windows = []
+
+    async def get_match_ids_in_range(puuid, start_time, end_time, region):
+        windows.append((start_time, end_time))
+        return []
+
+    monkeypatch.setattr(client, 'get_match_ids_in_range', get_match_ids_in_range)
+    await client.sync_match_history('PUUID')
+
+    year = datetime.now(timezone.utc).year
+    assert min(start for start, _ in windows) == calendar.timegm((year, 1, 1, 0, 0, 0))
@@ -0,0 +1,155 @@
+"""
+load_player_timelines against a fake MongoDB collection
+- Compact documents are read with a projection (participants and events, no frame arrays)
+- Sort and limit are pushed into the queries; raw timelines only fill in matches with no compact document
+"""
+
+from services.timeline_store import COMPACT_PROJECTION, load_player_timelines
+
+PUUID = 'PUUID-1'
+
+
+def project(doc, projection):
+    """Apply an inclusion projection with dotted paths (arrays are projected element-wise, as in MongoDB)"""
+    tree = {}
+    for path, include in projection.items():
+        if path == '_id' or not include:
+            continue
+        node = tree
+        for part in path.split('.'):
+            node = node.setdefault(part, {})
+
+    def apply(value, node):
+        if not node:
+            return value
+        if isinstance(value, list):
+            return [apply(element, node) for element in value if isinstance(element, dict)]
+        return {key: apply(value[key], child) for key, child in node.items() if key in value}
+
+    return apply(doc, tree)
+
+
+def dig(doc, path):
+    for part in path.split('.'):
+        doc = (doc or {}).get(part)
+    return doc
+
+
+class FakeCursor:
+    def __init__(self, collection, docs, projection):
+        self.collection = collection
+        self.docs = docs
+        self.projection = projection
+
+    def sort(self, field, direction):
+        self.collection.sorts.append(field)
+        self.docs = sorted(self.docs, key=lambda doc: dig(doc, field) or 0, reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.collection.limits.append(count)
+        self.docs = self.docs[:count]
+        return self
+
+    def __iter__(self):
+        for doc in self.docs:
+            self.collection.returned.append(doc['matchId'])
+            yield project(doc, self.projection)
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.projections, self.sorts, self.limits, self.returned = [], [], [], []
+
+    def _filter(self, query):
+        excluded = set(query.get('matchId', {}).get('$nin', []))
+        return [doc for doc in self.docs if doc['puuid'] == query['puuid'] and doc['matchId'] not in excluded]
+
+    def find(self, query, projection):
+        self.projections.append(projection)
+        return FakeCursor(self, self._filter(query), projection)
+
+    def distinct(self, field, query):
+        return [doc[field] for doc in self._filter(query)]
+
+
+class FakeMongo:
+    def __init__(self, compact, raw):
+        self.timelines_compact = FakeCollection(compact)
+        self.timelines = FakeCollection(raw)
+
+
+def compact_doc(game_id):
+    return {
+        'matchId': f'NA1_{game_id}',
+        'puuid': PUUID,
+        'data': {
+            'version': 1,
+            'gameId': game_id,
+            'participants': [{'participantId': 1, 'puuid': PUUID}],
+            'events': [{'type': 'CHAMPION_KILL', 'timestamp': 60000, 'killerId': 1, 'victimId': 6, 'x': 1, 'y': 2}],
+            'frames': {'timestamps': [0, 60000], 'participants': {'1': {'totalGold': [500, 900]}}}
+        }
+    }
+
+
+def raw_doc(game_id):
+    return {
+        'matchId': f'NA1_{game_id}',
+        'puuid': PUUID,
+        'gameCreation': game_id * 1000,
+        'data': {
+            'metadata': {'matchId': f'NA1_{game_id}'},
+            'info': {
+                'gameId': game_id,
+                'frameInterval': 60000,
+                'participants': [{'participantId': 1, 'puuid': PUUID}],
+                'frames': [
+                    {'timestamp': 0, 'participantFrames': {'1': {'totalGold': 500}}, 'events': []},
+                    {'timestamp': 60000, 'participantFrames': {'1': {'totalGold': 900}}, 'events': [
+                        {'type': 'CHAMPION_KILL', 'timestamp': 60000, 'killerId': 1, 'victimId': 6, 'position': {'x': 1, 'y': 2}}
+                    ]}
+                ]
+            }
+        }
+    }
+
+
+def test_compact_timelines_are_projected_and_limited_in_the_query():
+    mongo = FakeMongo([compact_doc(game_id) for game_id in (3, 10, 7, 12)], [])
+
+    timelines = load_player_timelines(mongo, PUUID, limit=2)
+
+    assert [timeline['matchId'] for timeline in timelines] == ['NA1_12', 'NA1_10']
+    assert mongo.timelines_compact.projections[0] == COMPACT_PROJECTION
+    assert mongo.timelines_compact.sorts == ['data.gameId'] and mongo.timelines_compact.limits == [2]
+    # Only the newest two documents left the database, without their frame arrays
+    assert mongo.timelines_compact.returned == ['NA1_12', 'NA1_10']
+    assert set(timelines[0]) == {'gameId', 'participants', 'events', 'matchId'}
+    assert timelines[0]['events'][0]['killerId'] == 1
+
+
+def test_raw_fallback_only_covers_matches_without_a_compact_document():
+    compact = [compact_doc(game_id) for game_id in (5, 9)]
+    # NA1_9 also has a raw timeline; NA1_8 and NA1_2 only have raw ones
+    raw = [raw_doc(game_id) for game_id in (9, 8, 2)]
+    mongo = FakeMongo(compact, raw)
+
+    timelines = load_player_timelines(mongo, PUUID, limit=2)
+
+    assert [timeline['matchId'] for timeline in timelines] == ['NA1_9', 'NA1_8']
+    assert mongo.timelines.sorts == ['gameCreation'] and mongo.timelines.limits == [2]
+    assert mongo.timelines.returned == ['NA1_8', 'NA1_2']
+    fallback = timelines[1]
+    assert set(fallback) == {'gameId', 'participants', 'events', 'matchId'}
+    assert fallback['events'][0]['type'] == 'CHAMPION_KILL'
+
+
+def test_without_limit_every_timeline_is_returned_newest_first():
+    mongo = FakeMongo([compact_doc(game_id) for game_id in (3, 10)], [raw_doc(7)])
+
+    timelines = load_player_timelines(mongo, PUUID)
+
+    assert [timeline['matchId'] for timeline in timelines] == ['NA1_10', 'NA1_7', 'NA1_3']
+    assert mongo.timelines_compact.limits == [] and mongo.timelines.limits == []
@@ -10,6 +10,9 @@ from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.errors import ConnectionFailure
 from dotenv import load_dotenv
 
+from services.timeline_parser import compact_timeline
+from services.timeline_writer import TimelineBulkWriter, build_compact_timeline_document, build_timeline_document
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -50,16 +53,27 @@ class MongoDBTimelineUploader:
 
         print("[OK] Created indexes on 'timelines' collection")
 
+        # Compact timelines (event table + per-minute arrays) read by the heatmaps
+        self.db.timelines_compact.create_index([("matchId", ASCENDING)], unique=True)
+        self.db.timelines_compact.create_index([("puuid", ASCENDING)])
+        self.db.timelines_compact.create_index([
+            ("puuid", ASCENDING),
+            ("data.gameId", DESCENDING)
+        ])
+
+        print("[OK] Created indexes on 'timelines_compact' collection")
+
     def upload_timelines(self, data_dir: str, puuid: str):
-        """Upload all match timelines"""
+        """Upload all match timelines, plus the derived compact form of each"""
         timeline_dir = os.path.join(data_dir, 'match_timeline')
 
         if not os.path.exists(timeline_dir):
             print("[WARN] No match_timeline folder found")
             return 0
 
+        # Compact timelines (timeline_<id>.compact.json) belong to timelines_compact
         timeline_files = [f for f in os.listdir(timeline_dir)
-                         if f.endswith('.json')]
+                         if f.endswith('.json') and not f.endswith('.compact.json')]
 
         if not timeline_files:
             print("[WARN] No timeline files found")
@@ -67,45 +81,57 @@ class MongoDBTimelineUploader:
 
         print(f"\nUploading {len(timeline_files)} timeline files...")
 
-        uploaded = 0
         skipped_large = 0
         skipped_exists = 0
 
+        # Extract match IDs from filenames: timeline_NA1_5080320781.json
+        match_ids = {f: f.replace('timeline_', '').replace('.json', '') for f in timeline_files}
+
+        # Check which already exist with one query per collection instead of one per file
+        existing = {
+            doc['matchId'] for doc in self.db.timelines.find(
+                {'matchId': {'$in': list(match_ids.values())}}, {'matchId': 1, '_id': 0}
+            )
+        }
+        existing_compact = {
+            doc['matchId'] for doc in self.db.timelines_compact.find(
+                {'matchId': {'$in': list(match_ids.values())}}, {'matchId': 1, '_id': 0}
+            )
+        }
+
+        writer = TimelineBulkWriter(self.db.timelines)
+        compact_writer = TimelineBulkWriter(self.db.timelines_compact)
+        uploaded_at = datetime.utcnow()
+
         for i, timeline_file in enumerate(timeline_files, 1):
             file_path = os.path.join(timeline_dir, timeline_file)
             file_size = os.path.getsize(file_path)
+            match_id = match_ids[timeline_file]
 
-            # Extract match ID from filename: timeline_NA1_5080320781.json
-            match_id = timeline_file.replace('timeline_', '').replace('.json', '')
-
-            # Check if already exists
-            if self.db.timelines.find_one({'matchId': match_id}):
+            if match_id in existing and match_id in existing_compact:
                 skipped_exists += 1
                 continue
 
             with open(file_path, 'r', encoding='utf-8') as f:
                 timeline_data = json.load(f)
 
+            # Derived compact document (also backfills timelines uploaded before it existed)
+            if match_id not in existing_compact:
+                compact_writer.add(build_compact_timeline_document(
+                    match_id, puuid, compact_timeline(timeline_data, match_id), uploaded_at
+                ))
+
+            if match_id in existing:
+                continue
+
             # Create document
-            doc = {
-                'matchId': match_id,
-                'puuid': puuid,
-                'data': timeline_data,
-                'uploadedAt': datetime.utcnow(),
-                'fileSize': file_size
-            }
+            doc = build_timeline_document(match_id, puuid, timeline_data, uploaded_at)
+            doc['fileSize'] = file_size
 
             # Extract metadata if available
             if 'metadata' in timeline_data:
                 doc['metadata'] = timeline_data['metadata']
 
-            if 'info' in timeline_data:
-                info = timeline_data['info']
-                doc['gameCreation'] = info.get('gameCreation')
-                doc['gameDuration'] = info.get('gameDuration')
-                doc['frameInterval'] = info.get('frameInterval')
-                doc['frames'] = len(info.get('frames', []))
-
             # Check document size (16 MB limit in MongoDB)
             doc_size = len(json.dumps(doc, default=str))
             if doc_size > 15_000_000:  # 15 MB threshold
@@ -113,18 +139,25 @@ class MongoDBTimelineUploader:
                 skipped_large += 1
                 continue
 
-            # Insert document
-            try:
-                self.db.timelines.insert_one(doc)
-                uploaded += 1
+            # Queue the upsert (written in size-capped unordered batches)
+            writer.add(doc, size=doc_size)
+
+            if i % 10 == 0:
+                print(f"  Progress: {i}/{len(timeline_files)} ({file_size:,} bytes / {file_size/1024:.2f} KB)")
 
-                if i % 10 == 0:
-                    print(f"  Progress: {i}/{len(timeline_files)} ({file_size:,} bytes / {file_size/1024:.2f} KB)")
+        report = writer.close()
+        compact_report = compact_writer.close()
 
-            except Exception as e:
-                print(f"[ERROR] Failed to upload {match_id}: {e}")
+        for n, batch in enumerate(report['batches'], 1):
+            print(f"  Batch {n}: {batch['documents']} docs, {batch['bytes']/1024/1024:.2f} MB in {batch['latencyMs']:.0f} ms"
+                  + (f", {batch['errors']} errors" if batch['errors'] else ""))
+        for error in report['errors']:
+            print(f"[ERROR] Failed to upload {error['matchId']}: {error['error']}")
+        for error in compact_report['errors']:
+            print(f"[ERROR] Failed to upload compact timeline {error['matchId']}: {error['error']}")
 
-        print(f"\n[OK] Uploaded {uploaded} timelines")
+        uploaded = report['documents']
+        print(f"\n[OK] Uploaded {uploaded} timelines ({compact_report['documents']} compact)")
         if skipped_exists > 0:
             print(f"[INFO] Skipped {skipped_exists} existing timelines")
         if skipped_large > 0:
@@ -2,11 +2,15 @@ import json
 import boto3
 import os
 import time
-from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Dict, List
 from boto3.dynamodb.types import TypeSerializer
 from pathlib import Path
 from datetime import datetime
+from services.dynamo_codec import load_for_dynamo, pack_payload
+from services.dynamo_writer import item_size
+from services.match_repository import get_match_repository
+from services.match_summaries import build_summary_item, complete_player_summaries
+from services.player_index import name_item
 
 class DynamoDBUploader:
     def __init__(self, region_name='us-east-1'):
@@ -15,16 +19,6 @@ class DynamoDBUploader:
         self.dynamodb_resource = boto3.resource('dynamodb', region_name=region_name)
         self.serializer = TypeSerializer()
 
-    def convert_floats_to_decimal(self, obj: Any) -> Any:
-        """Convert float to Decimal for DynamoDB compatibility"""
-        if isinstance(obj, float):
-            return Decimal(str(obj))
-        elif isinstance(obj, dict):
-            return {k: self.convert_floats_to_decimal(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self.convert_floats_to_decimal(item) for item in obj]
-        return obj
-
     def create_tables_if_not_exist(self):
         """Create DynamoDB tables with new structure"""
         tables = {
@@ -87,20 +81,17 @@ class DynamoDBUploader:
             with table.batch_writer() as writer:
                 for item in batch:
                     try:
-                        # Convert floats to Decimal
-                        item = self.convert_floats_to_decimal(item)
-
                         # Check item size before writing
-                        item_size = len(json.dumps(item, default=str))
-                        if item_size > 380000:  # 380KB threshold
-                            print(f"[WARN] Skipping large item: {item.get('dataType', 'unknown')} ({item_size:,} bytes)")
+                        size = item_size(item)
+                        if size > 380000:  # 380KB threshold
+                            print(f"[WARN] Skipping large item: {item.get('dataType', 'unknown')} ({size:,} bytes)")
                             continue
 
                         writer.put_item(Item=item)
                     except Exception as e:
                         print(f"[ERROR] Failed to write item to {table_name}: {e}")
                         print(f"  Item keys: puuid={item.get('puuid', 'N/A')}, dataType={item.get('dataType', 'N/A')}")
-                        print(f"  Item size: {len(json.dumps(item, default=str)):,} bytes")
+                        print(f"  Item size: {item_size(item):,} bytes")
 
             print(f"Uploaded {min(i + batch_size, total_items)}/{total_items} items to {table_name}")
 
@@ -109,7 +100,7 @@ class DynamoDBUploader:
         account_file = os.path.join(data_dir, 'account', 'account.json')
         if os.path.exists(account_file):
             with open(account_file, 'r', encoding='utf-8') as f:
-                account_data = json.load(f)
+                account_data = load_for_dynamo(f)
 
                 item = {
                     'puuid': puuid,
@@ -119,7 +110,8 @@ class DynamoDBUploader:
                     'uploadedAt': datetime.utcnow().isoformat()
                 }
 
-                self.batch_write_items('lol-player-data', [item])
+                # Riot ID -> puuid lookup item for player search
+                self.batch_write_items('lol-player-data', [item, name_item(puuid, player_name, item['uploadedAt'])])
                 print("[OK] Account data uploaded")
 
     def upload_summoner_data(self, data_dir: str, puuid: str):
@@ -127,7 +119,7 @@ class DynamoDBUploader:
         summoner_file = os.path.join(data_dir, 'summoner', 'summoner.json')
         if os.path.exists(summoner_file):
             with open(summoner_file, 'r', encoding='utf-8') as f:
-                summoner_data = json.load(f)
+                summoner_data = load_for_dynamo(f)
 
                 item = {
                     'puuid': puuid,
@@ -150,9 +142,10 @@ class DynamoDBUploader:
                       if f.startswith('match_') and f.endswith('.json')]
 
         matches = []
+        summaries = []
         for match_file in match_files:
             with open(os.path.join(matches_dir, match_file), 'r', encoding='utf-8') as f:
-                match_data = json.load(f)
+                match_data = load_for_dynamo(f)
 
                 # Extract matchId
                 if 'metadata' in match_data and 'matchId' in match_data['metadata']:
@@ -165,25 +158,39 @@ class DynamoDBUploader:
                     parts = temp.split('_', 1)
                     match_id = parts[1] if len(parts) > 1 else temp
 
-                item = {
+                item = pack_payload({
                     'puuid': puuid,
                     'dataType': f'match#{match_id}',  # Use prefix to group all matches
                     'matchId': match_id,
                     'data': match_data,
                     'uploadedAt': datetime.utcnow().isoformat()
-                }
+                })
                 matches.append(item)
 
+                # Slim per-player summary for the analytics readers
+                summary = build_summary_item(puuid, match_data, item['uploadedAt'])
+                if summary is not None:
+                    summaries.append(summary)
+
         if matches:
-            self.batch_write_items('lol-player-data', matches)
-            print(f"[OK] {len(matches)} matches uploaded")
+            self.batch_write_items('lol-player-data', matches + summaries)
+            # Cached match lists for this player are re-read on the next request
+            get_match_repository().bump_version(puuid)
+            print(f"[OK] {len(matches)} matches uploaded ({len(summaries)} summaries)")
+
+        # Matches stored before summaries existed get theirs now; readers use summaries once all do
+        report = complete_player_summaries(puuid)
+        if report['written']:
+            print(f"[OK] {report['written']} summaries written for previously stored matches")
+        for failure in report['failed']:
+            print(f"[WARN] Failed to write summary for {failure['key']}: {failure['error']}")
 
     def upload_champion_mastery_data(self, data_dir: str, puuid: str):
         """Upload champion mastery data as a single item"""
         mastery_file = os.path.join(data_dir, 'champion_mastery', 'champion.json')
         if os.path.exists(mastery_file):
             with open(mastery_file, 'r', encoding='utf-8') as f:
-                mastery_data = json.load(f)
+                mastery_data = load_for_dynamo(f)
 
                 item = {
                     'puuid': puuid,
@@ -201,7 +208,7 @@ class DynamoDBUploader:
         ranked_file = os.path.join(data_dir, 'ranked', 'ranked.json')
         if os.path.exists(ranked_file):
             with open(ranked_file, 'r', encoding='utf-8') as f:
-                ranked_data = json.load(f)
+                ranked_data = load_for_dynamo(f)
 
                 if ranked_data:  # Only upload if not empty
                     item = {
@@ -221,7 +228,7 @@ class DynamoDBUploader:
         challenges_file = os.path.join(data_dir, 'challenges', 'challenges.json')
         if os.path.exists(challenges_file):
             with open(challenges_file, 'r', encoding='utf-8') as f:
-                challenges_data = json.load(f)
+                challenges_data = load_for_dynamo(f)
 
                 item = {
                     'puuid': puuid,
@@ -260,7 +267,7 @@ class DynamoDBUploader:
                     continue
 
                 with open(full_path, 'r', encoding='utf-8') as f:
-                    static_data = json.load(f)
+                    static_data = load_for_dynamo(f)
 
                     # Double-check serialized size
                     test_record = {
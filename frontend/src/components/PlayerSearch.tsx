@@ -6,6 +6,52 @@ interface PlayerSearchProps {
   onPlayerFound?: (playerData: any) => void;
 }
 
+const STAGE_LABELS: Record<string, string> = {
+  account: 'Looking up account...',
+  matchIds: 'Finding recent matches...',
+  matches: 'Fetching matches and timelines...',
+  save: 'Saving data locally...',
+  dynamodb: 'Uploading match summaries...',
+  mongodb: 'Uploading timelines...',
+};
+
+// Follow an ingestion job over SSE (falling back to polling) until it finishes.
+// Resolves with the player's PUUID.
+const waitForJob = (jobId: string, onStage: (label: string) => void): Promise<string> =>
+  new Promise((resolve, reject) => {
+    const poll = async () => {
+      try {
+        const response = await fetch(`${API_URL}/api/player/jobs/${jobId}`);
+        if (!response.ok) throw new Error('Failed to check job status');
+        const { data } = await response.json();
+        if (data.stage && STAGE_LABELS[data.stage]) onStage(STAGE_LABELS[data.stage]);
+        if (data.status === 'succeeded') resolve(data.result.puuid);
+        else if (data.status === 'failed') reject(new Error(data.error || 'Failed to process player'));
+        else setTimeout(poll, 2000);
+      } catch (err) {
+        reject(err);
+      }
+    };
+
+    const events = new EventSource(`${API_URL}/api/player/jobs/${jobId}/events`);
+    events.addEventListener('progress', (e) => {
+      const { stage, status } = JSON.parse((e as MessageEvent).data);
+      if (status === 'running' && STAGE_LABELS[stage]) onStage(STAGE_LABELS[stage]);
+    });
+    events.addEventListener('succeeded', (e) => {
+      events.close();
+      resolve(JSON.parse((e as MessageEvent).data).puuid);
+    });
+    events.addEventListener('failed', (e) => {
+      events.close();
+      reject(new Error(JSON.parse((e as MessageEvent).data).error || 'Failed to process player'));
+    });
+    events.onerror = () => {
+      events.close();
+      poll();
+    };
+  });
+
 const PlayerSearch: React.FC<PlayerSearchProps> = ({ onPlayerFound }) => {
   const [gameName, setGameName] = useState('');
   const [tagLine, setTagLine] = useState('');
@@ -29,7 +75,7 @@ const PlayerSearch: React.FC<PlayerSearchProps> = ({ onPlayerFound }) => {
     setProgress('Searching for player...');
 
     try {
-      // Step 1: Fetch and upload player data
+      // Step 1: Queue the fetch + upload job
       setProgress('Fetching data from Riot API...');
       const response = await fetch(`${API_URL}/api/player/fetch`, {
         method: 'POST',
@@ -55,12 +101,14 @@ const PlayerSearch: React.FC<PlayerSearchProps> = ({ onPlayerFound }) => {
         throw new Error(result.message || 'Failed to process player');
       }
 
+      // Step 2: Follow job progress until the data is uploaded
+      const puuid = await waitForJob(result.data.jobId, setProgress);
+
       setProgress('Data uploaded successfully!');
       setSuccess(`✅ Successfully loaded ${gameName}#${tagLine}!`);
 
-      // Step 2: Fetch the uploaded data from DynamoDB
+      // Step 3: Fetch the uploaded data from DynamoDB
       setProgress('Loading player data...');
-      const puuid = result.data.puuid;
 
       const playerDataResponse = await fetch(`${API_URL}/api/player/data/${puuid}`);
 